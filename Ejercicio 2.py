@@ -1,46 +1,31 @@
-# Tabla LR(1)
+from lr_engine import ACCEPT, LRParser
+
+# Tabla LR(1) para E -> id + E | id
+# Columnas: id, +, $ (acciones) y E (salto)
 tabla = [
-    [2, -1, 1],  # Estado 0
-    [-1, -1, 0],  # Estado 1 (aceptación)
-    [3, -2, -1],  # Estado 2
-    [2, -1, 4],  # Estado 3
-    [-1, -1, -1]  # Estado 4
+    [2, 0, 0, 1],        # Estado 0
+    [0, 0, ACCEPT, 0],   # Estado 1 (aceptación)
+    [0, 3, -2, 0],       # Estado 2
+    [2, 0, 0, 4],        # Estado 3
+    [0, 0, -1, 0],       # Estado 4
 ]
 
 # Reglas de producción
-id_reglas = [2, 2]  # Ambos producen E
+id_reglas = [0, 0]  # Ambos producen E (no terminal 0)
 lon_reglas = [3, 1]  # Longitudes de las reglas
 
 # Simbolos de entrada (id → 0, + → 1, $ → 2)
 entrada = [0, 1, 0, 2]  # Representación de "id + id $"
 
-# Pilas
-pila_estados = [0]
-pila_simbolos = [-1]  # -1 representa el símbolo inicial
-pos = 0  # Puntero a la entrada
-
-while True:
-    estado_actual = pila_estados[-1]
-    simbolo_actual = entrada[pos]
-
-    accion = tabla[estado_actual][simbolo_actual]
+# El motor compartido mantiene las pilas de estados y símbolos
+motor = LRParser.from_dense(
+    list(zip(id_reglas, lon_reglas)),
+    [fila[:3] for fila in tabla],
+    [fila[3:] for fila in tabla],
+)
 
-    if accion > 0:  # Desplazamiento (Shift)
-        pila_estados.append(accion)
-        pila_simbolos.append(simbolo_actual)
-        pos += 1
-    elif accion < 0:  # Reducción (Reduce)
-        regla = -accion - 1  # Ajuste del índice de regla
-        for _ in range(lon_reglas[regla]):  # Pop según longitud de la regla
-            pila_estados.pop()
-            pila_simbolos.pop()
-        
-        estado_superior = pila_estados[-1]
-        pila_estados.append(tabla[estado_superior][2])  # Empuja nuevo estado
-        pila_simbolos.append(id_reglas[regla])  # Empuja símbolo reducido
-    else:  # Aceptación o error
-        if estado_actual == 1:
-            print("Cadena aceptada")
-        else:
-            print("Error en el análisis")
-        break
+try:
+    motor.parse(entrada, 2)
+    print("Cadena aceptada")
+except SyntaxError:
+    print("Error en el análisis")
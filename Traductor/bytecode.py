@@ -0,0 +1,363 @@
+"""Compilador a bytecode y máquina virtual de pila para el dialecto ``program``.
+
+El compilador recorre el árbol de un programa sin errores y emite pares
+(código de operación, operando) en un ``array('i')``. Cada variable se
+resuelve a un índice de casilla al compilar: la máquina lee y escribe una
+lista por índice, sin buscar nombres. Las constantes van en una tabla
+aparte y las instrucciones las cargan por índice.
+
+Los tipos se conocen al compilar, así que la división entre int se emite
+como IDIV (trunca hacia cero, como en C) y un int que se guarda en una
+variable float se convierte con TO_FLOAT.
+
+El bytecode puede guardarse junto al fuente (``archivo.src`` ->
+``archivo.srcb``), con una cabecera que identifica el fuente por tamaño,
+mtime y SHA-256, igual que las tablas LR precompiladas de compilador.py.
+
+Uso: python bytecode.py [--cache] [--dis] archivo.src
+"""
+import argparse
+import hashlib
+import marshal
+import os
+import struct
+import sys
+from array import array
+from operator import length_hint
+
+from lexer import Lexer
+from nodes import Assign, BinOp, Name, Number, Print, Text, UnaryOp, VarDecl
+from parser import Parser
+from diagnostics import merge
+
+(LOAD_CONST, LOAD, STORE, ADD, SUB, MUL, DIV, IDIV, NEG, TO_FLOAT, PRINT,
+ HALT) = range(12)
+OPNAMES = ('LOAD_CONST', 'LOAD', 'STORE', 'ADD', 'SUB', 'MUL', 'DIV', 'IDIV', 'NEG', 'TO_FLOAT',
+           'PRINT', 'HALT')
+BINARY_OPS = {'+': ADD, '-': SUB, '*': MUL, '/': DIV}
+
+# Valor inicial de una variable declarada y aún no asignada
+DEFAULTS = {'INT': 0, 'FLOAT': 0.0, 'STRING': ''}
+
+class CompileError(Exception):
+    """El programa no se puede compilar (tiene errores o construcciones no soportadas)"""
+
+class RuntimeFault(Exception):
+    """Error durante la ejecución, p. ej. una división por cero"""
+
+class Code:
+    """Programa compilado"""
+
+    __slots__ = ('code', 'lines', 'consts', 'names', 'types')
+
+    def __init__(self, code, lines, consts, names, types):
+        self.code = code        # array('i'): código, operando, código, operando...
+        self.lines = lines      # array('i'): línea fuente de cada instrucción
+        self.consts = consts    # Tabla de constantes
+        self.names = names      # Nombre de cada casilla (sólo para mensajes y --dis)
+        self.types = types      # Tipo declarado de cada casilla
+
+    def disassemble(self):
+        out = []
+        code = self.code
+        for pc in range(0, len(code), 2):
+            op, arg = code[pc], code[pc + 1]
+            if op == LOAD_CONST:
+                detail = repr(self.consts[arg])
+            elif op in (LOAD, STORE):
+                detail = self.names[arg]
+            elif arg > 0:
+                detail = repr(self.consts[arg - 1])
+            elif arg < 0:
+                detail = self.names[-arg - 1]
+            else:
+                detail = ''
+            out.append(f'{pc // 2:5} {self.lines[pc // 2]:5}  {OPNAMES[op]:<11}{detail}')
+        return '\n'.join(out)
+
+class Compiler:
+    def __init__(self):
+        self.code = []          # Se pasan a array('i') al terminar
+        self.lines = []
+        self.consts = []
+        self.const_index = {}
+        self.slots = {}         # Nombre -> índice de casilla
+        self.names = []
+        self.types = []
+
+    def compile(self, program):
+        if program.name is None:
+            raise CompileError("sólo se compilan programas con 'program'")
+        for statement in program.body:
+            self.statement(statement)
+        self.emit(HALT, 0, program.line)
+        return Code(array('i', self.code), array('i', self.lines), self.consts, self.names,
+                    self.types)
+
+    def emit(self, op, arg, line):
+        self.code.append(op)
+        self.code.append(arg)
+        self.lines.append(line)
+
+    def statement(self, node):
+        kind = type(node)
+        if kind is VarDecl:
+            if node.name not in self.slots:
+                self.slots[node.name] = len(self.names)
+                self.names.append(node.name)
+                self.types.append(node.type)
+        elif kind is Assign:
+            slot = self.slots[node.target]
+            found = self.expression(node.value)
+            if self.types[slot] == 'FLOAT' and found == 'INT':
+                self.emit(TO_FLOAT, 0, node.line)
+            self.emit(STORE, slot, node.line)
+        elif kind is Print:
+            self.expression(node.value)
+            self.emit(PRINT, 0, node.line)
+        else:
+            raise CompileError(f"sentencia no soportada por la máquina virtual: {kind.__name__} "
+                               f"en línea {node.line}")
+
+    def constant(self, value):
+        key = (type(value), value)
+        index = self.const_index.get(key)
+        if index is None:
+            index = self.const_index[key] = len(self.consts)
+            self.consts.append(value)
+        return index
+
+    def take_operand(self):
+        """Quita la última carga emitida y la devuelve como operando de una operación.
+
+        Una operación binaria cuyo operando derecho es una variable o una
+        constante lo lee directamente: 0 es el tope de la pila, k > 0 la
+        constante k - 1 y k < 0 la casilla -k - 1. Se ahorra una vuelta del
+        bucle de la máquina por operación.
+        """
+        code = self.code
+        op, arg = code[-2], code[-1]
+        if op == LOAD_CONST:
+            operand = arg + 1
+        elif op == LOAD:
+            operand = -arg - 1
+        else:
+            return 0
+        del code[-2:]
+        self.lines.pop()
+        return operand
+
+    def expression(self, node):
+        """Emite el código de la expresión; devuelve su tipo"""
+        types = []
+        stack = [(node, False)]
+        while stack:  # Postorden sin recursión, como la construye el parser
+            current, visited = stack.pop()
+            kind = type(current)
+            if kind is BinOp:
+                if not visited:
+                    stack.append((current, True))
+                    stack.append((current.right, False))
+                    stack.append((current.left, False))
+                    continue
+                right, left = types.pop(), types.pop()
+                result = 'STRING' if left == 'STRING' else 'FLOAT' if 'FLOAT' in (left, right) else 'INT'
+                op = BINARY_OPS[current.op]
+                if op == DIV and result == 'INT':
+                    op = IDIV
+                self.emit(op, self.take_operand(), current.line)
+                types.append(result)
+            elif kind is UnaryOp:
+                if not visited:
+                    stack.append((current, True))
+                    stack.append((current.operand, False))
+                    continue
+                if current.op == '-':
+                    self.emit(NEG, 0, current.line)
+            elif kind is Number:
+                self.emit(LOAD_CONST, self.constant(current.value), current.line)
+                types.append('FLOAT' if isinstance(current.value, float) else 'INT')
+            elif kind is Text:
+                self.emit(LOAD_CONST, self.constant(current.value), current.line)
+                types.append('STRING')
+            elif kind is Name:
+                slot = self.slots[current.id]
+                self.emit(LOAD, slot, current.line)
+                types.append(self.types[slot])
+            else:
+                raise CompileError(f"expresión no soportada por la máquina virtual: {kind.__name__} "
+                                   f"en línea {current.line}")
+        return types[0]
+
+def compile_program(program):
+    return Compiler().compile(program)
+
+def compile_source(text):
+    """Analiza y compila ``text``; lanza CompileError con los errores si los hay"""
+    lexer = Lexer(recover=True)
+    parser = Parser(lexer.tokenize(text))
+    tree = parser.parse()
+    errors, _ = merge(lexer.errors, parser.errors)
+    if errors or tree is None:
+        raise CompileError('\n'.join(f"- {error}" for error in errors))
+    return compile_program(tree)
+
+def run(compiled, out=None):
+    """Ejecuta el programa; ``print`` escribe en ``out`` (por omisión, stdout)"""
+    write = (out or sys.stdout).write
+    code = compiled.code.tolist()  # Indexar una lista no crea objetos int nuevos
+    consts = compiled.consts
+    slots = [DEFAULTS[t] for t in compiled.types]
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    # El lenguaje no tiene saltos: se recorre el código en orden, de a pares
+    pairs = iter(code)
+    try:
+        for op, arg in zip(pairs, pairs):
+            # Ordenado de las instrucciones más frecuentes a las menos
+            if op == LOAD:
+                push(slots[arg])
+            elif op == STORE:
+                slots[arg] = pop()
+            elif op == LOAD_CONST:
+                push(consts[arg])
+            elif op == ADD:
+                right = pop() if arg == 0 else consts[arg - 1] if arg > 0 else slots[-arg - 1]
+                stack[-1] += right
+            elif op == MUL:
+                right = pop() if arg == 0 else consts[arg - 1] if arg > 0 else slots[-arg - 1]
+                stack[-1] *= right
+            elif op == SUB:
+                right = pop() if arg == 0 else consts[arg - 1] if arg > 0 else slots[-arg - 1]
+                stack[-1] -= right
+            elif op == IDIV:
+                right = pop() if arg == 0 else consts[arg - 1] if arg > 0 else slots[-arg - 1]
+                left = stack[-1]
+                if left >= 0 and right > 0:
+                    stack[-1] = left // right
+                else:  # Trunca hacia cero, no hacia abajo como //
+                    quotient = abs(left) // abs(right)
+                    stack[-1] = quotient if (left < 0) == (right < 0) else -quotient
+            elif op == DIV:
+                right = pop() if arg == 0 else consts[arg - 1] if arg > 0 else slots[-arg - 1]
+                stack[-1] /= right
+            elif op == PRINT:
+                write(f"{pop()}\n")
+            elif op == NEG:
+                stack[-1] = -stack[-1]
+            elif op == TO_FLOAT:
+                stack[-1] = float(stack[-1])
+            else:
+                return
+    except ZeroDivisionError:
+        pc = len(code) - length_hint(pairs)
+        raise RuntimeFault(f"[EJECUCIÓN] División por cero en línea {compiled.lines[pc // 2 - 1]}") from None
+
+# ------------------------------
+# Bytecode en disco
+# ------------------------------
+# Cabecera: firma, versión, marca de orden de bytes, número de
+# instrucciones, y tamaño/mtime/SHA-256 del fuente. La siguen el código y
+# las líneas como enteros de 32 bits y, con marshal, las constantes, los
+# nombres y los tipos.
+CODE_MAGIC = b'TRBC'
+CODE_VERSION = 1
+CODE_BYTE_ORDER = 0x01020304
+CODE_HEADER = struct.Struct('=4sIIIQq32s')
+
+def _source_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).digest()
+
+def save_code(compiled, source_path, code_path=None):
+    code_path = code_path or source_path + 'b'
+    st = os.stat(source_path)
+    header = CODE_HEADER.pack(CODE_MAGIC, CODE_VERSION, CODE_BYTE_ORDER, len(compiled.lines),
+                              st.st_size, st.st_mtime_ns, _source_digest(source_path))
+    tmp_path = code_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(compiled.code.tobytes())
+        f.write(compiled.lines.tobytes())
+        f.write(marshal.dumps((compiled.consts, compiled.names, compiled.types)))
+    os.replace(tmp_path, code_path)
+    return code_path
+
+def load_code(code_path, source_path):
+    """Devuelve el Code guardado, o None si falta, es de otra versión o el fuente cambió"""
+    try:
+        with open(code_path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) < CODE_HEADER.size:
+        return None
+    (magic, version, byte_order, count, src_size, src_mtime,
+     src_digest) = CODE_HEADER.unpack_from(data)
+    if magic != CODE_MAGIC or version != CODE_VERSION or byte_order != CODE_BYTE_ORDER:
+        return None
+    try:
+        st = os.stat(source_path)
+    except OSError:
+        return None
+    if (st.st_size, st.st_mtime_ns) != (src_size, src_mtime):
+        if _source_digest(source_path) != src_digest:
+            return None
+
+    offset = CODE_HEADER.size
+    code = array('i')
+    lines = array('i')
+    try:
+        code.frombytes(data[offset:offset + 8 * count])
+        lines.frombytes(data[offset + 8 * count:offset + 12 * count])
+        consts, names, types = marshal.loads(data[offset + 12 * count:])
+    except (ValueError, EOFError, TypeError):
+        return None
+    if len(code) != 2 * count or len(lines) != count:
+        return None
+    return Code(code, lines, consts, names, types)
+
+def load_or_compile(path, cache=False):
+    """Compila el fuente de ``path``; con ``cache`` reutiliza o guarda ``path + 'b'``"""
+    if cache:
+        compiled = load_code(path + 'b', path)
+        if compiled is not None:
+            return compiled
+    with open(path, encoding='utf-8') as f:
+        compiled = compile_source(f.read())
+    if cache:
+        try:
+            save_code(compiled, path)
+        except OSError:
+            pass  # Sin permiso de escritura: se ejecuta igual
+    return compiled
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Compila y ejecuta un programa del dialecto 'program'")
+    ap.add_argument('source')
+    ap.add_argument('--cache', action='store_true',
+                    help="guardar y reutilizar el bytecode junto al fuente (archivo.srcb)")
+    ap.add_argument('--dis', action='store_true', help="mostrar el bytecode en lugar de ejecutarlo")
+    args = ap.parse_args(argv)
+
+    try:
+        compiled = load_or_compile(args.source, args.cache)
+    except FileNotFoundError:
+        print(f"Error: Archivo '{args.source}' no encontrado")
+        return 1
+    except CompileError as e:
+        print(f"\n[ERRORES ENCONTRADOS]:\n{e}")
+        return 1
+    if args.dis:
+        print(compiled.disassemble())
+        return 0
+    try:
+        run(compiled)
+    except RuntimeFault as e:
+        print(e)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Caché en disco de resultados de análisis, indexada por contenido.
+
+Cada entrada es un JSON cuyo nombre es el SHA-256 del contenido del archivo
+junto con la especificación del lexer y la versión de la gramática, de modo
+que cambiar cualquiera de ellas invalida la caché completa. El tamaño total
+se acota expulsando primero las entradas usadas hace más tiempo (LRU), usando
+el mtime de cada archivo como marca de último acceso.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+from lexer import Lexer
+from parser import GRAMMAR_VERSION
+
+DEFAULT_DIR = '.traduc_cache'
+DEFAULT_MAX_BYTES = 64 * 2**20
+READ_SIZE = 1 << 20
+
+def spec_hash():
+    """Huella de todo lo que determina el resultado del análisis"""
+    lexer = Lexer()
+    spec = (lexer.token_specification, sorted(lexer.keywords.items()), GRAMMAR_VERSION)
+    return hashlib.sha256(repr(spec).encode('utf-8')).hexdigest()
+
+class ResultCache:
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.salt = spec_hash().encode('ascii')
+        os.makedirs(directory, exist_ok=True)
+
+    def key_for_file(self, path, mode=''):
+        """Calcula la clave de un archivo leyéndolo por bloques.
+
+        ``mode`` distingue análisis que pueden dar diagnósticos distintos
+        para el mismo contenido (p. ej. 'split', que corta el archivo en trozos).
+        """
+        digest = hashlib.sha256(self.salt + mode.encode('ascii') + b'\0')
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(READ_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def get(self, key):
+        entry = os.path.join(self.directory, key + '.json')
+        try:
+            with open(entry, encoding='utf-8') as f:
+                value = json.load(f)
+            os.utime(entry)
+        except (OSError, ValueError):
+            return None
+        return value
+
+    def put(self, key, value):
+        # Escritura atómica: varios trabajadores pueden escribir a la vez
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp, os.path.join(self.directory, key + '.json'))
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+    def evict(self):
+        """Borra las entradas menos usadas hasta quedar bajo ``max_bytes``"""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith('.json'):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
@@ -0,0 +1,120 @@
+"""Cliente mínimo del servidor de análisis (server.py).
+
+Reemplaza a ``python main.py`` en las herramientas: acepta los mismos
+archivos, directorios y patrones, imprime la misma salida y devuelve el
+mismo código de salida, pero el análisis lo hace el servidor, que ya tiene
+todo cargado. Sólo importa lo indispensable para arrancar rápido; si no hay
+un servidor escuchando, analiza en este mismo proceso con main.py.
+
+Uso: python client.py [--socket RUTA] [--format text|jsonl|sarif] <archivo|directorio|patrón>...
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import tempfile
+
+def default_socket():
+    return os.path.join(tempfile.gettempdir(), f'traductor-{os.getuid()}.sock')
+
+class Client:
+    """Conexión con el servidor; los pedidos se responden en orden"""
+
+    def __init__(self, path=None):
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.socket.connect(path or default_socket())
+        self.file = self.socket.makefile('rwb')
+        self.next_id = 0
+
+    def send(self, **request):
+        self.next_id += 1
+        request['id'] = self.next_id
+        self.file.write(json.dumps(request).encode('utf-8') + b'\n')
+        self.file.flush()
+        return self.next_id
+
+    def receive(self):
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("el servidor cerró la conexión")
+        return json.loads(line)
+
+    def request(self, **request):
+        """Envía un pedido de una sola respuesta y la devuelve"""
+        self.send(**request)
+        return self.receive()
+
+    def check(self, paths, cwd=None):
+        """Pide analizar ``paths`` (relativos a ``cwd``).
+
+        Devuelve el número de archivos que coinciden y un iterador con el
+        resultado de cada uno, en orden (dicts de diagnostics.result_to_json).
+        """
+        self.send(op='check', paths=list(paths), cwd=cwd or os.getcwd())
+        header = self.receive()
+        if 'error' in header:
+            raise RuntimeError(header['error'])
+        return header['count'], self._results(header['count'])
+
+    def check_lr(self, path, cwd=None):
+        """Pide analizar ``path`` (relativo a ``cwd``) con el parser LR de compilador.py"""
+        return self.request(op='lr', path=path, cwd=cwd or os.getcwd())
+
+    def _results(self, count):
+        for _ in range(count):
+            response = self.receive()
+            if 'error' in response:
+                # El servidor no pudo analizar el archivo: queda como su error fatal
+                yield {'path': response['path'], 'errors': [], 'tokens': 0, 'truncated': False,
+                       'fatal': ['F003', 'error', None, 0, 0, [response['path'], response['error']]]}
+            else:
+                yield response['result']
+
+    def close(self):
+        self.file.close()
+        self.socket.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Cliente del servidor de análisis de Traductor")
+    ap.add_argument('sources', nargs='*', help="archivos, directorios o patrones glob")
+    ap.add_argument('--socket', default=None, help="socket del servidor")
+    ap.add_argument('--format', choices=('jsonl', 'sarif', 'text'), default='text')
+    args = ap.parse_args(argv)
+
+    if not args.sources:
+        print("Uso: python client.py [--socket RUTA] <archivo_fuente|directorio|patrón>...")
+        return 2
+    try:
+        client = Client(args.socket)
+    except (FileNotFoundError, ConnectionRefusedError):
+        import main as local
+        return local.main(['--format', args.format] + args.sources)
+
+    from diagnostics import WRITERS, TextWriter, result_from_json
+    with client:
+        count, results = client.check(args.sources)
+        if not count:
+            print("Error: ningún archivo coincide con los argumentos")
+            return 1
+        if args.format == 'text':
+            writer = TextWriter(sys.stdout, count > 1)
+        else:
+            writer = WRITERS[args.format](sys.stdout)
+        ok = True
+        writer.begin()
+        for data in results:
+            result = result_from_json(data)
+            writer.write(result)
+            ok = ok and result.fatal is None and not result.errors
+        writer.end()
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""Diagnósticos estructurados y su salida en texto, JSON Lines o SARIF.
+
+Un Diagnostic guarda el código, la severidad, el tipo del token donde se
+detectó, su posición y los argumentos del mensaje. El texto en español sólo
+se arma al imprimirlo (``str``), con la plantilla de ``MESSAGES``: un
+análisis con miles de errores no formatea ninguno hasta que se muestran.
+
+Los escritores reciben los resultados archivo por archivo y los emiten en
+cuanto llegan, sin acumular la ejecución completa. SARIF es un único
+documento JSON, así que se escribe la cabecera al empezar, cada resultado al
+llegar y el cierre al final.
+"""
+import heapq
+import json
+from collections import namedtuple
+from operator import attrgetter
+
+# Nombres legibles de los tipos de token, para "se encontró ..."
+FRIENDLY_NAMES = {
+    'ID': 'identificador',
+    'OP': 'operador',
+    'SEMI': 'punto y coma',
+    'LPAREN': 'paréntesis izquierdo "("',
+    'RPAREN': 'paréntesis derecho ")"',
+    'LBRACE': 'llave izquierda "{"',
+    'RBRACE': 'llave derecha "}"',
+    'COMMA': 'coma ","',
+    'COLON': 'dos puntos ":"',
+    'ASSIGN': 'signo de asignación "="',
+    'PROGRAM': 'palabra reservada "program"',
+    'RETURN': 'palabra reservada "return"',
+    'VAR': 'palabra reservada "var"',
+    'PRINT': 'palabra reservada "print"',
+    'INT': 'tipo entero',
+    'FLOAT': 'tipo flotante',
+    'STRING': 'tipo cadena',
+    'NUMBER': 'número',
+    'TEXT': 'cadena de texto',
+    'EOF': 'fin de archivo',
+}
+
+def friendly(kind):
+    return FRIENDLY_NAMES.get(kind, kind.lower())
+
+# Plantillas por código; {0}, {1}... son los argumentos del diagnóstico
+MESSAGES = {
+    'F001': "Error: Archivo '{0}' no encontrado",
+    'F002': "Error: No se pudo leer el archivo '{0}': {1}",
+    'F003': "Error: Falló el análisis del archivo '{0}': {1}",
+    'L001': "Error léxico: Carácter inesperado {0!r} en línea {line}, columna {column}",
+    'L002': "Error léxico: Cadena sin cerrar en línea {line}, columna {column}",
+    'L003': "Error léxico: {1} caracteres inesperados desde {0!r} en línea {line}, columna {column}",
+    'S001': "[SINTÁCTICO] Se esperaba {0}{1} pero se encontró {found} en línea {line}, columna {column}",
+    'M001': "[SEMÁNTICO] Variable '{0}' ya declarada en este ámbito en línea {line}, columna {column}",
+    'M002': "[SEMÁNTICO] Función '{0}' ya declarada en línea {line}, columna {column}",
+    'M003': "[SEMÁNTICO] Variable '{0}' no declarada en línea {line}, columna {column}",
+    'M004': "[SEMÁNTICO] Función '{0}' no declarada en línea {line}, columna {column}",
+    'T001': "[SEMÁNTICO] Tipo incompatible: no se puede asignar {1} a '{0}' de tipo {2} en línea {line}, columna {column}",
+    'T002': "[SEMÁNTICO] Argumento {1} de '{0}': se esperaba {2} pero se encontró {3} en línea {line}, columna {column}",
+    'T003': "[SEMÁNTICO] '{0}' espera {1} argumentos pero recibe {2} en línea {line}, columna {column}",
+    'T004': "[SEMÁNTICO] Retorno de '{0}': se esperaba {1} pero se encontró {2} en línea {line}, columna {column}",
+    'T005': "[SEMÁNTICO] Falta el valor de retorno de '{0}' en línea {line}, columna {column}",
+    'T006': "[SEMÁNTICO] 'return' fuera de una función en línea {line}, columna {column}",
+    'T007': "[SEMÁNTICO] Operador '{0}' no válido entre {1} y {2} en línea {line}, columna {column}",
+    'T008': "[SEMÁNTICO] Operador '{0}' no válido para {1} en línea {line}, columna {column}",
+}
+
+class Diagnostic:
+    __slots__ = ('code', 'severity', 'kind', 'line', 'column', 'args')
+
+    def __init__(self, code, line, column, args=(), kind=None, severity='error'):
+        self.code = code
+        self.severity = severity
+        self.kind = kind        # Tipo del token donde se detectó, si aplica
+        self.line = line
+        self.column = column
+        self.args = args
+
+    def __str__(self):
+        found = friendly(self.kind) if self.kind else ''
+        return MESSAGES[self.code].format(*self.args, line=self.line, column=self.column, found=found)
+
+    def __repr__(self):
+        return f'Diagnostic({self.code!r}, {self.line}, {self.column}, {self.args!r}, {self.kind!r})'
+
+    def __eq__(self, other):
+        return isinstance(other, Diagnostic) and self.to_json() == other.to_json()
+
+    def moved(self, lines):
+        """Copia desplazada ``lines`` líneas"""
+        return Diagnostic(self.code, self.line + lines, self.column, self.args, self.kind, self.severity)
+
+    def to_json(self):
+        return [self.code, self.severity, self.kind, self.line, self.column, list(self.args)]
+
+    @classmethod
+    def from_json(cls, data):
+        code, severity, kind, line, column, args = data
+        return cls(code, line, column, tuple(args), kind, severity)
+
+    def as_dict(self, path=None):
+        return {'path': path, 'code': self.code, 'severity': self.severity, 'kind': self.kind,
+                'line': self.line, 'column': self.column, 'message': str(self)}
+
+def merge(lexical, others, limit=None):
+    """Intercala los errores léxicos con los del parser por posición.
+
+    Los léxicos ya vienen ordenados; los del parser no siempre (un error de
+    tipos puede informarse al cerrar la función), así que se ordenan antes.
+    Devuelve (errores, si se cortó en ``limit``).
+    """
+    position = attrgetter('line', 'column')
+    errors = list(heapq.merge(lexical, sorted(others, key=position), key=position))
+    if limit is not None and len(errors) >= limit:
+        return errors[:limit], True
+    return errors, False
+
+# Resultado del análisis de un archivo. ``fatal`` y ``errors`` son
+# Diagnostic; ``truncated``: el análisis se detuvo al llegar a --max-errors
+CheckResult = namedtuple('CheckResult', ['path', 'fatal', 'errors', 'tokens', 'truncated'],
+                         defaults=(False,))
+
+def result_to_json(result):
+    return {'path': result.path, 'fatal': result.fatal and result.fatal.to_json(),
+            'errors': [e.to_json() for e in result.errors],
+            'tokens': result.tokens, 'truncated': result.truncated}
+
+def result_from_json(data):
+    fatal = data['fatal'] and Diagnostic.from_json(data['fatal'])
+    return CheckResult(data['path'], fatal, [Diagnostic.from_json(e) for e in data['errors']],
+                       data['tokens'], data['truncated'])
+
+def diagnostics_of(result):
+    """Diagnósticos de un resultado (el fatal, si lo hay, va primero)"""
+    if result.fatal is not None:
+        yield result.fatal
+    yield from result.errors
+
+class TextWriter:
+    """Salida legible, la de siempre"""
+
+    def __init__(self, stream, show_path=False):
+        self.stream = stream
+        self.show_path = show_path
+
+    def begin(self):
+        pass
+
+    def write(self, result):
+        out = self.stream
+        if self.show_path:
+            print(f"\n== {result.path}", file=out)
+        if result.fatal is not None:
+            if result.fatal.code.startswith('L'):
+                print(f"\n[ERROR LÉXICO]: {result.fatal}", file=out)
+            else:
+                print(result.fatal, file=out)
+            return
+        if result.errors:
+            print("\n[ERRORES ENCONTRADOS]:", file=out)
+            for error in result.errors:
+                print(f"- {error}", file=out)
+            if result.truncated:
+                print(f"\n[ANÁLISIS DETENIDO]: se alcanzó el límite de {len(result.errors)} errores", file=out)
+            return
+        print("\n[ÉXITO] Análisis completado correctamente", file=out)
+
+    def end(self):
+        pass
+
+class JsonLinesWriter:
+    """Un objeto JSON por diagnóstico, una línea cada uno"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def begin(self):
+        pass
+
+    def write(self, result):
+        for diagnostic in diagnostics_of(result):
+            self.stream.write(json.dumps(diagnostic.as_dict(result.path), ensure_ascii=False) + '\n')
+        self.stream.flush()
+
+    def end(self):
+        pass
+
+class SarifWriter:
+    """Un documento SARIF 2.1.0 escrito a medida que llegan los resultados"""
+
+    LEVELS = {'error': 'error', 'warning': 'warning', 'note': 'note'}
+
+    def __init__(self, stream, tool='Traductor'):
+        self.stream = stream
+        self.tool = tool
+        self.first = True
+
+    def begin(self):
+        rules = [{'id': code, 'shortDescription': {'text': template}}
+                 for code, template in MESSAGES.items()]
+        head = {
+            'version': '2.1.0',
+            '$schema': 'https://json.schemastore.org/sarif-2.1.0.json',
+            'runs': [{'tool': {'driver': {'name': self.tool, 'rules': rules}}, 'results': []}],
+        }
+        text = json.dumps(head, ensure_ascii=False)
+        # Se deja abierta la lista de resultados: ']}]}' la cierra en end()
+        self.stream.write(text[:-len(']}]}')])
+
+    def write(self, result):
+        for diagnostic in diagnostics_of(result):
+            location = {'artifactLocation': {'uri': result.path}}
+            if diagnostic.line:
+                location['region'] = {'startLine': diagnostic.line, 'startColumn': diagnostic.column}
+            entry = {
+                'ruleId': diagnostic.code,
+                'level': self.LEVELS.get(diagnostic.severity, 'error'),
+                'message': {'text': str(diagnostic)},
+                'locations': [{'physicalLocation': location}],
+            }
+            self.stream.write(('' if self.first else ',') + json.dumps(entry, ensure_ascii=False))
+            self.first = False
+        self.stream.flush()
+
+    def end(self):
+        self.stream.write(']}]}\n')
+        self.stream.flush()
+
+WRITERS = {'text': TextWriter, 'jsonl': JsonLinesWriter, 'sarif': SarifWriter}
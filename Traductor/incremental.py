@@ -0,0 +1,308 @@
+"""Reanálisis incremental de un buffer editado, para integrarse con editores.
+
+Document divide el texto en unidades: cada ``function_or_declaration`` del
+dialecto C o, en el dialecto con ``program``, la cabecera hasta la '{' y
+cada sentencia (desde la primera '}', el resto es la última unidad). Ante
+una edición sólo se vuelven a tokenizar y analizar las unidades que toca,
+empezando en el final de la unidad anterior, que siempre es un punto seguro:
+ningún token cruza un salto de línea y toda unidad empieza fuera de llaves.
+Los caracteres inválidos no interrumpen el análisis: el lexer los informa
+como errores de la unidad en la que caen.
+
+Cada unidad guarda sus tokens y errores con líneas relativas a su primera
+línea. Un cursor separa las unidades: las anteriores guardan su posición
+desde el principio del texto y sus declaraciones globales están en la tabla
+de símbolos; las siguientes guardan su posición desde el final del texto,
+así que una edición anterior a ellas no las toca. Editar mueve el cursor
+hasta la primera unidad afectada y cuesta lo que haya entre las dos
+posiciones, no el tamaño del documento.
+
+Cada unidad se analiza con las declaraciones globales de las anteriores. Si
+una edición cambia las declaraciones globales de las unidades que toca, las
+unidades siguientes también se reanalizan; en el dialecto con ``program``,
+donde los tipos se comprueban con todas las declaraciones del cuerpo, se
+reanaliza el documento. También se reanaliza completo un programa sin una
+cabecera válida, que el Parser no analiza más allá de ella.
+"""
+from bisect import bisect_left, bisect_right
+import gc
+
+from diagnostics import merge
+from lexer import Lexer, Token
+from parser import Parser, ParserError, split_statements, split_top_level
+from symbol_table import SymbolTable, global_key
+from type_checker import TypeChecker
+
+class Unit:
+    __slots__ = ('start', 'end', 'line', 'newlines', 'end_column', 'tokens', 'eof', 'lexical',
+                 'errors', 'globals')
+
+    def __init__(self, start, end, line, newlines, end_column, tokens, eof, lexical):
+        self.start = start            # Desplazamiento del primer token
+        self.end = end                # Desplazamiento tras el último token
+        self.line = line              # Línea del primer token
+        self.newlines = newlines      # Saltos de línea entre el primer y el último token
+        self.end_column = end_column  # Columna en ``end``
+        self.tokens = tokens          # Tokens con línea relativa (1 = self.line)
+        self.eof = eof                # EOF relativo con el que se analiza la unidad
+        self.lexical = lexical        # Errores léxicos, con línea relativa
+        self.errors = []
+        self.globals = []             # Declaraciones globales que hace la unidad
+
+class Document:
+    def __init__(self, text=''):
+        self.lexer = Lexer(recover=True)
+        self.text = text
+        self._rebuild()
+
+    @property
+    def errors(self):
+        """Diagnósticos con líneas absolutas, como los de Parser"""
+        return [error.moved(self._line(index) - 1)
+                for index, unit in enumerate(self.units) for error in unit.errors]
+
+    def tokens(self):
+        """Genera los tokens del documento con posiciones absolutas"""
+        for index, unit in enumerate(self.units):
+            shift = self._line(index) - 1
+            for token in unit.tokens:
+                yield token._replace(line=token.line + shift)
+        if self.units:
+            unit = self.units[-1]
+            yield unit.eof._replace(line=unit.eof.line + self._line(len(self.units) - 1) - 1)
+
+    def edit(self, offset, deleted, inserted):
+        """Reemplaza ``deleted`` caracteres en ``offset`` por ``inserted``.
+
+        Devuelve el rango (primera, última + 1) de unidades reanalizadas.
+        """
+        old = self.text
+        self.text = text = old[:offset] + inserted + old[offset + deleted:]
+        units = self.units
+        if not self.split or not units:
+            return self._rebuild()
+
+        edit_end = offset + deleted
+        # Unidades que tocan la edición (un borde en común cuenta)
+        indices = range(len(units))
+        first = bisect_left(indices, offset, key=self._end)
+        last = bisect_right(indices, edit_end, key=self._start) - 1
+        # Las unidades que empiezan en la misma línea donde acaba la edición
+        # cambian de columna: también se rehacen
+        while last + 1 < len(units) and old.find('\n', edit_end, self._start(last + 1)) == -1:
+            last += 1
+        if last == len(units) - 1:
+            # La última unidad guarda la posición del fin de archivo
+            first = min(first, last)
+
+        while True:
+            if self.program and first == 0:
+                return self._rebuild()
+            # Desde aquí las unidades siguientes se miden desde el final del
+            # texto, que la edición no cambia
+            self._move(first)
+            if first > 0:
+                previous = units[first - 1]
+                start = previous.end
+                line, column = previous.line + previous.newlines, previous.end_column
+            else:
+                start, line, column = 0, 1, 1
+            at_end = last + 1 == len(units)
+            end = units[last + 1].start + len(text) if not at_end else len(text)
+            tokens, offsets, eof, lexical = self._lex(text, start, end, line, column)
+            if at_end and not tokens and first > 0:
+                # No queda ninguna unidad que lleve el fin de archivo
+                first -= 1
+                continue
+            if self.program:
+                spans, open_tail, closed = split_statements(tokens)
+                if closed and not at_end:
+                    # Una '}' antes del final: cambia cuál es la última unidad
+                    return self._rebuild()
+            else:
+                spans, open_tail = split_top_level(tokens)
+            if open_tail and not at_end:
+                # La región no cierra: absorbe la unidad siguiente
+                last += 1
+                continue
+            break
+
+        if first == 0 and tokens and tokens[0].type == 'PROGRAM':
+            return self._rebuild()
+
+        self.size = len(text)
+        self.newlines += inserted.count('\n') - old.count('\n', offset, edit_end)
+        new_units = self._units(text, tokens, offsets, spans, eof if at_end else None, lexical)
+        old_globals = [global_key(info) for unit in units[first:last + 1] for info in unit.globals]
+        units[first:last + 1] = new_units
+        parsed = [self._parse(unit) for unit in new_units]
+        end = self.cursor = first + len(new_units)
+        new_globals = [global_key(info) for unit in new_units for info in unit.globals]
+        if new_globals != old_globals:
+            if self.program:
+                return self._rebuild()
+            # Las unidades siguientes ven otras declaraciones globales
+            for unit in units[end:]:
+                unit.start += self.size
+                unit.end += self.size
+                unit.line += self.newlines
+                self._parse(unit)
+            end = self.cursor = len(units)
+        if self.program:
+            for pending in parsed:
+                self._check(*pending)
+        return first, end
+
+    def _rebuild(self, split=True):
+        # Como en Parser.parse: las unidades no forman ciclos y el recolector
+        # sólo recorrería una y otra vez las que ya se crearon
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._build(split)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def _build(self, split):
+        text = self.text
+        self.units = []
+        self.cursor = 0
+        self.symbols = SymbolTable()
+        self.final = None
+        self.size = len(text)
+        self.newlines = text.count('\n')
+        tokens, offsets, eof, lexical = self._lex(text, 0, len(text), 1, 1)
+
+        self.program = bool(tokens) and tokens[0].type == 'PROGRAM'
+        self.split = split
+        if not self.program:
+            spans, _ = split_top_level(tokens)
+        else:
+            brace = next((i for i, token in enumerate(tokens) if token.type == 'LBRACE'), None)
+            if brace is None:
+                self.split = split = False
+            if split:
+                body, _, _ = split_statements(tokens, brace + 1)
+                spans = [(0, brace + 1)] + body
+            else:
+                spans = [(0, len(tokens))]
+        self.units = self._units(text, tokens, offsets, spans, eof, lexical)
+        parsed = [self._parse(unit) for unit in self.units]
+        self.cursor = len(self.units)
+        if self.program and split:
+            if parsed[0][1].errors:
+                # Con la cabecera mal formada el Parser no sigue
+                return self._build(split=False)
+            self.final = SymbolTable(self.symbols.declared)
+            for pending in parsed:
+                self._check(*pending)
+        return 0, len(self.units)
+
+    def _start(self, index):
+        unit = self.units[index]
+        return unit.start if index < self.cursor else unit.start + self.size
+
+    def _end(self, index):
+        unit = self.units[index]
+        return unit.end if index < self.cursor else unit.end + self.size
+
+    def _line(self, index):
+        unit = self.units[index]
+        return unit.line if index < self.cursor else unit.line + self.newlines
+
+    def _move(self, index):
+        """Lleva el cursor a la unidad ``index``"""
+        units, symbols = self.units, self.symbols
+        size, newlines = self.size, self.newlines
+        while self.cursor < index:
+            unit = units[self.cursor]
+            unit.start += size
+            unit.end += size
+            unit.line += newlines
+            symbols.seed(unit.globals)
+            self.cursor += 1
+        while self.cursor > index:
+            self.cursor -= 1
+            unit = units[self.cursor]
+            unit.start -= size
+            unit.end -= size
+            unit.line -= newlines
+            symbols.forget(unit.globals)
+
+    def _lex(self, text, start, end, line, column):
+        """Tokeniza text[start:end], que empieza en (line, column).
+
+        Devuelve los tokens sin EOF, el desplazamiento de cada uno, el EOF
+        (la posición al final de la región) y los errores léxicos, uno por
+        cada token ERROR.
+        """
+        region = text[start:end]
+        tokens = list(self.lexer.tokenize(region, line, column))
+        eof = tokens.pop()
+        # Desplazamiento de la columna 1 de cada línea de la región
+        line_starts = [start - column + 1]
+        newline = region.find('\n')
+        while newline != -1:
+            line_starts.append(start + newline + 1)
+            newline = region.find('\n', newline + 1)
+        offsets = [line_starts[t.line - line] + t.column - 1 for t in tokens]
+        return tokens, offsets, eof, self.lexer.errors
+
+    def _units(self, text, tokens, offsets, spans, eof, lexical):
+        """Crea las unidades de ``spans``; ``eof`` es el fin de archivo, si cae aquí"""
+        units = []
+        match = self.lexer.regex.match
+        lexical = iter(lexical)
+        for a, b in spans:
+            first, last = tokens[a], tokens[b - 1]
+            end = match(text, offsets[b - 1]).end()
+            shift = first.line - 1
+            relative = [Token(t.type, t.value, t.line - shift, t.column) for t in tokens[a:b]]
+            errors = [next(lexical).moved(-shift) for t in relative if t.type == 'ERROR']
+            newlines = last.line - first.line
+            end_column = last.column + end - offsets[b - 1]
+            unit_eof = Token('EOF', '', newlines + 1, end_column)
+            units.append(Unit(offsets[a], end, first.line, newlines, end_column, relative,
+                              unit_eof, errors))
+        if units and eof is not None:
+            unit = units[-1]
+            unit.eof = eof._replace(line=eof.line - unit.line + 1)
+        return units
+
+    def _parse(self, unit):
+        """Analiza la unidad; ``symbols`` acumula las declaraciones globales.
+
+        En el dialecto con ``program`` devuelve lo que _check necesita para
+        comprobar los tipos con todas las declaraciones del cuerpo.
+        """
+        symbols = self.symbols
+        declared = len(symbols.declared)
+        parser = Parser(unit.tokens + [unit.eof], symbols=symbols, keep_tree=False)
+        body = []
+        if not self.program:
+            parser.program_c_style()
+        elif not self.split:
+            parser.parse()
+        else:
+            try:
+                if unit is self.units[0]:
+                    parser.program_header()
+                body = parser.statements()
+            except ParserError:
+                pass
+        unit.globals = symbols.declared[declared:]
+        unit.errors, _ = merge(unit.lexical, parser.errors)
+        if self.program and self.split:
+            return unit, parser, body
+
+    def _check(self, unit, parser, body):
+        parser.errors = []  # Los del análisis ya están en unit.errors
+        TypeChecker(self.final, parser.semantic_error).check_body(body)
+        if unit is self.units[-1]:
+            try:
+                parser.program_end()
+            except ParserError:
+                pass
+        if parser.errors:
+            unit.errors, _ = merge(unit.errors, parser.errors)
@@ -0,0 +1,524 @@
+"""Código de tres direcciones en bloques básicos y pases de optimización.
+
+``lower`` traduce el árbol de un programa sin errores a un Module: sus
+variables globales y una Function por función (en el dialecto ``program``,
+una sola con el cuerpo del programa). Cada instrucción tiene a lo sumo un
+operador, un destino y dos operandos:
+
+    %1 = a + b          binario: + - * /
+    %2 = neg %1         menos unario
+    b = float %2        int a float, explícita donde el tipo la pide
+    x = %2              copia
+    %3 = call f(x, 2)   llamada; sin destino si el valor no se usa
+    return %3
+    print %3
+
+Los operandos son nombres (str) o constantes (Const). Las variables globales
+se escriben ``@nombre`` y los temporales ``%n``; el resto son locales o
+parámetros. Las constantes conservan su tipo: la división entre int trunca
+hacia cero, como en C, y con algún float es real.
+
+El lenguaje no tiene saltos: una función es un bloque de entrada, y cada
+``return`` que no es la última sentencia abre un bloque nuevo, inalcanzable.
+
+Los pases reciben el Module y devuelven cuántas instrucciones (o funciones)
+cambiaron. Todos son lineales: recorren cada bloque una vez, con tablas hash
+de lo que saben hasta ese punto.
+
+Uso: python ir.py [-O {0,1,2}] [--time-passes] [--stats-format text|json] archivo.src
+"""
+import argparse
+import sys
+
+from diagnostics import merge
+from lexer import Lexer
+from nodes import Assign, BinOp, Call, FunctionDef, Name, Number, Print, Return, Text, UnaryOp, VarDecl
+from parser import Parser
+from stats import Stats
+
+BINARY = ('+', '-', '*', '/')
+
+class Const:
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    # 2 y 2.0 no son la misma constante: el tipo decide cómo se divide
+    def __eq__(self, other):
+        return (type(other) is Const and type(self.value) is type(other.value)
+                and self.value == other.value)
+
+    def __hash__(self):
+        return hash((type(self.value), self.value))
+
+    def __repr__(self):
+        return f'Const({self.value!r})'
+
+    def __str__(self):
+        return f'"{self.value}"' if type(self.value) is str else str(self.value)
+
+    @property
+    def type(self):
+        return {int: 'INT', float: 'FLOAT', str: 'STRING'}[type(self.value)]
+
+class Instr:
+    __slots__ = ('op', 'dest', 'args', 'callee', 'line')
+
+    def __init__(self, op, dest, args, line, callee=None):
+        self.op = op            # '=', 'float', 'neg', 'call', 'return', 'print' o un binario
+        self.dest = dest        # Nombre, o None
+        self.args = args        # Tupla de operandos
+        self.callee = callee    # Sólo en 'call'
+        self.line = line
+
+    def __str__(self):
+        args = [str(a) for a in self.args]
+        op = self.op
+        if op in BINARY:
+            text = f'{args[0]} {op} {args[1]}'
+        elif op == '=':
+            text = args[0]
+        elif op == 'call':
+            text = f'call {self.callee}({", ".join(args)})'
+        else:
+            text = ' '.join([op] + args)
+        return f'{self.dest} = {text}' if self.dest is not None else text
+
+class Block:
+    __slots__ = ('label', 'instrs')
+
+    def __init__(self, label):
+        self.label = label
+        self.instrs = []
+
+class Function:
+    __slots__ = ('name', 'params', 'type', 'blocks', 'types')
+
+    def __init__(self, name, params, type):
+        self.name = name
+        self.params = params    # Nombres de los parámetros
+        self.type = type        # Tipo de retorno; None en el cuerpo de un 'program'
+        self.blocks = [Block('entry')]
+        self.types = {}         # Nombre local o temporal -> tipo
+
+    def instructions(self):
+        return sum(len(block.instrs) for block in self.blocks)
+
+class Module:
+    __slots__ = ('globals', 'functions', 'entry')
+
+    def __init__(self, entry=None):
+        self.globals = {}       # '@nombre' -> tipo
+        self.functions = {}     # Nombre -> Function, en el orden del fuente
+        self.entry = entry      # Función por la que empieza la ejecución, si se conoce
+
+    def instructions(self):
+        return sum(function.instructions() for function in self.functions.values())
+
+    def __str__(self):
+        out = [f'global {name}: {type.lower()}' for name, type in self.globals.items()]
+        for function in self.functions.values():
+            if out:
+                out.append('')
+            signature = ', '.join(f'{p}: {function.types[p].lower()}' for p in function.params)
+            returns = f' -> {function.type.lower()}' if function.type else ''
+            out.append(f'function {function.name}({signature}){returns}')
+            for block in function.blocks:
+                out.append(f'  {block.label}:')
+                out.extend(f'    {instr}' for instr in block.instrs)
+        return '\n'.join(out)
+
+# ------------------------------
+# Traducción desde el árbol
+# ------------------------------
+class Lowering:
+    def __init__(self):
+        self.module = None
+        self.signatures = {}    # Nombre de función -> (tipos de parámetros, tipo de retorno)
+
+    def lower(self, program):
+        module = self.module = Module()
+        functions = []
+        for node in program.body:
+            if type(node) is VarDecl and program.name is None:
+                module.globals.setdefault('@' + node.name, node.type)
+            elif type(node) is FunctionDef:
+                self.signatures[node.name] = ([p.type for p in node.params], node.type)
+                functions.append(node)
+        if program.name is not None:
+            module.entry = program.name
+            function = Function(program.name, [], None)
+            module.functions[program.name] = function
+            self.body(function, program.body)
+        else:
+            module.entry = 'main' if 'main' in self.signatures else None
+            for node in functions:
+                function = Function(node.name, [p.name for p in node.params], node.type)
+                for param in node.params:
+                    function.types.setdefault(param.name, param.type)
+                module.functions[node.name] = function
+                self.body(function, node.body)
+        return module
+
+    def body(self, function, statements):
+        self.function = function
+        self.block = function.blocks[0]
+        self.temps = 0
+        for statement in statements:
+            kind = type(statement)
+            if kind is VarDecl:
+                function.types.setdefault(statement.name, statement.type)
+            elif kind is Assign:
+                target = self.variable(statement.target)
+                value = self.expression(statement.value)
+                value = self.convert(value, self.type_of(target), statement.line)
+                self.emit('=', target, (value,), statement.line)
+            elif kind is Call:
+                self.call(statement, None)
+            elif kind is Print:
+                self.emit('print', None, (self.expression(statement.value),), statement.line)
+            elif kind is Return:
+                args = ()
+                if statement.value is not None:
+                    value = self.expression(statement.value)
+                    args = (self.convert(value, function.type, statement.line),)
+                self.emit('return', None, args, statement.line)
+                if statement is not statements[-1]:
+                    self.block = Block(f'dead{len(function.blocks)}')
+                    function.blocks.append(self.block)
+
+    def emit(self, op, dest, args, line, callee=None):
+        self.block.instrs.append(Instr(op, dest, args, line, callee))
+
+    def temp(self, type):
+        self.temps += 1
+        name = f'%{self.temps}'
+        self.function.types[name] = type
+        return name
+
+    def variable(self, name):
+        """Nombre en el IR: las globales llevan '@'"""
+        return name if name in self.function.types else '@' + name
+
+    def type_of(self, operand):
+        if type(operand) is Const:
+            return operand.type
+        if operand.startswith('@'):
+            return self.module.globals[operand]
+        return self.function.types[operand]
+
+    def convert(self, operand, expected, line):
+        if expected == 'FLOAT' and self.type_of(operand) == 'INT':
+            dest = self.temp('FLOAT')
+            self.emit('float', dest, (operand,), line)
+            return dest
+        return operand
+
+    def call(self, node, dest_type, args=None):
+        params, returns = self.signatures[node.name]
+        if args is None:
+            args = [self.expression(arg) for arg in node.args]
+        args = tuple(self.convert(arg, expected, node.line) for arg, expected in zip(args, params))
+        dest = self.temp(returns) if dest_type is not None else None
+        self.emit('call', dest, args, node.line, node.name)
+        return dest
+
+    def expression(self, node):
+        """Emite el código de la expresión; devuelve el operando con su valor"""
+        values = []
+        stack = [(node, False)]
+        while stack:  # Postorden sin recursión, como la construye el parser
+            current, visited = stack.pop()
+            kind = type(current)
+            if kind is Number or kind is Text:
+                values.append(Const(current.value))
+            elif kind is Name:
+                values.append(self.variable(current.id))
+            elif not visited:
+                stack.append((current, True))
+                if kind is BinOp:
+                    stack.append((current.right, False))
+                    stack.append((current.left, False))
+                elif kind is UnaryOp:
+                    stack.append((current.operand, False))
+                else:
+                    stack.extend((arg, False) for arg in reversed(current.args))
+            elif kind is BinOp:
+                right, left = values.pop(), values.pop()
+                types = (self.type_of(left), self.type_of(right))
+                result = 'STRING' if 'STRING' in types else 'FLOAT' if 'FLOAT' in types else 'INT'
+                dest = self.temp(result)
+                self.emit(current.op, dest, (left, right), current.line)
+                values.append(dest)
+            elif kind is UnaryOp:
+                if current.op == '-':
+                    operand = values.pop()
+                    dest = self.temp(self.type_of(operand))
+                    self.emit('neg', dest, (operand,), current.line)
+                    values.append(dest)
+            else:
+                args = values[len(values) - len(current.args):]
+                del values[len(values) - len(current.args):]
+                values.append(self.call(current, True, args))
+        return values[0]
+
+def lower(program):
+    """Traduce el árbol de un programa sin errores a un Module"""
+    return Lowering().lower(program)
+
+# ------------------------------
+# Pases
+# ------------------------------
+def evaluate(op, args):
+    """Valor de una operación sobre constantes, o None si no se puede plegar"""
+    values = [a.value for a in args]
+    if op == '=':
+        return values[0]
+    if op == 'float':
+        return float(values[0])
+    if op == 'neg':
+        return -values[0]
+    left, right = values
+    if op == '+':
+        return left + right
+    if op == '-':
+        return left - right
+    if op == '*':
+        return left * right
+    if right == 0:
+        return None  # La división por cero queda para la ejecución
+    if type(left) is int and type(right) is int:
+        quotient = abs(left) // abs(right)
+        return quotient if (left < 0) == (right < 0) else -quotient
+    return left / right
+
+def fold_constants(module):
+    """Propaga las constantes conocidas y pliega las operaciones sobre constantes.
+
+    Una llamada puede cambiar cualquier global, así que olvida las que tenía.
+    """
+    changed = 0
+    for function in module.functions.values():
+        for block in function.blocks:
+            known = {}      # Local o temporal -> Const
+            known_globals = {}
+            for instr in block.instrs:
+                args = instr.args
+                if any(type(a) is str and (a in known or a in known_globals) for a in args):
+                    args = instr.args = tuple(
+                        (known_globals if a.startswith('@') else known).get(a, a)
+                        if type(a) is str else a for a in args)
+                    changed += 1
+                op, dest = instr.op, instr.dest
+                if op == 'call':
+                    known_globals.clear()
+                if dest is None:
+                    continue
+                target = known_globals if dest.startswith('@') else known
+                if (op == '=' or op == 'float' or op == 'neg' or op in BINARY) \
+                        and all(type(a) is Const for a in args):
+                    value = evaluate(op, args)
+                    if value is not None:
+                        if op != '=':
+                            instr.op, instr.args = '=', (Const(value),)
+                            changed += 1
+                        target[dest] = instr.args[0]
+                        continue
+                target.pop(dest, None)
+    return changed
+
+def propagate_copies(module):
+    """Reemplaza los usos de ``x`` tras ``x = y`` por ``y`` mientras ninguna cambie"""
+    changed = 0
+    for function in module.functions.values():
+        for block in function.blocks:
+            copies = {}     # Destino -> origen
+            users = {}      # Origen -> destinos que lo copian
+            with_globals = []  # Destinos de las copias en las que interviene una global
+            for instr in block.instrs:
+                if any(type(a) is str and a in copies for a in instr.args):
+                    instr.args = tuple(copies.get(a, a) if type(a) is str else a for a in instr.args)
+                    changed += 1
+                if instr.op == 'call':  # Puede cambiar cualquier global
+                    for dest in with_globals:
+                        _forget(copies, users, dest)
+                    with_globals.clear()
+                dest = instr.dest
+                if dest is None:
+                    continue
+                _forget(copies, users, dest)
+                for copy in users.pop(dest, ()):
+                    del copies[copy]
+                source = instr.args[0]
+                if instr.op == '=' and type(source) is str and source != dest:
+                    copies[dest] = source
+                    users.setdefault(source, set()).add(dest)
+                    if dest[0] == '@' or source[0] == '@':
+                        with_globals.append(dest)
+    return changed
+
+def _forget(copies, users, dest):
+    source = copies.pop(dest, None)
+    if source is not None:
+        users[source].discard(dest)
+
+def may_fail(instr):
+    """Puede tener efectos además de asignar su destino: una llamada, una división por cero"""
+    if instr.op == 'call':
+        return True
+    if instr.op == '/':
+        divisor = instr.args[1]
+        return type(divisor) is not Const or divisor.value == 0
+    return False
+
+def eliminate_dead_stores(module):
+    """Quita las asignaciones cuyo valor nadie lee.
+
+    Un local o temporal muere al final de la función; una global, en
+    cambio, sigue viva para quien llame, así que sólo es muerta si se vuelve
+    a asignar antes de leerla y sin una llamada en medio. Las llamadas se
+    conservan siempre aunque su valor no se use, y las divisiones que pueden
+    ser por cero también: el error en ejecución no debe desaparecer.
+    """
+    changed = 0
+    for function in module.functions.values():
+        for block in function.blocks:
+            live = set()
+            overwritten = set()  # Globales asignadas más adelante sin leerse antes
+            kept = []
+            for instr in reversed(block.instrs):
+                dest = instr.dest
+                if dest is not None:
+                    if dest[0] == '@':
+                        dead = dest in overwritten
+                        overwritten.add(dest)
+                    else:
+                        dead = dest not in live
+                        live.discard(dest)
+                    if dead and not may_fail(instr):
+                        changed += 1
+                        continue
+                    if dead and instr.op == 'call':
+                        instr.dest = None
+                        changed += 1
+                if instr.op == 'call':
+                    overwritten.clear()
+                for a in instr.args:
+                    if type(a) is str:
+                        live.add(a)
+                        overwritten.discard(a)
+                kept.append(instr)
+            kept.reverse()
+            block.instrs = kept
+    return changed
+
+def remove_unreachable(module):
+    """Quita los bloques que siguen a un 'return': sin saltos, nada llega a ellos"""
+    changed = 0
+    for function in module.functions.values():
+        changed += sum(len(block.instrs) for block in function.blocks[1:])
+        del function.blocks[1:]
+    return changed
+
+def remove_unused_functions(module):
+    """Quita las funciones a las que no se llega desde la de entrada.
+
+    Sin función de entrada (un módulo sin 'main') se conservan todas.
+    """
+    if module.entry not in module.functions:
+        return 0
+    reached = {module.entry}
+    pending = [module.entry]
+    while pending:
+        for block in module.functions[pending.pop()].blocks:
+            for instr in block.instrs:
+                if instr.op == 'call' and instr.callee not in reached:
+                    reached.add(instr.callee)
+                    pending.append(instr.callee)
+    unused = [name for name in module.functions if name not in reached]
+    for name in unused:
+        del module.functions[name]
+    return len(unused)
+
+PASSES = {
+    'fold': fold_constants,
+    'copies': propagate_copies,
+    'dead-stores': eliminate_dead_stores,
+    'unreachable': remove_unreachable,
+    'unused-functions': remove_unused_functions,
+}
+
+# Pases de cada nivel, en orden; la copia propagada puede dejar más constantes
+OPT_LEVELS = {
+    0: (),
+    1: ('fold', 'dead-stores', 'unreachable'),
+    2: ('fold', 'copies', 'fold', 'dead-stores', 'unreachable', 'unused-functions'),
+}
+
+class PassManager:
+    def __init__(self, passes, stats=None):
+        self.passes = [(name, PASSES[name]) for name in passes]
+        self.stats = stats      # Con un stats.Stats se mide cada pase
+
+    @classmethod
+    def for_level(cls, level, stats=None):
+        return cls(OPT_LEVELS[level], stats)
+
+    def run(self, module):
+        stats = self.stats
+        if stats is not None:
+            stats.count('ir.instructions.before', module.instructions())
+        for name, function in self.passes:
+            if stats is None:
+                function(module)
+                continue
+            with stats.phase('opt.' + name):
+                changed = function(module)
+            stats.count('opt.' + name + '.changed', changed)
+        if stats is not None:
+            stats.count('ir.instructions.after', module.instructions())
+        return module
+
+def lower_source(text):
+    """Analiza ``text`` y lo traduce; devuelve (Module o None, errores)"""
+    lexer = Lexer(recover=True)
+    parser = Parser(lexer.tokenize(text))
+    tree = parser.parse()
+    errors, _ = merge(lexer.errors, parser.errors)
+    if errors or tree is None:
+        return None, errors
+    return lower(tree), []
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Traduce un programa a código de tres direcciones")
+    ap.add_argument('source')
+    ap.add_argument('-O', '--opt-level', type=int, choices=sorted(OPT_LEVELS), default=1)
+    ap.add_argument('--time-passes', action='store_true',
+                    help="tiempo y cambios de cada pase (en stderr)")
+    ap.add_argument('--stats-format', choices=('text', 'json'), default='text',
+                    help="formato de --time-passes")
+    args = ap.parse_args(argv)
+
+    try:
+        with open(args.source, encoding='utf-8', errors='replace') as f:
+            text = f.read()
+    except FileNotFoundError:
+        print(f"Error: Archivo '{args.source}' no encontrado")
+        return 1
+    module, errors = lower_source(text)
+    if module is None:
+        print("\n[ERRORES ENCONTRADOS]:")
+        for error in errors:
+            print(f"- {error}")
+        return 1
+
+    stats = Stats(memory=False) if args.time_passes else None
+    PassManager.for_level(args.opt_level, stats).run(module)
+    print(module)
+    if stats is not None:
+        print(stats.to_text() if args.stats_format == 'text' else stats.to_json(), file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
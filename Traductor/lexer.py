@@ -1,53 +1,215 @@
-import re
+import os
+from array import array
+from bisect import bisect_right
 from collections import namedtuple
 
+from diagnostics import Diagnostic
+from scanner import Scanner
+
 Token = namedtuple('Token', ['type', 'value', 'line', 'column'])
 
+# Códigos enteros de cada tipo de token para TokenBuffer
+TOKEN_KINDS = (
+    'EOF', 'NUMBER', 'ID', 'ASSIGN', 'SEMI', 'LPAREN', 'RPAREN', 'LBRACE',
+    'RBRACE', 'COLON', 'COMMA', 'OP', 'STRING', 'VAR', 'INT', 'FLOAT',
+    'PRINT', 'PROGRAM', 'RETURN', 'TEXT',
+)
+KIND_CODES = {kind: code for code, kind in enumerate(TOKEN_KINDS)}
+
+
+class TokenBuffer:
+    """Secuencia compacta de tokens respaldada por arrays.
+
+    Guarda por token un código de tipo (1 byte), su posición y su longitud
+    en el texto fuente. El valor se decodifica del fuente sólo cuando se
+    pide, y la línea/columna se calcula con bisect sobre el índice de
+    inicios de línea. Se indexa e itera como una lista de ``Token``.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        offset_type = 'I' if len(text) < 1 << 32 else 'Q'
+        self.kinds = array('B')
+        self.starts = array(offset_type)
+        self.lengths = array(offset_type)
+        self.line_starts = array(offset_type, [0])
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        kind = TOKEN_KINDS[self.kinds[index]]
+        start = self.starts[index]
+        line, column = self.position(start)
+        return Token(kind, self._value(kind, start, self.lengths[index]), line, column)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, kind, start, length):
+        self.kinds.append(KIND_CODES[kind])
+        self.starts.append(start)
+        self.lengths.append(length)
+
+    def kind(self, index):
+        return TOKEN_KINDS[self.kinds[index]]
+
+    def value(self, index):
+        return self._value(self.kind(index), self.starts[index], self.lengths[index])
+
+    def position(self, offset):
+        """Devuelve (línea, columna) de un desplazamiento en el texto."""
+        line = bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1] + 1
+
+    def _value(self, kind, start, length):
+        raw = self.text[start:start + length]
+        if kind == 'NUMBER':
+            return float(raw) if '.' in raw else int(raw)
+        return raw
+
 class LexerError(Exception):
-    pass
+    """Error léxico; ``diagnostic`` lo describe y ``str`` lo formatea"""
+
+    def __init__(self, diagnostic):
+        super().__init__(diagnostic)
+        self.diagnostic = diagnostic
+
+    def __str__(self):
+        return str(self.diagnostic)
+
+TOKEN_SPECIFICATION = (
+    ('NUMBER',   r'\d+(\.\d*)?'),      # Enteros o flotantes
+    ('ID',       r'[A-Za-z_]\w*'),     # Identificadores
+    ('ASSIGN',   r'='),                # Asignación =
+    ('SEMI',     r';'),                # Punto y coma
+    ('LPAREN',   r'\('),               # Paréntesis izquierdo
+    ('RPAREN',   r'\)'),               # Paréntesis derecho
+    ('LBRACE',   r'\{'),               # Llave izquierda
+    ('RBRACE',   r'\}'),               # Llave derecha
+    ('COLON',    r':'),                # Dos puntos
+    ('COMMA',    r','),                # Coma
+    ('OP',       r'[+\-*/]'),          # Operadores aritméticos
+    ('NEWLINE',  r'\n'),               # Nueva línea
+    ('SKIP',     r'[ \t]+'),           # Espacios y tabs (se ignoran)
+    ('TEXT',     r'"[^"\n]*"'),        # Cadenas entre comillas dobles
+    ('UNCLOSED', r'"[^"\n]*'),         # Cadena sin cerrar antes del fin de línea
+    # Racha de caracteres que no pueden empezar ningún token
+    ('MISMATCH', r'[^\dA-Za-z_ \t\n=;(){}:,+\-*/"]+'),
+)
+
+KEYWORDS = {
+    'var': 'VAR',
+    'int': 'INT',
+    'float': 'FLOAT',
+    'string': 'STRING',
+    'print': 'PRINT',
+    'program': 'PROGRAM',
+    'return': 'RETURN',
+}
+
+SCANNER = Scanner(TOKEN_SPECIFICATION, KEYWORDS)
 
 class Lexer:
-    def __init__(self):
+    """Analizador léxico.
+
+    Por omisión el primer carácter inválido lanza LexerError. Con
+    ``recover=True`` cada racha de caracteres inválidos y cada cadena sin
+    cerrar se registra en ``errors`` como un único Diagnostic, se emite un
+    token ERROR (que el Parser descarta) y el análisis sigue. TokenBuffer no
+    guarda los tokens ERROR: sus índices son los que ve el Parser.
+    """
+
+    def __init__(self, recover=False):
+        self.recover = recover
+        self.errors = []
         self.text = ''
         self.pos = 0
         self.line = 1
         self.column = 1
-        self.token_specification = [
-            ('NUMBER',   r'\d+(\.\d*)?'),      # Enteros o flotantes
-            ('ID',       r'[A-Za-z_]\w*'),     # Identificadores
-            ('ASSIGN',   r'='),                # Asignación =
-            ('SEMI',     r';'),                # Punto y coma
-            ('LPAREN',   r'\('),               # Paréntesis izquierdo
-            ('RPAREN',   r'\)'),               # Paréntesis derecho
-            ('LBRACE',   r'\{'),               # Llave izquierda
-            ('RBRACE',   r'\}'),               # Llave derecha
-            ('COLON',    r':'),                # Dos puntos
-            ('COMMA',    r','),                # Coma
-            ('OP',       r'[+\-*/]'),          # Operadores aritméticos
-            ('NEWLINE',  r'\n'),               # Nueva línea
-            ('SKIP',     r'[ \t]+'),           # Espacios y tabs (se ignoran)
-            ('STRING',   r'"[^"\n]*"'),        # Cadenas entre comillas dobles
-            ('MISMATCH', r'.'),                # Cualquier otro carácter no válido
-        ]
-        self.keywords = {
-            'var': 'VAR',
-            'int': 'INT',
-            'float': 'FLOAT',
-            'string': 'STRING',
-            'print': 'PRINT',
-            'program': 'PROGRAM',
-        }
-        self.regex = re.compile('|'.join(
-            f'(?P<{name}>{pattern})' for name, pattern in self.token_specification
-        ))
-
-    def tokenize(self, text):
+        # La expresión regular se compila una vez por proceso, no por instancia
+        self.scanner = SCANNER
+        self.token_specification = self.scanner.spec
+        self.keywords = self.scanner.keywords
+        self.regex = self.scanner.regex
+
+    def tokenize(self, text, line=1, column=1):
+        """Tokeniza ``text``; ``line``/``column`` indican dónde empieza en el archivo"""
         self.text = text
         self.pos = 0
+        self.line = line
+        self.column = column
+        self.errors = []
+
+        yield from self._scan(text)
+        yield Token('EOF', '', self.line, self.column)
+
+    def tokenize_buffer(self, text):
+        """Tokeniza ``text`` a un TokenBuffer en lugar de generar tuplas."""
+        buffer = TokenBuffer(text)
+        append = buffer.append
+        line_starts = buffer.line_starts
+        keywords = self.keywords
+        self.errors = []
+
+        for mo in self.regex.finditer(text):
+            kind = mo.lastgroup
+            if kind == 'NEWLINE':
+                line_starts.append(mo.end())
+                continue
+            elif kind == 'SKIP':
+                continue
+            elif kind == 'ID':
+                kind = keywords.get(mo.group(), 'ID')
+            elif kind == 'MISMATCH' or kind == 'UNCLOSED':
+                line, column = buffer.position(mo.start())
+                self.lexical_error(kind, mo.group(), line, column)
+                continue
+            append(kind, mo.start(), mo.end() - mo.start())
+
+        append('EOF', len(text), 0)
+        return buffer
+
+    def tokenize_stream(self, source, chunk_size=1 << 16):
+        """Tokeniza un archivo (ruta u objeto de archivo) leyéndolo por bloques.
+
+        Ningún token cruza un salto de línea, así que cada bloque se analiza
+        hasta su último '\n' y el resto se arrastra al siguiente bloque. La
+        memoria usada depende del tamaño del bloque y de la línea más larga,
+        no del tamaño del archivo.
+        """
+        if isinstance(source, (str, bytes, os.PathLike)):
+            with open(source, encoding='utf-8') as f:
+                yield from self.tokenize_stream(f, chunk_size)
+            return
+
+        self.text = ''
+        self.pos = 0
         self.line = 1
         self.column = 1
+        self.errors = []
+
+        pending = ''
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            pending += chunk
+            cut = pending.rfind('\n') + 1
+            if cut:
+                yield from self._scan(pending[:cut])
+                pending = pending[cut:]
+        if pending:
+            yield from self._scan(pending)
+        yield Token('EOF', '', self.line, self.column)
 
-        for mo in self.regex.finditer(self.text):
+    def _scan(self, text):
+        for mo in self.regex.finditer(text):
             kind = mo.lastgroup
             raw_value = mo.group()
             value = raw_value
@@ -66,10 +228,28 @@ class Lexer:
             elif kind == 'SKIP':
                 self.column += len(value)
                 continue
-            elif kind == 'MISMATCH':
-                raise LexerError(f'Error léxico: Carácter inesperado {value!r} en línea {self.line}, columna {self.column}')
+            elif kind == 'MISMATCH' or kind == 'UNCLOSED':
+                self.lexical_error(kind, value, self.line, self.column)
+                kind = 'ERROR'
 
             yield Token(kind, value, self.line, self.column)
             self.column += len(raw_value)
 
-        yield Token('EOF', '', self.line, self.column)
+    def lexical_error(self, kind, value, line, column):
+        """Registra el error léxico de ``value``, o lo lanza si no se recupera.
+
+        MISMATCH abarca la racha entera de caracteres inválidos contiguos, que
+        se informa como un único diagnóstico (L003): un archivo binario no
+        produce un error por cada byte. Rachas separadas por caracteres
+        válidos (``a@b#c``) son errores distintos.
+        """
+        if not self.recover:
+            if kind == 'UNCLOSED':
+                raise LexerError(Diagnostic('L002', line, column, (), kind))
+            raise LexerError(Diagnostic('L001', line, column, (value[0],), kind))
+        if kind == 'UNCLOSED':
+            self.errors.append(Diagnostic('L002', line, column, (), kind))
+        elif len(value) == 1:
+            self.errors.append(Diagnostic('L001', line, column, (value,), kind))
+        else:
+            self.errors.append(Diagnostic('L003', line, column, (value[0], len(value)), kind))
@@ -1,40 +1,258 @@
-from lexer import Lexer, LexerError
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter
+from cache import ResultCache, DEFAULT_DIR
+from diagnostics import WRITERS, CheckResult, Diagnostic, TextWriter, merge
+from lexer import Lexer
 from parser import Parser
+from parallel import parse_parallel
+from stats import Stats
+import argparse
+import glob
+import os
 import sys
 
-def main():
-    """Coordinador principal del proceso de análisis"""
-    if len(sys.argv) != 2:
-        print("Uso: python main.py <archivo_fuente>")
-        print("Ejemplo: python main.py ejemplos/operaciones.src")
-        return
+SOURCE_PATTERN = '*.src'
+
+# Lexer y caché del proceso actual; en el pool se crean una vez por trabajador
+_lexer = None
+_cache = None
+_max_errors = None
+
+def init_worker(cache_dir=None, max_errors=None):
+    """Compila la expresión regular del lexer una sola vez por proceso"""
+    global _lexer, _cache, _max_errors
+    # Los errores léxicos se informan todos, sin detener el análisis
+    _lexer = Lexer(recover=True)
+    _cache = ResultCache(cache_dir) if cache_dir else None
+    _max_errors = max_errors
+
+def check_file(path, pool=None, jobs=None):
+    """Analiza un archivo y devuelve un CheckResult con sus errores.
+
+    Con ``pool`` (de ``jobs`` procesos), las unidades del archivo se
+    analizan en paralelo.
+    """
+    if _lexer is None:
+        init_worker()
+
+    key = None
+    if _cache is not None:
+        try:
+            key = _cache.key_for_file(path, 'split' if pool is not None else '')
+        except OSError as e:
+            return read_error(path, e)
+        cached = _cache.get(key)
+        if cached is not None:
+            # La caché guarda resultados completos; el límite se aplica aquí
+            errors = [Diagnostic.from_json(e) for e in cached['errors'][:_max_errors]]
+            truncated = _max_errors is not None and len(cached['errors']) >= _max_errors
+            fatal = cached['fatal'] and Diagnostic.from_json(cached['fatal'])
+            return CheckResult(path, fatal, errors, cached['tokens'], truncated)
 
+    result = analyze_file_split(path, pool, jobs) if pool is not None else analyze_file(path)
+    if key is not None and not result.truncated:
+        _cache.put(key, {'fatal': result.fatal and result.fatal.to_json(),
+                         'errors': [e.to_json() for e in result.errors],
+                         'tokens': result.tokens})
+    return result
+
+def read_error(path, error):
+    """Resultado de un archivo que no se pudo abrir o leer (``error`` es un OSError)"""
+    if isinstance(error, FileNotFoundError):
+        return CheckResult(path, Diagnostic('F001', 0, 0, (path,)), [], 0)
+    return CheckResult(path, Diagnostic('F002', 0, 0, (path, error.strerror or str(error))), [], 0)
+
+def check_failed(path, error):
+    """Resultado de un archivo cuyo análisis lanzó ``error`` (p. ej. en un proceso del pool)"""
+    return CheckResult(path, Diagnostic('F003', 0, 0, (path, str(error) or repr(error))), [], 0)
+
+def count_tokens(tokens, counter):
+    """Deja pasar los tokens acumulando cuántos fueron en ``counter[0]``"""
+    for token in tokens:
+        counter[0] += 1
+        yield token
+
+def analyze_file(path):
+    """Analiza un archivo sin consultar la caché"""
+    counter = [0]
+    # Análisis léxico y sintáctico en una sola pasada: el parser consume el
+    # generador del lexer, que lee el archivo por bloques. Los bytes que no
+    # son UTF-8 se leen como U+FFFD y el lexer los informa como inválidos
     try:
-        with open(sys.argv[1], encoding='utf-8') as f:
-            codigo = f.read()
-    except FileNotFoundError:
-        print(f"Error: Archivo '{sys.argv[1]}' no encontrado")
-        return
+        with open(path, encoding='utf-8', errors='replace') as f:
+            tokens = count_tokens(_lexer.tokenize_stream(f), counter)
+            parser = Parser(tokens, max_errors=_max_errors, keep_tree=False)
+            parser.parse()
+            # El parser puede detenerse antes del final; el resto del archivo
+            # se sigue revisando para no perder errores léxicos
+            if not parser.truncated:
+                for _ in tokens:
+                    pass
+    except OSError as e:
+        return read_error(path, e)
+    errors, truncated = merge(_lexer.errors, parser.errors, _max_errors)
+    return CheckResult(path, None, errors, counter[0], truncated or parser.truncated)
 
-    # Análisis léxico
-    lexer = Lexer()  # ✅ Sin argumentos
+def analyze_file_split(path, pool, jobs):
+    """Como analyze_file, repartiendo las unidades entre los ``jobs`` de ``pool``"""
     try:
-        tokens = list(lexer.tokenize(codigo))  # ✅ Aquí se pasa el texto fuente
-    except LexerError as e:
-        print(f"\n[ERROR LÉXICO]: {str(e)}")
+        with open(path, encoding='utf-8', errors='replace') as f:
+            text = f.read()
+    except OSError as e:
+        return read_error(path, e)
+    errors, tokens, truncated = parse_parallel(text, pool, jobs, max_errors=_max_errors, recover=True)
+    return CheckResult(path, None, errors, tokens, truncated)
+
+def analyze_file_stats(path, stats):
+    """Como analyze_file, midiendo cada fase en ``stats`` (un stats.Stats).
+
+    El archivo se lee entero y se tokeniza a una lista para medir esas fases
+    por separado. Los tipos se siguen comprobando durante el análisis
+    sintáctico, como sin --stats, así que ambos forman una sola fase: los
+    diagnósticos son los mismos.
+    """
+    if _lexer is None:
+        init_worker()
+    try:
+        with stats.phase('read'):
+            with open(path, encoding='utf-8', errors='replace') as f:
+                text = f.read()
+    except OSError as e:
+        return read_error(path, e)
+    with stats.phase('lex'):
+        tokens = list(_lexer.tokenize(text))
+    stats.update(Counter(token.type for token in tokens), 'tokens.')
+
+    parser = Parser(tokens, max_errors=_max_errors, keep_tree=False)
+    with stats.phase('parse+semantics'):
+        parser.parse()
+
+    errors, truncated = merge(_lexer.errors, parser.errors, _max_errors)
+    stats.update(Counter(error.code for error in errors), 'errors.')
+    return CheckResult(path, None, errors, len(tokens), truncated or parser.truncated)
+
+def sources(directory):
+    """Archivos fuente bajo ``directory``, recursivamente y ordenados"""
+    return sorted(glob.glob(os.path.join(directory, '**', SOURCE_PATTERN), recursive=True))
+
+def expand_paths(args):
+    """Convierte archivos, directorios y patrones glob en una lista ordenada"""
+    paths = []
+    for arg in args:
+        if os.path.isdir(arg):
+            matches = sources(arg)
+        elif any(c in arg for c in '*?['):
+            # Un directorio que coincide con el patrón se recorre como si se
+            # hubiera pasado solo; de lo demás sólo interesan los archivos
+            matches = []
+            for match in sorted(glob.glob(arg, recursive=True)):
+                if os.path.isdir(match):
+                    matches += sources(match)
+                elif os.path.isfile(match):
+                    matches.append(match)
+        else:
+            matches = [arg]
+        paths.extend(matches)
+    return list(dict.fromkeys(paths))
+
+def check_paths(paths, jobs, cache_dir=None, split=False, max_errors=None):
+    """Genera los resultados en el mismo orden que ``paths``.
+
+    Con ``split`` los archivos se recorren de a uno y el pool reparte las
+    unidades de cada archivo, lo que conviene para pocos archivos grandes.
+    """
+    if split and jobs > 1:
+        init_worker(cache_dir, max_errors)
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for path in paths:
+                yield check_file(path, pool, jobs)
         return
+    if jobs <= 1 or len(paths) <= 1:
+        init_worker(cache_dir, max_errors)
+        yield from map(check_file, paths)
+        return
+    chunksize = max(1, len(paths) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker,
+                             initargs=(cache_dir, max_errors)) as pool:
+        yield from pool.map(check_file, paths, chunksize=chunksize)
+
+def main(argv=None):
+    """Coordinador principal del proceso de análisis"""
+    ap = argparse.ArgumentParser(description="Analizador léxico y sintáctico de Traductor")
+    ap.add_argument('sources', nargs='*', help="archivos, directorios o patrones glob")
+    ap.add_argument('-j', '--jobs', type=int, default=None,
+                    help="procesos trabajadores (por defecto, uno por CPU)")
+    ap.add_argument('--cache-dir', default=DEFAULT_DIR,
+                    help=f"directorio de la caché de resultados (por defecto, {DEFAULT_DIR})")
+    ap.add_argument('--no-cache', action='store_true',
+                    help="analizar todo sin leer ni escribir la caché")
+    ap.add_argument('--max-errors', type=int, default=None, metavar='N',
+                    help="detener el análisis de cada archivo tras N errores")
+    ap.add_argument('--split', action='store_true',
+                    help="repartir las unidades de cada archivo entre los procesos")
+    ap.add_argument('--format', choices=sorted(WRITERS), default='text',
+                    help="formato de salida: text, jsonl (un diagnóstico por línea) o sarif")
+    ap.add_argument('--stats', action='store_true',
+                    help="medir tiempo y memoria de cada fase (en secuencia, sin caché) "
+                         "e imprimirlos en stderr")
+    ap.add_argument('--stats-format', choices=('text', 'json'), default='text',
+                    help="formato de --stats")
+    ap.add_argument('--watch', metavar='DIR',
+                    help="vigilar DIR y volver a analizar cada archivo que cambie")
+    ap.add_argument('--interval', type=float, default=0.5,
+                    help="segundos entre revisiones de --watch (por defecto, %(default)s)")
+    ap.add_argument('--debounce', type=float, default=0.2,
+                    help="segundos sin cambios antes de analizar (por defecto, %(default)s)")
+    args = ap.parse_args(argv)
+    if args.max_errors is not None and args.max_errors < 1:
+        ap.error("--max-errors debe ser mayor que cero")
+    if args.stats and (args.jobs is not None or args.split):
+        ap.error("--stats analiza en secuencia: no admite --jobs ni --split")
+    jobs = args.jobs or os.cpu_count() or 1
 
-    # Análisis sintáctico
-    parser = Parser(tokens)
-    parser.parse()
+    cache_dir = None if args.no_cache else args.cache_dir
+    if args.watch is not None:
+        if args.format == 'sarif':
+            ap.error("--watch no admite --format sarif (es un único documento)")
+        import watch
+        writer = TextWriter(sys.stdout, True) if args.format == 'text' else WRITERS[args.format](sys.stdout)
+        return watch.run(args.watch, writer, jobs, cache_dir, args.max_errors,
+                         args.interval, args.debounce)
 
-    # Mostrar errores encontrados
-    if parser.errors:
-        print("\n[ERRORES ENCONTRADOS]:")
-        for error in parser.errors:
-            print(f"- {error}")
+    if not args.sources:
+        print("Uso: python main.py [--jobs N] <archivo_fuente|directorio|patrón>...")
+        print("       python main.py --watch <directorio>")
+        print("Ejemplo: python main.py ejemplos/operaciones.src")
+        return 2
+
+    paths = expand_paths(args.sources)
+    if not paths:
+        print("Error: ningún archivo coincide con los argumentos")
+        return 1
+
+    if args.format == 'text':
+        writer = TextWriter(sys.stdout, len(paths) > 1)
+    else:
+        writer = WRITERS[args.format](sys.stdout)
+    stats = None
+    if args.stats:
+        stats = Stats()
+        init_worker(None, args.max_errors)
+        results = (analyze_file_stats(path, stats) for path in paths)
     else:
-        print("\n[ÉXITO] Análisis completado correctamente")
+        results = check_paths(paths, jobs, cache_dir, args.split, args.max_errors)
+    ok = True
+    writer.begin()
+    # Cada resultado se escribe apenas llega, sin esperar al resto
+    for result in results:
+        writer.write(result)
+        ok = ok and result.fatal is None and not result.errors
+    writer.end()
+    if stats is not None:
+        print(stats.to_text() if args.stats_format == 'text' else stats.to_json(), file=sys.stderr)
+    if cache_dir:
+        ResultCache(cache_dir).evict()
+    return 0 if ok else 1
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,268 @@
+"""Árbol sintáctico (AST) que construye el Parser.
+
+Hay dos representaciones, elegidas con el ``builder`` del Parser:
+
+- NodeBuilder (por omisión): un objeto por nodo, con ``__slots__``. Un nodo
+  ocupa 48-56 bytes (CPython 3.x, 64 bits) más la lista de hijos de los que
+  tienen varios (56 bytes + 8 por hijo); los valores son los de los tokens.
+- NodeArena: estructura de arrays para programas muy grandes. Un nodo es un
+  índice en arrays de tipo (1 byte), tipo declarado (1 byte), índice de su
+  token (4 bytes) y rango de hijos (4 + 4 bytes), más 4 bytes por hijo:
+  unos 14 bytes por nodo. Los lexemas y posiciones no se copian: se leen de
+  la secuencia de tokens (p. ej. un TokenBuffer) con el índice guardado.
+
+El parser construye los nodos de abajo hacia arriba y llama siempre a
+``build(kind, token, index, children, declared)``: ``token`` es el token
+principal del nodo (el identificador, el número, el operador o el 'return'),
+``index`` su posición en la entrada y ``declared`` el tipo de token del tipo
+declarado ('INT', ...).
+"""
+from array import array
+
+from lexer import KIND_CODES, TOKEN_KINDS
+
+# Tipos de nodo
+(PROGRAM, FUNCTION, PARAM, VAR_DECL, ASSIGN, CALL, NAME, NUMBER, RETURN, BINOP, UNARY,
+ PRINT, TEXT) = range(13)
+NODE_KINDS = ('PROGRAM', 'FUNCTION', 'PARAM', 'VAR_DECL', 'ASSIGN', 'CALL', 'NAME', 'NUMBER',
+              'RETURN', 'BINOP', 'UNARY', 'PRINT', 'TEXT')
+
+class Node:
+    __slots__ = ('line', 'column')
+
+    def __eq__(self, other):
+        # Con una pila explícita: una expresión muy anidada superaría el
+        # límite de recursión de Python
+        stack = [(self, other)]
+        while stack:
+            a, b = stack.pop()
+            if isinstance(a, Node):
+                if type(a) is not type(b) or (a.line, a.column) != (b.line, b.column):
+                    return False
+                stack.extend((getattr(a, f), getattr(b, f)) for f in a.__slots__)
+            elif type(a) is list:
+                if type(b) is not list or len(a) != len(b):
+                    return False
+                stack.extend(zip(a, b))
+            elif a != b:
+                return False
+        return True
+
+    def __repr__(self):
+        args = ', '.join(f'{f}={getattr(self, f)!r}' for f in self.__slots__)
+        return f'{type(self).__name__}({args})'
+
+class Program(Node):
+    __slots__ = ('name', 'body')  # name es None en el dialecto C
+
+    def __init__(self, name, body, line, column):
+        self.line = line
+        self.column = column
+        self.name = name
+        self.body = body
+
+class FunctionDef(Node):
+    __slots__ = ('type', 'name', 'params', 'body')
+
+    def __init__(self, type, name, params, body, line, column):
+        self.line = line
+        self.column = column
+        self.type = type
+        self.name = name
+        self.params = params
+        self.body = body
+
+class Param(Node):
+    __slots__ = ('type', 'name')
+
+    def __init__(self, type, name, line, column):
+        self.line = line
+        self.column = column
+        self.type = type
+        self.name = name
+
+class VarDecl(Node):
+    __slots__ = ('type', 'name')
+
+    def __init__(self, type, name, line, column):
+        self.line = line
+        self.column = column
+        self.type = type
+        self.name = name
+
+class Assign(Node):
+    __slots__ = ('target', 'value')
+
+    def __init__(self, target, value, line, column):
+        self.line = line
+        self.column = column
+        self.target = target
+        self.value = value
+
+class Call(Node):
+    __slots__ = ('name', 'args')
+
+    def __init__(self, name, args, line, column):
+        self.line = line
+        self.column = column
+        self.name = name
+        self.args = args
+
+class Return(Node):
+    __slots__ = ('value',)  # None en un 'return;' sin valor
+
+    def __init__(self, value, line, column):
+        self.line = line
+        self.column = column
+        self.value = value
+
+class Print(Node):
+    __slots__ = ('value',)
+
+    def __init__(self, value, line, column):
+        self.line = line
+        self.column = column
+        self.value = value
+
+class BinOp(Node):
+    __slots__ = ('op', 'left', 'right')
+
+    def __init__(self, op, left, right, line, column):
+        self.line = line
+        self.column = column
+        self.op = op
+        self.left = left
+        self.right = right
+
+class UnaryOp(Node):
+    __slots__ = ('op', 'operand')
+
+    def __init__(self, op, operand, line, column):
+        self.line = line
+        self.column = column
+        self.op = op
+        self.operand = operand
+
+class Name(Node):
+    __slots__ = ('id',)
+
+    def __init__(self, id, line, column):
+        self.line = line
+        self.column = column
+        self.id = id
+
+class Number(Node):
+    __slots__ = ('value',)
+
+    def __init__(self, value, line, column):
+        self.line = line
+        self.column = column
+        self.value = value
+
+class Text(Node):
+    __slots__ = ('value',)  # Sin las comillas
+
+    def __init__(self, value, line, column):
+        self.line = line
+        self.column = column
+        self.value = value
+
+class NodeBuilder:
+    """Construye objetos Node"""
+
+    def build(self, kind, token, index, children=(), declared=None):
+        # Ordenado de los nodos más frecuentes a los menos
+        if kind == NAME:
+            return Name(token.value, token.line, token.column)
+        if kind == NUMBER:
+            return Number(token.value, token.line, token.column)
+        if kind == BINOP:
+            return BinOp(token.value, children[0], children[1], token.line, token.column)
+        if kind == CALL:
+            return Call(token.value, children, token.line, token.column)
+        if kind == ASSIGN:
+            return Assign(token.value, children[0], token.line, token.column)
+        if kind == VAR_DECL:
+            return VarDecl(declared, token.value, token.line, token.column)
+        if kind == UNARY:
+            return UnaryOp(token.value, children[0], token.line, token.column)
+        if kind == RETURN:
+            return Return(children[0] if children else None, token.line, token.column)
+        if kind == PRINT:
+            return Print(children[0], token.line, token.column)
+        if kind == TEXT:
+            return Text(token.value[1:-1], token.line, token.column)
+        if kind == PARAM:
+            return Param(declared, token.value, token.line, token.column)
+        if kind == FUNCTION:
+            split = 0
+            while split < len(children) and type(children[split]) is Param:
+                split += 1
+            return FunctionDef(declared, token.value, children[:split], children[split:],
+                               token.line, token.column)
+        if token is None:
+            return Program(None, children, 1, 1)
+        return Program(token.value, children, token.line, token.column)
+
+class NodeArena:
+    """Construye el árbol como estructura de arrays; cada nodo es un índice.
+
+    Los parámetros de una función son sus primeros hijos (de tipo PARAM) y
+    el resto su cuerpo. Los nodos de construcciones abandonadas por un error
+    sintáctico quedan en la arena sin ningún padre.
+    """
+
+    NO_TOKEN = 0xFFFFFFFF
+
+    def __init__(self):
+        self.kinds = array('B')
+        self.types = array('B')       # Código de TOKEN_KINDS del tipo declarado, o 0
+        self.tokens = array('I')      # Índice del token principal
+        self.first = array('I')       # Primer hijo en ``children``
+        self.count = array('I')       # Número de hijos
+        self.children = array('I')
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def build(self, kind, token, index, children=(), declared=None):
+        node = len(self.kinds)
+        self.kinds.append(kind)
+        self.types.append(KIND_CODES[declared] if declared else 0)
+        self.tokens.append(self.NO_TOKEN if token is None else index)
+        self.first.append(len(self.children))
+        self.count.append(len(children))
+        self.children.extend(children)
+        return node
+
+    def kind(self, node):
+        return NODE_KINDS[self.kinds[node]]
+
+    def children_of(self, node):
+        first = self.first[node]
+        return self.children[first:first + self.count[node]]
+
+    @property
+    def nbytes(self):
+        arrays = (self.kinds, self.types, self.tokens, self.first, self.count, self.children)
+        return sum(len(a) * a.itemsize for a in arrays)
+
+    def materialize(self, node, tokens):
+        """Convierte el nodo en objetos Node leyendo los tokens de ``tokens``"""
+        builder = NodeBuilder()
+        built = {}
+        stack = [node]
+        while stack:  # Postorden sin recursión: el árbol puede ser muy profundo
+            current = stack[-1]
+            children = self.children_of(current)
+            pending = [child for child in children if child not in built]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+            index = self.tokens[current]
+            token = None if index == self.NO_TOKEN else tokens[index]
+            declared = TOKEN_KINDS[self.types[current]] if self.types[current] else None
+            built[current] = builder.build(self.kinds[current], token, index,
+                                           [built[child] for child in children], declared)
+        return built[node]
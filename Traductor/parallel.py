@@ -0,0 +1,158 @@
+"""Análisis en paralelo de las unidades de nivel superior de un archivo grande.
+
+Un prebarrido con TokenBuffer (sólo tipo y posición de cada token) ubica los
+límites entre unidades ``function_or_declaration`` contando llaves, y las
+agrupa en trozos de tamaño parecido. Cada trabajador vuelve a tokenizar su
+trozo a partir de la línea y columna donde empieza, así que sus errores ya
+salen con posiciones globales y basta concatenarlos en orden.
+
+El mismo prebarrido reconoce las declaraciones globales (``tipo id ;`` y las
+cabeceras ``tipo id ( parámetros )``), y cada trozo recibe las de los trozos
+anteriores para resolver nombres y detectar redeclaraciones.
+
+Cada trozo se analiza desde cero, por lo que si la recuperación de errores
+de una unidad rota consumiría tokens de la unidad siguiente, los errores en
+cascada pueden diferir de los de un análisis secuencial; el primer error de
+cada unidad es siempre el mismo.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+from diagnostics import merge
+from lexer import KIND_CODES, TOKEN_KINDS, Lexer
+from parser import ErrorLimitReached, Parser
+from symbol_table import SemanticError, SymbolTable
+
+LBRACE = KIND_CODES['LBRACE']
+RBRACE = KIND_CODES['RBRACE']
+SEMI = KIND_CODES['SEMI']
+PROGRAM = KIND_CODES['PROGRAM']
+ID = KIND_CODES['ID']
+LPAREN = KIND_CODES['LPAREN']
+RPAREN = KIND_CODES['RPAREN']
+COMMA = KIND_CODES['COMMA']
+TYPES = frozenset(KIND_CODES[kind] for kind in ('INT', 'FLOAT', 'STRING'))
+
+MIN_CHUNK_TOKENS = 20000
+
+def unit_starts(kinds):
+    """Índices de los tokens que abren cada unidad de nivel superior"""
+    starts = [0]
+    depth = 0
+    for index, kind in enumerate(kinds):
+        if kind == LBRACE:
+            depth += 1
+        elif kind == RBRACE:
+            depth -= 1
+            if depth <= 0:
+                starts.append(index + 1)
+                depth = 0
+        elif kind == SEMI and depth == 0:
+            starts.append(index + 1)
+    return starts
+
+def declare_global(buffer, start, symbols):
+    """Declara en ``symbols`` la declaración global que abre la unidad, si la hay"""
+    kinds = buffer.kinds
+    if kinds[start] not in TYPES or kinds[start + 1] != ID:
+        return
+    declared = TOKEN_KINDS[kinds[start]]
+    name = buffer.value(start + 1)
+    i = start + 2
+    try:
+        if kinds[i] == SEMI:
+            symbols.declare_variable(name, declared)
+        elif kinds[i] == LPAREN:
+            params = []
+            i += 1
+            while kinds[i] in TYPES and kinds[i + 1] == ID:
+                params.append(TOKEN_KINDS[kinds[i]])
+                i += 2
+                if kinds[i] != COMMA:
+                    break
+                i += 1
+            if kinds[i] == RPAREN and kinds[i - 1] != COMMA:
+                symbols.declare_function(name, declared, params)
+    except SemanticError:
+        pass  # La redeclaración la informa el trozo que la contiene
+
+def split_chunks(text, buffer, pieces, max_errors=None, recover=False):
+    """Corta el texto en a lo sumo ``pieces`` trozos que respetan las unidades.
+
+    Devuelve tuplas (texto, línea, columna, globales, max_errors, recover)
+    con la posición de inicio de cada trozo en el archivo y las
+    declaraciones globales de los trozos anteriores.
+    """
+    count = len(buffer) - 1  # Sin EOF
+    target = max(MIN_CHUNK_TOKENS, -(-count // pieces))
+    symbols = SymbolTable()
+    cuts = [0]
+    seen = [0]
+    for start in unit_starts(buffer.kinds[:count]):
+        if start >= count:
+            break
+        if start - cuts[-1] >= target:
+            cuts.append(start)
+            seen.append(len(symbols.declared))
+        declare_global(buffer, start, symbols)
+
+    chunks = []
+    for i, cut in enumerate(cuts):
+        begin = buffer.starts[cut] if i else 0
+        end = buffer.starts[cuts[i + 1]] if i + 1 < len(cuts) else len(text)
+        line, column = buffer.position(begin)
+        chunks.append((text[begin:end], line, column, symbols.declared[:seen[i]], max_errors,
+                       recover))
+    return chunks
+
+def parse_chunk(chunk):
+    """Devuelve (errores, si se detuvo al llegar a max_errors)"""
+    text, line, column, globals, max_errors, recover = chunk
+    lexer = Lexer(recover)
+    parser = Parser(lexer.tokenize(text, line, column), symbols=SymbolTable(globals),
+                    max_errors=max_errors, keep_tree=False)
+    try:
+        parser.program_c_style()
+    except ErrorLimitReached:
+        parser.truncated = True
+    errors, truncated = merge(lexer.errors, parser.errors, max_errors)
+    return errors, truncated or parser.truncated
+
+def parse_parallel(text, pool=None, jobs=None, max_errors=None, recover=False):
+    """Analiza ``text`` repartiendo sus unidades entre procesos.
+
+    Devuelve (errores, número de tokens, truncado). Sin ``recover`` lanza
+    LexerError igual que el análisis secuencial; con él, los errores léxicos
+    se informan junto con los demás. ``jobs`` es el número de procesos de
+    ``pool``; si no se pasa ``pool`` se crea uno de ese tamaño.
+    """
+    lexer = Lexer(recover)
+    buffer = lexer.tokenize_buffer(text)
+    if buffer.kinds[0] == PROGRAM:
+        # El dialecto con 'program' es un único bloque
+        parser = Parser(buffer, max_errors=max_errors)
+        parser.parse()
+        errors, truncated = merge(lexer.errors, parser.errors, max_errors)
+        return errors, len(buffer), truncated or parser.truncated
+
+    pieces = 4 * (jobs or 1)
+    chunks = split_chunks(text, buffer, pieces, max_errors, recover)
+    if len(chunks) == 1:
+        errors, truncated = _merge([parse_chunk(chunks[0])], max_errors)
+        return errors, len(buffer), truncated
+
+    if pool is None:
+        with ProcessPoolExecutor(max_workers=jobs) as own_pool:
+            errors, truncated = _merge(own_pool.map(parse_chunk, chunks), max_errors)
+    else:
+        errors, truncated = _merge(pool.map(parse_chunk, chunks), max_errors)
+    return errors, len(buffer), truncated
+
+def _merge(parts, max_errors):
+    """Concatena los errores de los trozos en orden, hasta ``max_errors``"""
+    errors = []
+    for part, truncated in parts:
+        errors.extend(part)
+        if truncated or (max_errors is not None and len(errors) >= max_errors):
+            # Los trozos siguientes no llegarían a informarse
+            return errors[:max_errors], True
+    return errors, False
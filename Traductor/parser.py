@@ -1,57 +1,213 @@
-from collections import namedtuple
+import gc
+from collections import deque, namedtuple
+
+from diagnostics import FRIENDLY_NAMES, Diagnostic
+from nodes import (ASSIGN, BINOP, CALL, FUNCTION, NAME, NUMBER, PARAM, PRINT, PROGRAM, RETURN,
+                   TEXT, UNARY, VAR_DECL, NodeBuilder)
+from symbol_table import SemanticError, SymbolTable
+from type_checker import TypeChecker
+
+Token = namedtuple('Token', ['type', 'value', 'line', 'column'])
+
+# Cambiar al modificar la gramática o los mensajes: invalida la caché de resultados
+GRAMMAR_VERSION = 10
+
+class TokenStream:
+    """Lookahead acotado sobre cualquier iterable de tokens.
+
+    Permite que el parser consuma directamente el generador del lexer: sólo
+    se guardan en una cola los tokens pedidos por ``peek`` que aún no se han
+    consumido. Al agotarse la entrada se repite el último token EOF.
+    """
+
+    def __init__(self, tokens):
+        self._tokens = _until_eof(tokens)
+        self._lookahead = deque()
+
+    def next(self):
+        if self._lookahead:
+            return self._lookahead.popleft()
+        return next(self._tokens)
+
+    def peek(self, k=0):
+        """Devuelve el k-ésimo token pendiente sin consumirlo."""
+        while len(self._lookahead) <= k:
+            self._lookahead.append(next(self._tokens))
+        return self._lookahead[k]
+
+def _until_eof(tokens):
+    """Genera los tokens hasta el primer EOF y luego repite ese EOF.
+
+    Omite los tokens ERROR del lexer en modo de recuperación: su error ya
+    quedó registrado.
+    """
+    eof = Token('EOF', '', 1, 1)
+    for token in tokens:
+        kind = token.type
+        if kind == 'EOF':
+            eof = token
+            break
+        if kind != 'ERROR':
+            yield token
+    while True:
+        yield eof
+
+def split_top_level(tokens):
+    """Divide tokens C (sin EOF) en unidades de nivel superior.
+
+    Una unidad termina con un ';' fuera de llaves o con la '}' que cierra
+    su primera llave; un resto sin terminar forma la última unidad. Devuelve
+    la lista de pares (inicio, fin) de índices, con fin exclusivo, y si la
+    última unidad quedó sin terminar.
+    """
+    units = []
+    start = 0
+    depth = 0
+    for index, token in enumerate(tokens):
+        kind = token.type
+        if kind == 'LBRACE':
+            depth += 1
+        elif kind == 'RBRACE':
+            depth -= 1
+            if depth <= 0:
+                units.append((start, index + 1))
+                start = index + 1
+                depth = 0
+        elif kind == 'SEMI' and depth == 0:
+            units.append((start, index + 1))
+            start = index + 1
+    open_tail = start < len(tokens)
+    if open_tail:
+        units.append((start, len(tokens)))
+    return units, open_tail
+
+def split_statements(tokens, start=0):
+    """Divide el cuerpo de un programa con 'program' en sentencias.
+
+    Como split_top_level para tokens[start:] (sin EOF, tras la '{' de la
+    cabecera): cada sentencia termina con ';' y, desde la primera '}', el
+    resto forma la última unidad. Devuelve los pares (inicio, fin), si la
+    última quedó sin terminar y si se encontró la '}'.
+    """
+    units = []
+    for index in range(start, len(tokens)):
+        kind = tokens[index].type
+        if kind == 'RBRACE':
+            units.append((start, len(tokens)))
+            return units, False, True
+        if kind == 'SEMI':
+            units.append((start, index + 1))
+            start = index + 1
+    open_tail = start < len(tokens)
+    if open_tail:
+        units.append((start, len(tokens)))
+    return units, open_tail, False
+
+# Entradas de la pila de operadores de Parser.expression
+_BINARY, _UNARY, _PAREN, _CALL = range(4)
 
 class ParserError(Exception):
     def __init__(self, message, token):
         super().__init__(message)
         self.token = token
 
+class ErrorLimitReached(Exception):
+    """Se alcanzó ``max_errors``: el análisis se detiene"""
+
 class Parser:
-    friendly_names = {
-        'ID': 'identificador',
-        'OP': 'operador',
-        'SEMI': 'punto y coma',
-        'LPAREN': 'paréntesis izquierdo "("',
-        'RPAREN': 'paréntesis derecho ")"',
-        'LBRACE': 'llave izquierda "{"',
-        'RBRACE': 'llave derecha "}"',
-        'COMMA': 'coma ","',
-        'ASSIGN': 'signo de asignación "="',
-        'PROGRAM': 'palabra reservada "program"',
-        'INT': 'tipo entero',
-        'FLOAT': 'tipo flotante',
-        'STRING': 'tipo cadena',
-        'NUMBER': 'número',
-        'EOF': 'fin de archivo',
-    }
+    friendly_names = FRIENDLY_NAMES
 
-    def __init__(self, tokens):
-        self.tokens = tokens
+    # Conjuntos de sincronización del modo pánico. Tras un error en una
+    # sentencia se descartan tokens hasta uno de estos (el ';' se consume)
+    statement_sync = frozenset(('SEMI', 'RBRACE', 'INT', 'FLOAT', 'STRING', 'VAR', 'PRINT', 'EOF'))
+    # Inicio de una declaración de nivel superior (fuera de llaves)
+    declaration_start = frozenset(('INT', 'FLOAT', 'STRING'))
+
+    # Precedencia de los operadores binarios; los unarios ('-x', '+x') van antes
+    precedence = {'+': 1, '-': 1, '*': 2, '/': 2}
+    unary_precedence = 3
+
+    def __init__(self, tokens, builder=None, symbols=None, max_errors=None, keep_tree=True):
+        self.tokens = TokenStream(tokens)
         self.pos = 0
-        self.current_token = self.tokens[self.pos]
+        self._next = self.tokens.next
+        self.current_token = self._next()
         self.errors = []
+        self.max_errors = max_errors
+        self.truncated = False  # True si se detuvo al llegar a max_errors
+        self.error_pos = -1     # Posición del último error sintáctico informado
+        # Ver nodes.py: NodeBuilder crea objetos, NodeArena una estructura de arrays
+        self.builder = builder if builder is not None else NodeBuilder()
+        self.build = self.builder.build
+        self.tree = None
+        # Con keep_tree=False el dialecto C descarta cada declaración de nivel
+        # superior una vez comprobada: la memoria no crece con el archivo
+        self.keep_tree = keep_tree
+        self.symbols = symbols if symbols is not None else SymbolTable()
+        # Los tipos se comprueban sobre objetos Node; con NodeArena no
+        self.checker = None
+        if isinstance(self.builder, NodeBuilder):
+            self.checker = TypeChecker(self.symbols, self.semantic_error)
 
     def friendly(self, token_type):
         return self.friendly_names.get(token_type, token_type.lower())
 
+    def syntax_error(self, expected, after=''):
+        """Registra que se esperaba ``expected`` en el token actual y aborta la regla.
+
+        Un segundo error en la misma posición es una cascada del primero y
+        no se informa.
+        """
+        token = self.current_token
+        if self.pos != self.error_pos:
+            self.error_pos = self.pos
+            self.report(self.make_error(expected, after, token))
+        raise ParserError(expected, token)
+
+    def report(self, error):
+        self.errors.append(error)
+        if self.max_errors is not None and len(self.errors) >= self.max_errors:
+            raise ErrorLimitReached()
+
+    def make_error(self, expected, after, token):
+        # El mensaje se arma recién al imprimir el diagnóstico
+        return Diagnostic('S001', token.line, token.column, (expected, after), token.type)
+
+    def semantic_error(self, code, token, *args):
+        """Registra un error semántico sin abortar la regla"""
+        self.report(Diagnostic(code, token.line, token.column, args, token.type))
+
+    def declare_variable(self, name, declared):
+        try:
+            self.symbols.declare_variable(name.value, declared)
+        except SemanticError as e:
+            self.semantic_error(e.code, name, e.name)
+
+    def check_variable(self, name):
+        if self.symbols.get_variable(name.value) is None:
+            self.semantic_error('M003', name, name.value)
+
+    def check_function(self, name):
+        if self.symbols.get_function(name.value) is None:
+            self.semantic_error('M004', name, name.value)
+
     def advance(self):
         self.pos += 1
-        if self.pos < len(self.tokens):
-            self.current_token = self.tokens[self.pos]
-        else:
-            self.current_token = namedtuple('Token', ['type', 'value', 'line', 'column'])('EOF', '', self.current_token.line, self.current_token.column)
+        self.current_token = self._next()
 
     def expect(self, expected_type):
         found = self.current_token.type
         if found == expected_type:
             self.advance()
         else:
-            exp_friendly = self.friendly(expected_type)
-            found_friendly = self.friendly(found)
-            msg = f"[SINTÁCTICO] Se esperaba {exp_friendly} pero se encontró {found_friendly} en línea {self.current_token.line}, columna {self.current_token.column}"
-            self.errors.append(msg)
-            raise ParserError(msg, self.current_token)
+            self.syntax_error(self.friendly(expected_type))
 
     def parse(self):
+        """Analiza la entrada y devuelve el árbol (None si falla la cabecera)"""
+        # El árbol no tiene ciclos: con el recolector activo se recorrería
+        # una y otra vez mientras crece, sin liberar nada
+        gc_enabled = gc.isenabled()
+        gc.disable()
         try:
             if self.current_token.type == 'PROGRAM':
                 self.program_with_program_keyword()
@@ -60,136 +216,347 @@ class Parser:
         except ParserError:
             # Captura para seguir mostrando otros errores
             pass
+        except ErrorLimitReached:
+            self.truncated = True
+        finally:
+            if gc_enabled:
+                gc.enable()
+        return self.tree
 
     def program_with_program_keyword(self):
+        name, index = self.program_header()
+        body = self.statements()
+        self.tree = self.build(PROGRAM, name, index, body)
+        if self.checker:
+            self.checker.check_body(body)
+        self.program_end()
+
+    def program_header(self):
+        """``program nombre [()] {``; devuelve el token del nombre y su posición"""
         self.expect('PROGRAM')
+        name, index = self.current_token, self.pos
         self.expect('ID')      # Nombre programa
-        self.expect('LPAREN')
-        self.expect('RPAREN')
+        if self.current_token.type == 'LPAREN':  # Los paréntesis son opcionales
+            self.advance()
+            self.expect('RPAREN')
         self.expect('LBRACE')
-        self.statements()
+        return name, index
+
+    def program_end(self):
         self.expect('RBRACE')
         self.expect('EOF')
 
     def program_c_style(self):
+        declarations = []
         while self.current_token.type != 'EOF':
+            start = self.pos
             try:
-                self.function_or_declaration()
+                declaration = self.function_or_declaration()
             except ParserError:
-                self.advance()
+                self.skip_declaration()
+                if self.pos == start:
+                    self.advance()
+            else:
+                if self.keep_tree:
+                    declarations.append(declaration)
+        self.tree = self.build(PROGRAM, None, 0, declarations)
+        return self.tree
+
+    def skip_declaration(self):
+        """Modo pánico de nivel superior.
+
+        Descarta hasta el ';' fuera de llaves o la '}' que cierra las llaves
+        abiertas desde el error (ambos se consumen), o hasta el tipo que
+        empieza la declaración siguiente.
+        """
+        depth = 0
+        while True:
+            kind = self.current_token.type
+            if kind == 'EOF':
+                return
+            if kind == 'LBRACE':
+                depth += 1
+            elif kind == 'RBRACE':
+                depth -= 1
+                if depth <= 0:
+                    self.advance()
+                    return
+            elif depth == 0:
+                if kind == 'SEMI':
+                    self.advance()
+                    return
+                if kind in self.declaration_start and self.pos != self.error_pos:
+                    return
+            self.advance()
 
     def function_or_declaration(self):
-        if self.current_token.type in ('INT', 'FLOAT', 'STRING'):
+        declared = self.current_token.type
+        if declared in ('INT', 'FLOAT', 'STRING'):
             self.advance()
         else:
             expected = "tipo (int, float, string)"
-            found_friendly = self.friendly(self.current_token.type)
-            msg = f"[SINTÁCTICO] Se esperaba {expected} pero se encontró {found_friendly} en línea {self.current_token.line}, columna {self.current_token.column}"
-            self.errors.append(msg)
-            raise ParserError(msg, self.current_token)
+            self.syntax_error(expected)
 
+        name, index = self.current_token, self.pos
         self.expect('ID')
 
         if self.current_token.type == 'LPAREN':
-            self.function_definition()
+            children = self.function_definition(name, declared)
+            function = self.build(FUNCTION, name, index, children, declared)
+            if self.checker:
+                self.checker.check_function(function)
+            return function
         elif self.current_token.type == 'SEMI':
             self.advance()
+            self.declare_variable(name, declared)
+            return self.build(VAR_DECL, name, index, (), declared)
         else:
             expected = 'paréntesis izquierdo "(" o punto y coma ";"'
-            found_friendly = self.friendly(self.current_token.type)
-            msg = f"[SINTÁCTICO] Se esperaba {expected} pero se encontró {found_friendly} en línea {self.current_token.line}, columna {self.current_token.column}"
-            self.errors.append(msg)
-            raise ParserError(msg, self.current_token)
+            self.syntax_error(expected)
 
-    def function_definition(self):
+    def function_definition(self, name, declared):
+        """Devuelve los nodos de los parámetros seguidos de los del cuerpo.
+
+        Los parámetros y el cuerpo comparten un ámbito, como en C. La función
+        se declara al cerrar la lista de parámetros, así que puede llamarse a
+        sí misma.
+        """
         self.expect('LPAREN')
-        self.parameter_list()
-        self.expect('RPAREN')
-        self.expect('LBRACE')
-        self.statements()
-        self.expect('RBRACE')
+        self.symbols.enter_scope()
+        try:
+            children, types = self.parameter_list()
+            self.expect('RPAREN')
+            try:
+                self.symbols.declare_function(name.value, declared, types)
+            except SemanticError as e:
+                self.semantic_error(e.code, name, e.name)
+            self.expect('LBRACE')
+            children += self.statements()
+            self.expect('RBRACE')
+        finally:
+            self.symbols.exit_scope()
+        return children
 
     def parameter_list(self):
+        """Devuelve los nodos de los parámetros y sus tipos"""
+        params = []
+        types = []
         if self.current_token.type in ('INT', 'FLOAT', 'STRING'):
-            self.parameter()
+            types.append(self.current_token.type)
+            params.append(self.parameter())
             while self.current_token.type == 'COMMA':
                 self.advance()
-                self.parameter()
+                types.append(self.current_token.type)
+                params.append(self.parameter())
+        return params, types
 
     def parameter(self):
-        if self.current_token.type in ('INT', 'FLOAT', 'STRING'):
+        declared = self.current_token.type
+        if declared in ('INT', 'FLOAT', 'STRING'):
             self.advance()
+            name, index = self.current_token, self.pos
             self.expect('ID')
+            self.declare_variable(name, declared)
+            return self.build(PARAM, name, index, (), declared)
         else:
             expected = "tipo para parámetro"
-            found_friendly = self.friendly(self.current_token.type)
-            msg = f"[SINTÁCTICO] Se esperaba {expected} pero se encontró {found_friendly} en línea {self.current_token.line}, columna {self.current_token.column}"
-            self.errors.append(msg)
-            raise ParserError(msg, self.current_token)
+            self.syntax_error(expected)
 
     def statements(self):
+        body = []
+        sync = self.statement_sync
         while self.current_token.type not in ('RBRACE', 'EOF'):
+            start = self.pos
             try:
-                self.statement()
+                body.append(self.statement())
             except ParserError:
-                self.advance()
+                # Modo pánico: salta al fin de la sentencia o al inicio de otra
+                while self.current_token.type not in sync:
+                    self.advance()
+                if self.current_token.type == 'SEMI':
+                    self.advance()
+                elif self.pos == start:
+                    self.advance()
+        return body
 
     def statement(self):
         if self.current_token.type in ('INT', 'FLOAT', 'STRING'):
-            self.variable_declaration()
+            return self.variable_declaration()
         elif self.current_token.type == 'ID':
-            self.assignment_or_function_call()
+            return self.assignment_or_function_call()
+        elif self.current_token.type == 'RETURN':
+            return self.return_statement()
+        elif self.current_token.type == 'VAR':
+            return self.var_declaration()
+        elif self.current_token.type == 'PRINT':
+            return self.print_statement()
         else:
             expected = "declaración o instrucción"
-            found_friendly = self.friendly(self.current_token.type)
-            msg = f"[SINTÁCTICO] Se esperaba {expected} pero se encontró {found_friendly} en línea {self.current_token.line}, columna {self.current_token.column}"
-            self.errors.append(msg)
-            raise ParserError(msg, self.current_token)
+            self.syntax_error(expected)
 
     def variable_declaration(self):
+        declared = self.current_token.type
         self.advance()
+        name, index = self.current_token, self.pos
         self.expect('ID')
         self.expect('SEMI')
+        self.declare_variable(name, declared)
+        return self.build(VAR_DECL, name, index, (), declared)
+
+    def var_declaration(self):
+        """``var nombre: tipo;``, la forma del dialecto con 'program'"""
+        self.advance()
+        name, index = self.current_token, self.pos
+        self.expect('ID')
+        self.expect('COLON')
+        declared = self.current_token.type
+        if declared not in ('INT', 'FLOAT', 'STRING'):
+            self.syntax_error("tipo", " después de ':'")
+        self.advance()
+        self.expect('SEMI')
+        self.declare_variable(name, declared)
+        return self.build(VAR_DECL, name, index, (), declared)
+
+    def print_statement(self):
+        token, index = self.current_token, self.pos
+        self.advance()
+        self.expect('LPAREN')
+        value = self.expression()
+        self.expect('RPAREN')
+        self.expect('SEMI')
+        return self.build(PRINT, token, index, (value,))
+
+    def return_statement(self):
+        token, index = self.current_token, self.pos
+        self.advance()
+        children = ()
+        if self.current_token.type != 'SEMI':
+            children = (self.expression(),)
+        self.expect('SEMI')
+        return self.build(RETURN, token, index, children)
 
     def assignment_or_function_call(self):
-        id_token = self.current_token
+        id_token, index = self.current_token, self.pos
         self.advance()
         if self.current_token.type == 'ASSIGN':
+            self.check_variable(id_token)
             self.advance()
-            self.expression()
+            value = self.expression()
             self.expect('SEMI')
+            return self.build(ASSIGN, id_token, index, (value,))
         elif self.current_token.type == 'LPAREN':
-            self.function_call()
+            self.check_function(id_token)
+            args = self.function_call()
             self.expect('SEMI')
+            return self.build(CALL, id_token, index, args)
         else:
             expected = "signo de asignación '=' o paréntesis izquierdo '('"
-            found_friendly = self.friendly(self.current_token.type)
-            msg = f"[SINTÁCTICO] Se esperaba {expected} después de identificador pero se encontró {found_friendly} en línea {self.current_token.line}, columna {self.current_token.column}"
-            self.errors.append(msg)
-            raise ParserError(msg, self.current_token)
+            self.syntax_error(expected, " después de identificador")
 
     def function_call(self):
+        """Devuelve los nodos de los argumentos"""
         self.expect('LPAREN')
-        self.argument_list()
+        args = self.argument_list()
         self.expect('RPAREN')
+        return args
 
     def argument_list(self):
+        args = []
         if self.current_token.type not in ('RPAREN',):
-            self.expression()
+            args.append(self.expression())
             while self.current_token.type == 'COMMA':
                 self.advance()
-                self.expression()
+                args.append(self.expression())
+        return args
 
     def expression(self):
-        if self.current_token.type == 'ID':
-            self.advance()
-            if self.current_token.type == 'LPAREN':
-                self.function_call()
-        elif self.current_token.type == 'NUMBER':
-            self.advance()
+        """Expresión aritmética con precedencia, paréntesis y llamadas.
+
+        Shunting-yard sin recursión: ``operators`` guarda los operadores
+        pendientes y las marcas de paréntesis y llamadas abiertos, y
+        ``operands`` los nodos ya construidos. Anidar más sólo hace crecer
+        estas listas, no la pila de Python. Una ',' o ')' sin marca abierta
+        termina la expresión (la consume quien la llamó).
+        """
+        build = self.build
+        precedence = self.precedence
+        operators = []  # (tipo, token, índice, precedencia o inicio de argumentos)
+        operands = []
+        while True:
+            # Se espera un operando
+            token, index = self.current_token, self.pos
+            kind = token.type
+            if kind == 'NUMBER':
+                self.advance()
+                operands.append(build(NUMBER, token, index))
+            elif kind == 'TEXT':
+                self.advance()
+                operands.append(build(TEXT, token, index))
+            elif kind == 'ID':
+                self.advance()
+                if self.current_token.type == 'LPAREN':
+                    self.check_function(token)
+                    self.advance()
+                    if self.current_token.type != 'RPAREN':
+                        operators.append((_CALL, token, index, len(operands)))
+                        continue
+                    self.advance()
+                    operands.append(build(CALL, token, index, []))
+                else:
+                    self.check_variable(token)
+                    operands.append(build(NAME, token, index))
+            elif kind == 'LPAREN':
+                self.advance()
+                operators.append((_PAREN, token, index, None))
+                continue
+            elif kind == 'OP' and token.value in '+-':
+                self.advance()
+                operators.append((_UNARY, token, index, self.unary_precedence))
+                continue
+            else:
+                expected = "expresión"
+                self.syntax_error(expected)
+
+            # Tras un operando: operador binario, cierre o fin de la expresión
+            while True:
+                token = self.current_token
+                kind = token.type
+                if kind == 'OP':
+                    level = precedence[token.value]
+                    while operators and operators[-1][0] <= _UNARY and operators[-1][3] >= level:
+                        self.reduce(operators, operands)
+                    operators.append((_BINARY, token, self.pos, level))
+                    self.advance()
+                    break
+                if kind not in ('RPAREN', 'COMMA'):
+                    while operators:
+                        if operators[-1][0] > _UNARY:
+                            self.syntax_error(self.friendly('RPAREN'))
+                        self.reduce(operators, operands)
+                    return operands[0]
+
+                while operators and operators[-1][0] <= _UNARY:
+                    self.reduce(operators, operands)
+                if not operators:
+                    return operands[0]
+                mark, name, name_index, start = operators[-1]
+                if kind == 'COMMA':
+                    if mark != _CALL:
+                        self.syntax_error(self.friendly('RPAREN'))
+                    self.advance()
+                    break
+                operators.pop()
+                self.advance()
+                if mark == _CALL:
+                    args = operands[start:]
+                    del operands[start:]
+                    operands.append(build(CALL, name, name_index, args))
+
+    def reduce(self, operators, operands):
+        """Aplica el operador del tope de la pila a sus operandos"""
+        kind, token, index, _ = operators.pop()
+        if kind == _UNARY:
+            operands.append(self.build(UNARY, token, index, (operands.pop(),)))
         else:
-            expected = "expresión"
-            found_friendly = self.friendly(self.current_token.type)
-            msg = f"[SINTÁCTICO] Se esperaba {expected} pero se encontró {found_friendly} en línea {self.current_token.line}, columna {self.current_token.column}"
-            self.errors.append(msg)
-            raise ParserError(msg, self.current_token)
+            right = operands.pop()
+            operands.append(self.build(BINOP, token, index, (operands.pop(), right)))
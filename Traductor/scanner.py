@@ -0,0 +1,35 @@
+"""Escáner compartido por todos los lexers del proyecto.
+
+Una especificación es una secuencia de pares ``(tipo, patrón)``. Su expresión
+regular (una alternancia de grupos con nombre) se compila una sola vez por
+proceso y se reutiliza en cada instancia. Las palabras reservadas no forman
+parte del patrón: se resuelven con un diccionario después de reconocer un
+identificador.
+"""
+import re
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def compile_spec(spec):
+    """Compila la alternancia de una especificación (tupla de pares)"""
+    return re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in spec))
+
+class Scanner:
+    def __init__(self, spec, keywords=None, keyword_kind='ID'):
+        self.spec = tuple(tuple(rule) for rule in spec)
+        self.keywords = dict(keywords or {})
+        self.keyword_kind = keyword_kind
+        self.regex = compile_spec(self.spec)
+
+    def scan(self, text, skip=()):
+        """Genera pares (tipo, lexema), omitiendo los tipos de ``skip``"""
+        keywords = self.keywords
+        keyword_kind = self.keyword_kind
+        for mo in self.regex.finditer(text):
+            kind = mo.lastgroup
+            if kind in skip:
+                continue
+            value = mo.group()
+            if kind == keyword_kind:
+                kind = keywords.get(value, kind)
+            yield kind, value
@@ -0,0 +1,205 @@
+"""Servidor de análisis de larga duración sobre un socket Unix.
+
+Evita pagar en cada análisis el arranque del intérprete, la compilación de
+la expresión regular del lexer y la carga de las tablas LR: el servidor los
+prepara una vez y atiende pedidos concurrentes con asyncio. Los archivos se
+analizan en un pool de procesos con los lexers ya creados y los pedidos
+'lr' en un hilo, así que el bucle nunca queda ocupado con un análisis y un
+pedido no demora a los de otras conexiones.
+
+Protocolo: un objeto JSON por línea en cada sentido, con el ``id`` del
+pedido en cada respuesta. Los pedidos de una conexión se responden en orden.
+
+- ``{"op": "check", "paths": [...], "cwd": "..."}``: archivos, directorios o
+  patrones relativos a ``cwd``. Responde ``{"count": n}`` y después un
+  ``{"result": ...}`` por archivo, en orden (ver diagnostics.result_to_json).
+  Si el análisis de un archivo falla, en su lugar va
+  ``{"path": ..., "error": mensaje}`` y se sigue con los demás.
+- ``{"op": "lr", "path": "...", "cwd": "..."}``: analiza el archivo con el
+  parser LR de compilador.py. Responde ``{"valid": bool, "message": ...}``,
+  o ``{"error": mensaje}`` si no se pudo leer el archivo o la tabla LR.
+- ``{"op": "ping"}`` y ``{"op": "shutdown"}``.
+
+Un pedido inválido se responde con ``{"error": mensaje}``. Sin ``cwd``, las
+rutas se toman relativas al directorio del servidor.
+
+Uso: python server.py [--socket RUTA] [--jobs N] [--cache-dir DIR] [--max-errors N]
+"""
+import argparse
+import asyncio
+import errno
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import main
+from client import default_socket
+from diagnostics import Diagnostic, result_to_json
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+class CheckServer:
+    def __init__(self, jobs=None, cache_dir=None, max_errors=None):
+        self.pool = ProcessPoolExecutor(max_workers=jobs, initializer=main.init_worker,
+                                        initargs=(cache_dir, max_errors))
+        self.stopped = None
+        self._lr = None  # (módulo compilador, parser LR), al primer pedido 'lr'
+        self._lr_lock = threading.Lock()
+
+    async def serve(self, path):
+        if os.path.exists(path):
+            try:
+                _, writer = await asyncio.open_unix_connection(path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Quedó de un servidor que terminó sin borrarlo
+                if os.path.exists(path):
+                    os.unlink(path)
+            else:
+                writer.close()
+                self.pool.shutdown()
+                raise OSError(errno.EADDRINUSE, f"ya hay un servidor escuchando en {path}")
+        self.stopped = asyncio.Event()
+        server = await asyncio.start_unix_server(self.handle, path)
+        try:
+            async with server:
+                await self.stopped.wait()
+        finally:
+            if os.path.exists(path):
+                os.unlink(path)
+            self.pool.shutdown(cancel_futures=True)
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("el pedido debe ser un objeto JSON")
+                except ValueError as e:
+                    self.send(writer, {'id': None, 'error': str(e)})
+                    continue
+                await self.dispatch(request, writer)
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # El cliente cerró la conexión, o el servidor se detiene con ella abierta
+            pass
+        finally:
+            writer.close()
+
+    def send(self, writer, response):
+        writer.write(json.dumps(response).encode('utf-8') + b'\n')
+
+    async def dispatch(self, request, writer):
+        request_id = request.get('id')
+        op = request.get('op')
+        try:
+            if op == 'check':
+                await self.check(request_id, request['paths'], request.get('cwd'), writer)
+            elif op == 'lr':
+                path = os.path.join(request.get('cwd') or os.getcwd(), request['path'])
+                result = await asyncio.get_running_loop().run_in_executor(None, self.check_lr, path)
+                self.send(writer, {'id': request_id, **result})
+            elif op == 'ping':
+                self.send(writer, {'id': request_id, 'pong': True})
+            elif op == 'shutdown':
+                self.send(writer, {'id': request_id, 'stopping': True})
+                self.stopped.set()
+            else:
+                self.send(writer, {'id': request_id, 'error': f"operación desconocida: {op!r}"})
+        except (KeyError, TypeError) as e:
+            self.send(writer, {'id': request_id, 'error': f"pedido incompleto: {e}"})
+
+    async def check(self, request_id, args, cwd, writer):
+        cwd = cwd or os.getcwd()
+        paths = [os.path.relpath(path, cwd) if not os.path.isabs(arg) else path
+                 for arg in args
+                 for path in main.expand_paths([os.path.join(cwd, arg)])]
+        paths = list(dict.fromkeys(paths))
+        self.send(writer, {'id': request_id, 'count': len(paths)})
+
+        # Todos los archivos van al pool de entrada; los resultados se envían
+        # en orden a medida que llegan
+        loop = asyncio.get_running_loop()
+        pending = [loop.run_in_executor(self.pool, main.check_file, os.path.join(cwd, path))
+                   for path in paths]
+        for path, future in zip(paths, pending):
+            try:
+                result = await future
+            except Exception as e:
+                # Un archivo que hace fallar al análisis (o al proceso que lo
+                # corría) no corta la respuesta de los demás
+                self.send(writer, {'id': request_id, 'path': path, 'error': str(e) or repr(e)})
+            else:
+                self.send(writer, {'id': request_id, 'result': result_to_json(relative(result, path))})
+            await writer.drain()
+
+    def check_lr(self, path):
+        """Analiza ``path`` con el parser LR; corre en un hilo, fuera del bucle"""
+        try:
+            compilador, parser = self.lr_parser()
+        except (OSError, ValueError) as e:
+            return {'error': f"no se pudo cargar la tabla LR: {e}"}
+        try:
+            with open(path, encoding='utf-8') as f:
+                codes = compilador.lexer_codes(f.read())
+            parser.parse(codes, compilador.EOF_CODE)
+        except (OSError, UnicodeDecodeError) as e:
+            return {'error': str(e)}
+        except SyntaxError as e:
+            return {'valid': False, 'message': str(e)}
+        return {'valid': True, 'message': "¡Análisis exitoso! La entrada es válida."}
+
+    def lr_parser(self):
+        """Devuelve (módulo compilador, parser LR), cargándolos la primera vez.
+
+        compilador.Ir no se versiona: como en compilador.py, se genera desde
+        compilador.gram si falta o quedó atrasado respecto de la gramática.
+        """
+        with self._lr_lock:
+            if self._lr is None:
+                if ROOT not in sys.path:
+                    sys.path.append(ROOT)
+                import compilador
+                table = os.path.join(ROOT, 'compilador.Ir')
+                grammar = os.path.join(ROOT, 'compilador.gram')
+                if not os.path.exists(table) or os.path.getmtime(table) < os.path.getmtime(grammar):
+                    from lalr import generate
+                    generate(grammar, table, compilador.TERMINALS)
+                parser = compilador.lr_parser(*compilador.load_grammar(table))
+                self._lr = (compilador, parser)
+            return self._lr
+
+def relative(result, path):
+    """El resultado con la ruta tal como la escribió el cliente"""
+    fatal = result.fatal
+    if fatal is not None and fatal.code.startswith('F'):
+        fatal = Diagnostic(fatal.code, 0, 0, (path,) + fatal.args[1:])
+    return result._replace(path=path, fatal=fatal)
+
+def run(argv=None):
+    ap = argparse.ArgumentParser(description="Servidor de análisis de Traductor")
+    ap.add_argument('--socket', default=default_socket(), help="ruta del socket Unix")
+    ap.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                    help="procesos para los archivos grandes")
+    ap.add_argument('--cache-dir', default=None, help="caché de resultados en disco (por defecto, ninguna)")
+    ap.add_argument('--max-errors', type=int, default=None, metavar='N')
+    args = ap.parse_args(argv)
+
+    server = CheckServer(args.jobs, args.cache_dir, args.max_errors)
+    print(f"Iniciando el servidor en {args.socket}", file=sys.stderr)
+    try:
+        asyncio.run(server.serve(args.socket))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"Error: {e.strerror}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(run())
@@ -0,0 +1,86 @@
+"""Medición por fases: tiempo, pico de memoria y contadores.
+
+Un Stats acumula, para cada fase (leer, léxico, sintáctico, semántico), el
+tiempo de reloj y el pico de memoria asignada durante ella (con
+tracemalloc), más contadores con nombre: tokens por tipo, errores por
+código, desplazamientos y reducciones del motor LR...
+
+Nada de esto está en el camino normal del análisis: quien quiere medir pasa
+un Stats explícitamente (``main.py --stats`` o ``compilador.parse``), así que
+sin él el costo es nulo. tracemalloc sí encarece cada asignación mientras
+está activo; con ``memory=False`` se miden sólo tiempos.
+
+``on_phase(nombre, segundos, pico)`` se llama al terminar cada fase, para
+quien quiera los datos sin esperar al final.
+"""
+import json
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+PHASES = ('read', 'lex', 'parse', 'parse+semantics', 'semantics')
+
+class Stats:
+    def __init__(self, memory=True, on_phase=None):
+        self.memory = memory
+        self.on_phase = on_phase
+        self.seconds = {}       # Fase -> segundos, sumados entre archivos
+        self.peak = {}          # Fase -> bytes, el máximo entre archivos
+        self.counters = Counter()
+
+    @contextmanager
+    def phase(self, name):
+        tracing = self.memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        if self.memory:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak = None
+            if self.memory:
+                peak = tracemalloc.get_traced_memory()[1] - base
+                if tracing:
+                    tracemalloc.stop()
+            self.record(name, seconds, peak)
+
+    def record(self, name, seconds, peak=None):
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+        if peak is not None:
+            self.peak[name] = max(self.peak.get(name, 0), peak)
+        if self.on_phase is not None:
+            self.on_phase(name, seconds, peak)
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def update(self, counts, prefix=''):
+        """Suma un mapeo de contadores, p. ej. ``Counter`` de tipos de token"""
+        for name, n in counts.items():
+            self.counters[prefix + name] += n
+
+    def as_dict(self):
+        order = sorted(self.seconds, key=lambda p: PHASES.index(p) if p in PHASES else len(PHASES))
+        return {
+            'phases': {p: {'seconds': self.seconds[p], 'peak_bytes': self.peak.get(p)} for p in order},
+            'counters': dict(sorted(self.counters.items())),
+        }
+
+    def to_json(self):
+        return json.dumps(self.as_dict())
+
+    def to_text(self):
+        data = self.as_dict()
+        width = max([10] + [len(name) for name in data['phases']])
+        lines = ["[ESTADÍSTICAS]", f"{'fase':<{width}} {'segundos':>10} {'pico KiB':>10}"]
+        for name, phase in data['phases'].items():
+            peak = '-' if phase['peak_bytes'] is None else f"{phase['peak_bytes'] / 1024:.1f}"
+            lines.append(f"{name:<{width}} {phase['seconds']:>10.4f} {peak:>10}")
+        for name, n in data['counters'].items():
+            lines.append(f"{name}: {n}")
+        return '\n'.join(lines)
@@ -0,0 +1,117 @@
+"""Tabla de símbolos con ámbitos anidados para el análisis semántico.
+
+Todos los ámbitos comparten un único diccionario de nombre a la declaración
+visible más interna; cada declaración apunta a la que oculta (``shadowed``),
+formando una cadena por nombre. Buscar un nombre es un solo acceso al
+diccionario sin importar la profundidad, y salir de un ámbito sólo restaura
+las cadenas de los nombres que ese ámbito declaró.
+
+Las funciones viven en su propio espacio de nombres, siempre global.
+"""
+
+class SemanticError(Exception):
+    """``code`` es el código de diagnóstico (ver diagnostics.MESSAGES)"""
+
+    def __init__(self, code, name):
+        super().__init__(code, name)
+        self.code = code
+        self.name = name
+
+class VariableInfo:
+    __slots__ = ('name', 'type', 'depth', 'shadowed')
+
+    def __init__(self, name, var_type, depth=0, shadowed=None):
+        self.name = name
+        self.type = var_type
+        self.depth = depth          # 0 = global
+        self.shadowed = shadowed    # Declaración del mismo nombre en un ámbito exterior
+
+class FunctionInfo:
+    __slots__ = ('name', 'return_type', 'params')
+
+    def __init__(self, name, return_type, params):
+        self.name = name
+        self.return_type = return_type
+        self.params = params        # Tupla con el tipo de cada parámetro
+
+def global_key(info):
+    """Identifica una declaración global para comparar dos análisis"""
+    if isinstance(info, FunctionInfo):
+        return ('FUNCTION', info.name, info.return_type, info.params)
+    return ('VARIABLE', info.name, info.type)
+
+class SymbolTable:
+    def __init__(self, globals=()):
+        self.variables = {}         # Nombre -> VariableInfo visible más interna
+        self.functions = {}
+        self.scope_stack = [[]]     # Nombres declarados en cada ámbito abierto
+        self.declared = []          # Declaraciones globales hechas aquí, en orden
+        self.seed(globals)
+
+    def seed(self, globals):
+        """Agrega declaraciones globales hechas en otra parte (otra unidad o trozo)"""
+        for info in globals:
+            if isinstance(info, FunctionInfo):
+                self.functions[info.name] = info
+            else:
+                info = VariableInfo(info.name, info.type)
+                self.variables[info.name] = info
+                self.scope_stack[0].append(info.name)
+            self.declared.append(info)
+
+    def forget(self, globals):
+        """Deshace ``seed(globals)`` o las declaraciones que la produjeron.
+
+        ``globals`` tienen que ser las últimas declaraciones globales y no
+        puede haber ámbitos abiertos.
+        """
+        names = self.scope_stack[0]
+        for info in reversed(globals):
+            if isinstance(info, FunctionInfo):
+                del self.functions[info.name]
+            else:
+                del self.variables[info.name]
+                names.pop()
+        del self.declared[len(self.declared) - len(globals):]
+
+    @property
+    def depth(self):
+        return len(self.scope_stack) - 1
+
+    def enter_scope(self):
+        self.scope_stack.append([])
+
+    def exit_scope(self):
+        variables = self.variables
+        for name in self.scope_stack.pop():
+            shadowed = variables[name].shadowed
+            if shadowed is None:
+                del variables[name]
+            else:
+                variables[name] = shadowed
+
+    def declare_variable(self, name, var_type):
+        depth = self.depth
+        visible = self.variables.get(name)
+        if visible is not None and visible.depth == depth:
+            raise SemanticError('M001', name)
+        info = VariableInfo(name, var_type, depth, visible)
+        self.variables[name] = info
+        self.scope_stack[-1].append(name)
+        if depth == 0:
+            self.declared.append(info)
+        return info
+
+    def get_variable(self, name):
+        return self.variables.get(name)
+
+    def declare_function(self, name, return_type, params):
+        if name in self.functions:
+            raise SemanticError('M002', name)
+        info = FunctionInfo(name, return_type, tuple(params))
+        self.functions[name] = info
+        self.declared.append(info)
+        return info
+
+    def get_function(self, name):
+        return self.functions.get(name)
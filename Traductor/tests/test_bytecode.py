@@ -0,0 +1,48 @@
+import io
+import os
+import tempfile
+import unittest
+from bytecode import CompileError, RuntimeFault, compile_source, load_code, load_or_compile, run
+
+def execute(text):
+    out = io.StringIO()
+    run(compile_source(text), out)
+    return out.getvalue()
+
+class TestBytecode(unittest.TestCase):
+    def test_runs_program(self):
+        text = 'program P {\n var n: int;\n var s: string;\n n = 42;\n s = "hola";\n print(n * 2);\n print(s);\n}'
+        self.assertEqual(execute(text), '84\nhola\n')
+
+    def test_int_division_truncates_and_float_widens(self):
+        text = ('program P {\n var a: int;\n var b: float;\n a = -7 / 2;\n print(a);\n'
+                ' b = a;\n print(b);\n b = 7 / 2.0;\n print(b);\n}')
+        self.assertEqual(execute(text), '-3\n-3.0\n3.5\n')
+
+    def test_division_by_zero(self):
+        with self.assertRaises(RuntimeFault) as ctx:
+            execute('program P {\n var a: int;\n a = 1 / a;\n}')
+        self.assertIn('línea 3', str(ctx.exception))
+
+    def test_rejects_programs_with_errors(self):
+        with self.assertRaises(CompileError):
+            compile_source('program P {\n var a: int;\n a = b;\n}')
+
+    def test_cache_roundtrip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, 'a.src')
+            with open(source, 'w') as f:
+                f.write('program P {\n var a: int;\n a = 5;\n print(a + 1);\n}')
+            self.assertIsNone(load_code(source + 'b', source))
+
+            compiled = load_or_compile(source, cache=True)
+            cached = load_code(source + 'b', source)
+            self.assertEqual(cached.code, compiled.code)
+            self.assertEqual(cached.consts, compiled.consts)
+            out = io.StringIO()
+            run(cached, out)
+            self.assertEqual(out.getvalue(), '6\n')
+
+            with open(source, 'w') as f:
+                f.write('program P {\n var a: int;\n a = 7;\n print(a + 1);\n}')
+            self.assertIsNone(load_code(source + 'b', source))
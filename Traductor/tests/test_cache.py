@@ -0,0 +1,35 @@
+import os
+import tempfile
+import time
+import unittest
+from cache import ResultCache
+
+class TestResultCache(unittest.TestCase):
+    def test_roundtrip_by_content(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResultCache(os.path.join(tmp, 'cache'))
+            source = os.path.join(tmp, 'a.src')
+            with open(source, 'w') as f:
+                f.write('int a;\n')
+
+            key = cache.key_for_file(source)
+            self.assertIsNone(cache.get(key))
+            cache.put(key, {'fatal': None, 'errors': [], 'tokens': 4})
+            self.assertEqual(cache.get(key)['tokens'], 4)
+
+            with open(source, 'w') as f:
+                f.write('int b;\n')
+            self.assertNotEqual(cache.key_for_file(source), key)
+            self.assertNotEqual(cache.key_for_file(source, 'split'), cache.key_for_file(source))
+
+    def test_evicts_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResultCache(tmp, max_bytes=100)
+            for i, key in enumerate(('viejo', 'nuevo')):
+                cache.put(key, {'errors': ['x' * 60]})
+                stamp = time.time() - 100 + i
+                os.utime(os.path.join(tmp, key + '.json'), (stamp, stamp))
+
+            cache.evict()
+            self.assertIsNone(cache.get('viejo'))
+            self.assertIsNotNone(cache.get('nuevo'))
@@ -0,0 +1,60 @@
+import io
+import json
+import unittest
+from diagnostics import CheckResult, Diagnostic, JsonLinesWriter, SarifWriter, merge
+from lexer import Lexer
+from parser import Parser
+
+class TestDiagnostics(unittest.TestCase):
+    def test_structured_errors(self):
+        parser = Parser(Lexer().tokenize('int a;\nint f(){\n    a = ;\n    b = 1;\n}\n'))
+        parser.parse()
+        self.assertEqual([(e.code, e.line, e.column) for e in parser.errors],
+                         [('S001', 3, 9), ('M003', 4, 5)])
+        self.assertEqual(str(parser.errors[1]), "[SEMÁNTICO] Variable 'b' no declarada en línea 4, columna 5")
+        moved = parser.errors[1].moved(10)
+        self.assertEqual(moved.line, 14)
+        self.assertEqual(Diagnostic.from_json(moved.to_json()), moved)
+
+    def test_merge_lexical_errors(self):
+        lexer = Lexer(recover=True)
+        parser = Parser(lexer.tokenize('int a;\nint f(){\n    a = 1 $ 2;\n    b = 1;\n}\n'))
+        parser.parse()
+        errors, truncated = merge(lexer.errors, parser.errors)
+        self.assertEqual([(e.code, e.line, e.column) for e in errors],
+                         [('L001', 3, 11), ('S001', 3, 13), ('M003', 4, 5)])
+        self.assertFalse(truncated)
+        self.assertEqual(len(merge(lexer.errors, parser.errors, 2)[0]), 2)
+
+    def test_merge_sorts_parser_errors(self):
+        lexer = Lexer(recover=True)
+        parser = Parser(lexer.tokenize('int main(){\nfloat a;\nint c;\nc = a;\nc = suma(8, 9);\n}\n'))
+        parser.parse()
+        errors, _ = merge(lexer.errors, parser.errors)
+        self.assertEqual([(e.code, e.line) for e in errors], [('T001', 4), ('M004', 5)])
+
+    def test_jsonl_and_sarif(self):
+        results = [
+            CheckResult('a.src', None, [Diagnostic('M003', 2, 5, ('x',), 'ID')], 10),
+            CheckResult('b.src', Diagnostic('F001', 0, 0, ('b.src',)), [], 0),
+            CheckResult('c.src', None, [], 3),
+        ]
+        for writer_class in (JsonLinesWriter, SarifWriter):
+            out = io.StringIO()
+            writer = writer_class(out)
+            writer.begin()
+            for result in results:
+                writer.write(result)
+            writer.end()
+            if writer_class is JsonLinesWriter:
+                entries = [json.loads(line) for line in out.getvalue().splitlines()]
+                self.assertEqual([(e['path'], e['code']) for e in entries],
+                                 [('a.src', 'M003'), ('b.src', 'F001')])
+            else:
+                run = json.loads(out.getvalue())['runs'][0]
+                self.assertEqual([r['ruleId'] for r in run['results']], ['M003', 'F001'])
+                region = run['results'][0]['locations'][0]['physicalLocation']['region']
+                self.assertEqual(region, {'startLine': 2, 'startColumn': 5})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+import os
+import sys
+import unittest
+from lexer import Lexer
+from parser import Parser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'benchmarks'))
+from generate import generate
+
+def errors(text):
+    lexer = Lexer(recover=True)
+    parser = Parser(lexer.tokenize(text))
+    parser.parse()
+    return lexer.errors + parser.errors
+
+class TestGenerate(unittest.TestCase):
+    def test_valid_and_invalid_programs(self):
+        for dialect in ('c', 'program'):
+            self.assertEqual(generate(dialect, 50, seed=3), generate(dialect, 50, seed=3))
+            self.assertEqual(errors(generate(dialect, 50)), [])
+            codes = {error.code for error in errors(generate(dialect, 50, invalid=True))}
+            self.assertTrue({'L001', 'S001', 'M003', 'T001'} <= codes)
+
+if __name__ == '__main__':
+    unittest.main()
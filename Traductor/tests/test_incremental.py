@@ -0,0 +1,74 @@
+import random
+import unittest
+from diagnostics import merge
+from incremental import Document
+from lexer import Lexer
+from parser import Parser
+
+def full_analysis(text):
+    lexer = Lexer(recover=True)
+    # Como main.analyze_file, se tokeniza todo aunque el parser se detenga
+    parser = Parser(list(lexer.tokenize(text)))
+    parser.parse()
+    return merge(lexer.errors, parser.errors)[0]
+
+class TestIncremental(unittest.TestCase):
+    def test_matches_full_parse(self):
+        with open('samples/invalid/ejemplo1.src') as f:
+            code = f.read()
+
+        document = Document(code)
+        self.assertEqual(document.errors, full_analysis(code))
+        self.assertEqual(list(document.tokens()), list(Lexer().tokenize(code)))
+
+    def random_edits(self, text, pieces, seed):
+        rng = random.Random(seed)
+        document = Document(text)
+        for _ in range(300):
+            offset = rng.randint(0, len(text))
+            deleted = rng.randint(0, min(4, len(text) - offset))
+            inserted = ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 2)))
+            document.edit(offset, deleted, inserted)
+            text = text[:offset] + inserted + text[offset + deleted:]
+
+            fresh = Document(text)
+            self.assertEqual(document.errors, fresh.errors)
+            self.assertEqual(document.errors, full_analysis(text))
+            self.assertEqual(list(document.tokens()), list(fresh.tokens()))
+
+    def test_edits_match_fresh_document(self):
+        with open('samples/valid/ejemplo2.src') as f:
+            text = f.read()
+        pieces = ['int ', 'x', ';', '{', '}', '\n', ' ', 'a = b;', 'f(1,2)', '(', ')', '"s"', '1.5',
+                  '$', '"']
+        self.random_edits(text, pieces, 7)
+
+    def test_program_edits_match_fresh_document(self):
+        text = 'program P {\n' + ''.join(f'    var v{i}: int;\n    v{i} = {i};\n    print(v{i});\n'
+                                         for i in range(10)) + '}\n'
+        pieces = ['var ', 'x', ': float', ';', '}', '\n', ' ', 'v1 = 2.5;', 'print(', ')', '"s"',
+                  '$', '"']
+        self.random_edits(text, pieces, 11)
+
+    def test_edit_reparses_only_touched_unit(self):
+        text = ''.join(f'int f{i}(int a){{\n    a = b;\n}}\n' for i in range(50))
+        document = Document(text)
+        offset = text.index('a = b', len(text) // 2)
+        first, last = document.edit(offset, 1, 'c')
+        self.assertEqual(last - first, 1)
+        self.assertEqual(document.errors, Document(document.text).errors)
+
+        # Un carácter inválido es un error más de la unidad, no un reanálisis completo
+        first, last = document.edit(offset, 0, '$')
+        self.assertEqual(last - first, 1)
+        self.assertEqual([error.code for error in document.errors].count('L001'), 1)
+
+        text = 'program P {\n' + ''.join(f'    var v{i}: int;\n    v{i} = 1;\n' for i in range(50)) + '}\n'
+        document = Document(text)
+        offset = text.index('v30 = 1') + len('v30 = ')
+        first, last = document.edit(offset, 1, '2.5')
+        self.assertEqual(last - first, 1)
+        self.assertEqual(document.errors, full_analysis(document.text))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from ir import PassManager, lower_source
+from stats import Stats
+
+SOURCE = '''int total;
+
+int doble(int x){
+    int y;
+    y = x;
+    return y * 2;
+}
+
+int nunca(int a){
+    return a;
+}
+
+int main(){
+    int a;
+    float c;
+    a = 2 * 3 + 1;
+    c = a / 2;
+    total = 1;
+    total = doble(a);
+    a = total / a;
+    return total;
+    total = 5;
+}
+'''
+
+def optimized(level, stats=None):
+    module, errors = lower_source(SOURCE)
+    assert not errors, errors
+    return PassManager.for_level(level, stats).run(module)
+
+def body(module, name):
+    return [str(instr) for block in module.functions[name].blocks for instr in block.instrs]
+
+class TestIR(unittest.TestCase):
+    def test_lowering(self):
+        module = optimized(0)
+        self.assertEqual(module.globals, {'@total': 'INT'})
+        self.assertEqual(body(module, 'doble'), ['y = x', '%1 = y * 2', 'return %1'])
+        main = module.functions['main']
+        self.assertEqual([block.label for block in main.blocks], ['entry', 'dead1'])
+        self.assertIn('%4 = float %3', body(module, 'main'))
+
+    def test_folds_and_removes_dead_code(self):
+        module = optimized(1)
+        self.assertEqual(body(module, 'main'), [
+            '@total = 1',               # La llamada podría leerla
+            '%5 = call doble(7)',
+            '@total = %5',
+            'return @total',
+        ])
+        self.assertIn('nunca', module.functions)
+
+    def test_copies_and_unused_functions(self):
+        module = optimized(2)
+        self.assertEqual(body(module, 'doble'), ['%1 = x * 2', 'return %1'])
+        self.assertEqual(list(module.functions), ['doble', 'main'])
+        self.assertEqual(body(module, 'main')[-1], 'return %5')
+
+    def test_keeps_division_that_may_fail(self):
+        module, _ = lower_source('int f(int a){\n int b;\n b = 1 / a;\n b = 2 / 0;\n return 0;\n}')
+        PassManager.for_level(2).run(module)
+        self.assertEqual(body(module, 'f'), ['%1 = 1 / a', '%2 = 2 / 0', 'return 0'])
+
+    def test_int_division_truncates(self):
+        module, _ = lower_source('program P {\n var a: int;\n a = -7 / 2;\n print(a);\n print(7 / 2.0);\n}')
+        PassManager.for_level(1).run(module)
+        self.assertEqual(body(module, 'P'), ['print -3', 'print 3.5'])
+
+    def test_pass_timing(self):
+        stats = Stats(memory=False)
+        optimized(2, stats)
+        self.assertEqual(list(stats.seconds), ['opt.fold', 'opt.copies', 'opt.dead-stores',
+                                               'opt.unreachable', 'opt.unused-functions'])
+        self.assertEqual(stats.counters['opt.unused-functions.changed'], 1)
+        self.assertLess(stats.counters['ir.instructions.after'], stats.counters['ir.instructions.before'])
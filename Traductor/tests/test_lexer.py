@@ -13,4 +13,56 @@ class TestLexer(unittest.TestCase):
         self.assertEqual(tokens[0].type, 'PROGRAM')
         
         # Verifica que exista token NUMBER
-        self.assertTrue(any(t.type == 'NUMBER' for t in tokens))
\ No newline at end of file
+        self.assertTrue(any(t.type == 'NUMBER' for t in tokens))
+
+    def test_stream_matches_tokenize(self):
+        import io
+        with open('samples/valid/declaraciones.src') as f:
+            code = f.read()
+
+        expected = list(Lexer().tokenize(code))
+        # Bloques diminutos para forzar tokens partidos entre lecturas
+        for chunk_size in (1, 3, 7, 64):
+            tokens = list(Lexer().tokenize_stream(io.StringIO(code), chunk_size))
+            self.assertEqual(tokens, expected)
+
+        self.assertEqual(list(Lexer().tokenize_stream('samples/valid/declaraciones.src')), expected)
+
+    def test_buffer_matches_tokenize(self):
+        with open('samples/valid/ejemplo2.src') as f:
+            code = f.read()
+
+        expected = list(Lexer().tokenize(code))
+        buffer = Lexer().tokenize_buffer(code)
+        self.assertEqual(len(buffer), len(expected))
+        self.assertEqual(list(buffer), expected)
+        self.assertEqual(buffer[-1], expected[-1])
+
+    def test_recover_collects_every_error(self):
+        from lexer import LexerError
+        code = 'int a;\na = 1 $$x#y;\ns = "abc;\nb @ 2;\n'
+        with self.assertRaises(LexerError):
+            list(Lexer().tokenize(code))
+
+        lexer = Lexer(recover=True)
+        tokens = list(lexer.tokenize(code))
+        self.assertEqual([str(e) for e in lexer.errors], [
+            "Error léxico: 2 caracteres inesperados desde '$' en línea 2, columna 7",
+            "Error léxico: Carácter inesperado '#' en línea 2, columna 10",
+            "Error léxico: Cadena sin cerrar en línea 3, columna 5",
+            "Error léxico: Carácter inesperado '@' en línea 4, columna 3",
+        ])
+        self.assertEqual(sum(t.type == 'ERROR' for t in tokens), 4)
+        self.assertEqual(tokens[-1].type, 'EOF')
+
+        buffer = Lexer(recover=True).tokenize_buffer(code)
+        self.assertEqual(list(buffer), [t for t in tokens if t.type != 'ERROR'])
+
+    def test_recover_folds_only_adjacent_characters(self):
+        lexer = Lexer(recover=True)
+        list(lexer.tokenize('a@b#c;\nd = 1 @#$;\n'))
+        self.assertEqual([(e.code, e.line, e.column, e.args) for e in lexer.errors], [
+            ('L001', 1, 2, ('@',)),
+            ('L001', 1, 4, ('#',)),
+            ('L003', 2, 7, ('@', 3)),
+        ])
@@ -0,0 +1,28 @@
+import os
+import tempfile
+import unittest
+import main
+
+class TestMain(unittest.TestCase):
+    def test_glob_expands_directories_and_skips_the_rest(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, 'd', 'e'))
+            os.makedirs(os.path.join(tmp, 'vacio'))
+            for name in ('a.src', 'b.txt', os.path.join('d', 'c.src'),
+                         os.path.join('d', 'nota.txt'), os.path.join('d', 'e', 'f.src')):
+                open(os.path.join(tmp, name), 'w').close()
+            paths = main.expand_paths([os.path.join(tmp, '*')])
+            self.assertEqual([os.path.relpath(path, tmp) for path in paths],
+                             ['a.src', 'b.txt', os.path.join('d', 'c.src'),
+                              os.path.join('d', 'e', 'f.src')])
+
+    def test_unreadable_path_is_a_diagnostic(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for split in (False, True):
+                main.init_worker()
+                results = list(main.check_paths([tmp, os.path.join(tmp, 'no.src')], 2, split=split))
+                self.assertEqual([result.fatal.code for result in results], ['F002', 'F001'])
+                self.assertEqual(results[0].fatal.args[0], tmp)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+from lexer import Lexer
+from nodes import Assign, Call, FunctionDef, Name, NodeArena, Number, Param, Program, UnaryOp, VarDecl
+from parser import Parser
+
+class TestNodes(unittest.TestCase):
+    def test_c_style_tree(self):
+        code = 'int a;\nint f(int x, float y){\n    x = g(y, 2);\n    h();\n}\n'
+        tree = Parser(Lexer().tokenize(code)).parse()
+        expected = Program(None, [
+            VarDecl('INT', 'a', 1, 5),
+            FunctionDef('INT', 'f', [Param('INT', 'x', 2, 11), Param('FLOAT', 'y', 2, 20)], [
+                Assign('x', Call('g', [Name('y', 3, 11), Number(2, 3, 14)], 3, 9), 3, 5),
+                Call('h', [], 4, 5),
+            ], 2, 5),
+        ], 1, 1)
+        self.assertEqual(tree, expected)
+
+    def test_arena_matches_nodes(self):
+        with open('samples/valid/ejemplo2.src') as f:
+            code = f.read()
+
+        tree = Parser(Lexer().tokenize(code)).parse()
+        buffer = Lexer().tokenize_buffer(code)
+        arena = NodeArena()
+        root = Parser(buffer, arena).parse()
+        self.assertEqual(arena.kind(root), 'PROGRAM')
+        self.assertEqual(arena.materialize(root, buffer), tree)
+
+    def test_deep_tree_equality(self):
+        def nested(depth, value):
+            node = Number(value, 1, 1)
+            for _ in range(depth):
+                node = UnaryOp('-', node, 1, 1)
+            return node
+        self.assertEqual(nested(20000, 1), nested(20000, 1))
+        self.assertNotEqual(nested(20000, 1), nested(20000, 2))
+        self.assertNotEqual(nested(20000, 1), nested(19999, 1))
+
+if __name__ == '__main__':
+    unittest.main()
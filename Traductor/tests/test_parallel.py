@@ -0,0 +1,31 @@
+import unittest
+from unittest import mock
+import parallel
+from diagnostics import merge
+from lexer import Lexer
+from parser import Parser
+
+class TestParallel(unittest.TestCase):
+    def test_matches_sequential_parse(self):
+        units = []
+        for i in range(60):
+            units.append(f'int f{i}(int a, float b){{\n    a = f{i // 2}(b, {i});\n    var c;\n    g(c);\n}}\n')
+            if i % 7 == 0:
+                units.append(f'  int x{i} = 5;\nfloat y{i};\nint f{i // 3}(int a){{ y{i // 2} = a; }}\n')
+        text = ''.join(units)
+
+        parser = Parser(Lexer().tokenize(text))
+        parser.parse()
+        with mock.patch.object(parallel, 'MIN_CHUNK_TOKENS', 50):
+            chunks = parallel.split_chunks(text, Lexer().tokenize_buffer(text), 8)
+            errors, tokens, truncated = parallel.parse_parallel(text, jobs=2)
+
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(''.join(chunk[0] for chunk in chunks), text)
+        self.assertTrue(parser.errors)
+        self.assertEqual(errors, merge([], parser.errors)[0])
+        self.assertFalse(truncated)
+        self.assertEqual(tokens, len(list(Lexer().tokenize(text))))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,4 +10,65 @@ class TestParser(unittest.TestCase):
         tokens = list(Lexer().tokenize(code))
         
         with self.assertRaises(Exception):
-            Parser(tokens).parse()
\ No newline at end of file
+            Parser(tokens).parse()
+
+    def test_generator_matches_list(self):
+        with open('samples/valid/ejemplo2.src') as f:
+            code = f.read()
+
+        from_list = Parser(list(Lexer().tokenize(code)))
+        from_list.parse()
+        from_stream = Parser(Lexer().tokenize(code))
+        from_stream.parse()
+        self.assertEqual(from_stream.errors, from_list.errors)
+
+    def test_expression_precedence(self):
+        from nodes import BinOp, Call, Name, Number, UnaryOp
+        code = 'int f(int a){ a = -a + 2 * f((a - 1) / 3, a); }'
+        tree = Parser(Lexer().tokenize(code)).parse()
+        value = tree.body[0].body[0].value
+        self.assertEqual(value, BinOp('+', UnaryOp('-', Name('a', 1, 20), 1, 19),
+            BinOp('*', Number(2, 1, 24), Call('f', [
+                BinOp('/', BinOp('-', Name('a', 1, 31), Number(1, 1, 35), 1, 33), Number(3, 1, 40), 1, 38),
+                Name('a', 1, 43)], 1, 28), 1, 26), 1, 22))
+
+    def test_long_and_deep_expressions(self):
+        terms = 100000
+        depth = 10000
+        code = ('int f(int a){\n    a = ' + ' + '.join(['a * 2'] * terms) + ';\n'
+                '    a = ' + 'f(' * depth + '(' * depth + 'a' + ')' * depth * 2 + ';\n}\n')
+        parser = Parser(Lexer().tokenize(code))
+        tree = parser.parse()
+        self.assertEqual(parser.errors, [])
+        node = tree.body[0].body[1].value
+        for _ in range(depth):
+            node = node.args[0]
+        self.assertEqual(node.id, 'a')
+
+    def test_panic_mode_recovery(self):
+        code = 'int a = 5 + ;\nint f(){\n    b = = 1 2 3;\n    int c;\n    c = 1;\n}\nfloat g;\n'
+        parser = Parser(Lexer().tokenize(code))
+        tree = parser.parse()
+        self.assertEqual([str(e) for e in parser.errors], [
+            '[SINTÁCTICO] Se esperaba paréntesis izquierdo "(" o punto y coma ";" pero se encontró signo de asignación "=" en línea 1, columna 7',
+            "[SEMÁNTICO] Variable 'b' no declarada en línea 3, columna 5",
+            '[SINTÁCTICO] Se esperaba expresión pero se encontró signo de asignación "=" en línea 3, columna 9',
+        ])
+        self.assertEqual([type(node).__name__ for node in tree.body[0].body], ['VarDecl', 'Assign'])
+        self.assertEqual(tree.body[1].name, 'g')
+
+    def test_max_errors_stops_early(self):
+        code = 'x;\n' * 1000
+        parser = Parser(Lexer().tokenize(code), max_errors=10)
+        parser.parse()
+        self.assertEqual(len(parser.errors), 10)
+        self.assertTrue(parser.truncated)
+
+    def test_without_tree_reports_same_errors(self):
+        code = 'int a = 5 + ;\nint f(int b){\n    b = c + 1.5;\n    g(b);\n}\nfloat h;\n'
+        parser = Parser(Lexer().tokenize(code))
+        parser.parse()
+        streaming = Parser(Lexer().tokenize(code), keep_tree=False)
+        self.assertEqual(streaming.parse().body, [])
+        self.assertEqual(streaming.errors, parser.errors)
+        self.assertNotEqual(parser.errors, [])
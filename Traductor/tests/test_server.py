@@ -0,0 +1,127 @@
+import asyncio
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import main
+import server as server_module
+from client import Client
+from diagnostics import result_from_json
+from server import CheckServer
+
+class TestServer(unittest.TestCase):
+    def start(self, path, server=None):
+        """Arranca un servidor en otro hilo y espera a que acepte conexiones"""
+        server = server or CheckServer(jobs=1)
+        thread = threading.Thread(target=asyncio.run, args=(server.serve(path),))
+        thread.start()
+        while True:
+            try:
+                Client(path).close()
+                return thread
+            except (FileNotFoundError, ConnectionRefusedError):
+                thread.join(0.01)
+
+    def test_check_over_socket(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'server.sock')
+            with open(os.path.join(tmp, 'entrada.txt'), 'w') as f:
+                f.write('int x = 10; $')
+            thread = self.start(path)
+            # Una conexión abierta al detenerse no deja trazas de CancelledError
+            with self.assertNoLogs('asyncio', 'ERROR'), Client(path) as idle:
+                try:
+                    self.assertEqual(idle.request(op='ping')['pong'], True)
+                    with Client(path) as client:
+                        count, results = client.check(['samples/valid/ejemplo2.src', 'no_existe.src'])
+                        results = [result_from_json(data) for data in results]
+                        self.assertIn('error', client.request(op='otra'))
+                        # La ruta es relativa al directorio del cliente, no al del servidor
+                        self.assertEqual(client.check_lr('entrada.txt', tmp)['valid'], True)
+                        client.request(op='shutdown')
+                finally:
+                    thread.join()
+            self.assertEqual(count, 2)
+            self.assertEqual([e.code for e in results[0].errors], ['T001', 'T002', 'T002'])
+            self.assertEqual(str(results[1].fatal), "Error: Archivo 'no_existe.src' no encontrado")
+
+    def test_refuses_socket_in_use(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'server.sock')
+            thread = self.start(path)
+            try:
+                with self.assertRaises(OSError):
+                    asyncio.run(CheckServer(jobs=1).serve(path))
+                with Client(path) as client:
+                    self.assertEqual(client.request(op='ping')['pong'], True)
+                    client.request(op='shutdown')
+            finally:
+                thread.join()
+
+            # Un socket que quedó de un servidor terminado se reemplaza
+            stale = socket.socket(socket.AF_UNIX)
+            stale.bind(path)
+            stale.close()
+            thread = self.start(path)
+            with Client(path) as client:
+                client.request(op='shutdown')
+            thread.join()
+
+    def test_failures_become_error_replies(self):
+        check_file = main.check_file
+
+        def failing(path):
+            if path.endswith('falla.src'):
+                raise RuntimeError("el proceso terminó")
+            return check_file(path)
+
+        server = CheckServer(jobs=1)
+        server.pool.shutdown()
+        server.pool = ThreadPoolExecutor(1)  # Para que el reemplazo de check_file se vea
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'server.sock')
+            for name in ('falla.src', 'bien.src'):
+                with open(os.path.join(tmp, name), 'w') as f:
+                    f.write('int x;\n')
+            thread = self.start(path, server)
+            try:
+                with mock.patch('main.check_file', failing), Client(path) as client:
+                    count, results = client.check(['falla.src', 'bien.src'], tmp)
+                    results = [result_from_json(data) for data in results]
+                    self.assertEqual(client.request(op='ping')['pong'], True)
+                    client.request(op='shutdown')
+            finally:
+                thread.join()
+        self.assertEqual(str(results[0].fatal),
+                         "Error: Falló el análisis del archivo 'falla.src': el proceso terminó")
+        self.assertEqual((results[1].fatal, results[1].errors), (None, []))
+
+    def test_lr_table_is_generated_from_grammar(self):
+        root = server_module.ROOT
+        sys.path.append(root)
+        import compilador  # noqa: F401 (lr_parser lo busca desde ROOT, que aquí cambia)
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, 'entrada.txt')
+            with open(source, 'w') as f:
+                f.write('int x = 10; $')
+            server = CheckServer(jobs=1)
+            try:
+                with mock.patch('server.ROOT', tmp):
+                    # Sin gramática ni tabla: un error, no una excepción
+                    self.assertIn('error', server.check_lr(source))
+                    shutil.copy(os.path.join(root, 'compilador.gram'), tmp)
+                    self.assertEqual(server.check_lr(source)['valid'], True)
+                    self.assertTrue(os.path.exists(os.path.join(tmp, 'compilador.Ir')))
+            finally:
+                server.pool.shutdown()
+                sys.path.remove(root)
+                if tmp in sys.path:
+                    sys.path.remove(tmp)
+
+if __name__ == '__main__':
+    unittest.main()
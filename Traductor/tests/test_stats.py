@@ -0,0 +1,54 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+import main
+from stats import Stats
+
+class TestStats(unittest.TestCase):
+    def test_phases_and_counters(self):
+        seen = []
+        stats = Stats(on_phase=lambda name, seconds, peak: seen.append(name))
+        main.init_worker()
+        result = main.analyze_file_stats('samples/valid/ejemplo2.src', stats)
+        self.assertEqual(seen, ['read', 'lex', 'parse+semantics'])
+        self.assertEqual(sum(n for name, n in stats.counters.items() if name.startswith('tokens.')),
+                         result.tokens)
+        self.assertEqual(stats.counters['errors.T002'], 2)
+        # Mismos errores que el análisis normal
+        self.assertEqual(result.errors, main.analyze_file('samples/valid/ejemplo2.src').errors)
+
+        data = json.loads(stats.to_json())
+        self.assertEqual(list(data['phases']), ['read', 'lex', 'parse+semantics'])
+        self.assertGreater(data['phases']['lex']['peak_bytes'], 0)
+
+    def test_same_errors_as_normal_analysis(self):
+        # La llamada a una función definida después no se comprueba: con
+        # --stats tampoco (antes daba un T002 de más)
+        code = 'int main(){\n    g(1.5);\n}\nint g(int a){\n    return a;\n}\n'
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'adelante.src')
+            with open(path, 'w') as f:
+                f.write(code)
+            main.init_worker()
+            result = main.analyze_file_stats(path, Stats(memory=False))
+            self.assertEqual(result.errors, main.analyze_file(path).errors)
+
+    def test_rejects_parallel_options(self):
+        for option in ('--jobs=2', '--split'):
+            with self.assertRaises(SystemExit), mock.patch('sys.stderr'):
+                main.main(['--stats', option, 'samples'])
+
+    def test_without_memory(self):
+        stats = Stats(memory=False)
+        with stats.phase('lex'):
+            pass
+        with stats.phase('lex'):
+            pass
+        stats.count('tokens', 3)
+        self.assertEqual(stats.as_dict()['phases']['lex']['peak_bytes'], None)
+        self.assertIn('tokens: 3', stats.to_text())
+
+if __name__ == '__main__':
+    unittest.main()
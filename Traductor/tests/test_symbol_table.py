@@ -0,0 +1,33 @@
+import unittest
+from lexer import Lexer
+from parser import Parser
+from symbol_table import SemanticError, SymbolTable
+
+class TestSymbolTable(unittest.TestCase):
+    def test_scopes_shadow_and_restore(self):
+        table = SymbolTable()
+        table.declare_variable('a', 'INT')
+        table.enter_scope()
+        table.declare_variable('a', 'FLOAT')
+        self.assertEqual(table.get_variable('a').type, 'FLOAT')
+        with self.assertRaises(SemanticError):
+            table.declare_variable('a', 'STRING')
+        table.exit_scope()
+        self.assertEqual(table.get_variable('a').type, 'INT')
+        self.assertEqual([info.name for info in table.declared], ['a'])
+
+    def test_parser_reports_semantic_errors(self):
+        code = 'int a;\nint a;\nint f(int x, float x){\n    y = x;\n    g(a);\n    f(a, 1.5);\n}\n'
+        parser = Parser(Lexer().tokenize(code))
+        parser.parse()
+        self.assertEqual([str(e) for e in parser.errors], [
+            "[SEMÁNTICO] Variable 'a' ya declarada en este ámbito en línea 2, columna 5",
+            "[SEMÁNTICO] Variable 'x' ya declarada en este ámbito en línea 3, columna 20",
+            "[SEMÁNTICO] Variable 'y' no declarada en línea 4, columna 5",
+            "[SEMÁNTICO] Función 'g' no declarada en línea 5, columna 5",
+        ])
+        self.assertEqual(parser.symbols.get_function('f').params, ('INT', 'FLOAT'))
+        self.assertIsNone(parser.symbols.get_variable('x'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+from lexer import Lexer
+from parser import Parser
+
+def check(code):
+    parser = Parser(Lexer().tokenize(code))
+    parser.parse()
+    return [str(e) for e in parser.errors]
+
+class TestTypeChecker(unittest.TestCase):
+    def test_assignments_arguments_and_returns(self):
+        code = ('int suma(int a, int b){\n    return a;\n}\n'
+                'float mitad(float x){\n    return 2;\n}\n'
+                'int main(){\n    int c;\n    float f;\n    f = c;\n    c = f;\n'
+                '    c = suma(8.5, c);\n    f = mitad(1, 2);\n    return;\n}\n')
+        self.assertEqual(check(code), [
+            "[SEMÁNTICO] Tipo incompatible: no se puede asignar float a 'c' de tipo int en línea 11, columna 5",
+            "[SEMÁNTICO] Argumento 1 de 'suma': se esperaba int pero se encontró float en línea 12, columna 14",
+            "[SEMÁNTICO] 'mitad' espera 1 argumentos pero recibe 2 en línea 13, columna 9",
+            "[SEMÁNTICO] Falta el valor de retorno de 'main' en línea 14, columna 5",
+        ])
+
+    def test_locals_shadow_globals(self):
+        code = 'string s;\nint f(float s){\n    s = 1;\n    return s;\n}\n'
+        self.assertEqual(check(code), [
+            "[SEMÁNTICO] Retorno de 'f': se esperaba int pero se encontró float en línea 4, columna 5",
+        ])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+import main
+from watch import Watcher
+
+def write(path, text, stamp):
+    with open(path, 'w') as f:
+        f.write(text)
+    os.utime(path, ns=(stamp, stamp))
+
+class TestWatcher(unittest.TestCase):
+    def test_rechecks_only_changed_files_newest_first(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.mkdir(os.path.join(tmp, 'sub'))
+            old, new = os.path.join(tmp, 'a.src'), os.path.join(tmp, 'sub', 'b.src')
+            write(old, 'int a;\n', 1_000_000_000)
+            write(new, 'int b\n', 2_000_000_000)
+            write(os.path.join(tmp, 'notas.txt'), 'x', 3_000_000_000)
+
+            watcher = Watcher(tmp)
+            changed, removed = watcher.poll()
+            self.assertEqual((changed, removed), ([new, old], []))
+            results = list(watcher.check(changed))
+            self.assertEqual([r.path for r in results], [new, old])
+            self.assertEqual(watcher.failing(), 1)
+            self.assertEqual(watcher.poll(), ([], []))
+
+            write(new, 'int b;\n', 4_000_000_000)
+            os.remove(old)
+            changed, removed = watcher.poll()
+            self.assertEqual((changed, removed), ([new], [old]))
+            watcher.forget(removed)
+            list(watcher.check(changed))
+            self.assertEqual(list(watcher.results), [new])
+            self.assertEqual(watcher.failing(), 0)
+
+    def test_failing_file_does_not_stop_the_round(self):
+        check_file = main.check_file
+
+        def failing(path):
+            if path.endswith('a.src'):
+                raise RuntimeError("falla")
+            return check_file(path)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            write(os.path.join(tmp, 'a.src'), 'int a;\n', 1_000_000_000)
+            write(os.path.join(tmp, 'b.src'), 'int b;\n', 2_000_000_000)
+            for jobs in (1, 2):
+                watcher = Watcher(tmp, jobs)
+                # Un pool de hilos, para que el reemplazo de check_file se vea
+                watcher.pool = ThreadPoolExecutor(jobs)
+                changed, _ = watcher.poll()
+                with mock.patch('main.check_file', failing):
+                    results = sorted(watcher.check(changed))
+                watcher.close()
+                self.assertEqual([(os.path.basename(r.path), r.fatal and r.fatal.code)
+                                  for r in results], [('a.src', 'F003'), ('b.src', None)])
+                self.assertEqual(watcher.failing(), 1)
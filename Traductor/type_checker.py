@@ -0,0 +1,144 @@
+"""Comprobación de tipos de asignaciones, argumentos y retornos.
+
+El Parser llama a ``check_function`` con el nodo de cada función apenas la
+termina de analizar. En ese momento la tabla de símbolos tiene las firmas de
+las funciones ya declaradas (registradas una sola vez por
+``function_definition``) y sólo las variables globales, así que cada cuerpo
+se comprueba por separado, sin recorrer el resto del programa: en el
+análisis por trozos de parallel.py los cuerpos se comprueban en paralelo.
+
+Un int se acepta donde se espera un float; cualquier otra mezcla de tipos es
+un error. La aritmética entre int da int y con algún float da float; sobre
+string sólo vale '+' entre dos string. Las expresiones con nombres no
+declarados no tienen tipo y no se comprueban (el error ya lo informó la tabla
+de símbolos).
+
+Las expresiones se recorren en postorden con una pila explícita, como las
+construye el parser, así que su profundidad no está limitada por la recursión.
+"""
+from lexer import Token
+from nodes import Assign, BinOp, Call, Name, Number, Print, Return, Text, UnaryOp, VarDecl
+
+def operands(node):
+    kind = type(node)
+    if kind is BinOp:
+        return (node.left, node.right)
+    if kind is UnaryOp:
+        return (node.operand,)
+    if kind is Call:
+        return node.args
+    return ()
+
+def compatible(expected, found):
+    return found == expected or (expected == 'FLOAT' and found == 'INT')
+
+class TypeChecker:
+    def __init__(self, symbols, report):
+        self.symbols = symbols
+        self.report = report    # report(código, token, *args), p. ej. Parser.semantic_error
+        self.types = {}         # id(nodo) -> tipo, mientras se comprueba un cuerpo
+
+    def check_function(self, function):
+        local = {}
+        for param in function.params:
+            local.setdefault(param.name, param.type)
+        self.check_body(function.body, local, function)
+
+    def check_body(self, body, local=None, function=None):
+        """Comprueba una lista de sentencias; ``function`` es None fuera de una función"""
+        local = {} if local is None else local
+        try:
+            for statement in body:
+                kind = type(statement)
+                if kind is VarDecl:
+                    local.setdefault(statement.name, statement.type)
+                elif kind is Assign:
+                    expected = self.variable_type(statement.target, local)
+                    found = self.expression_type(statement.value, local)
+                    if expected and found and not compatible(expected, found):
+                        self.error('T001', statement, statement.target, found.lower(), expected.lower())
+                elif kind is Call:
+                    self.expression_type(statement, local)
+                elif kind is Print:
+                    self.expression_type(statement.value, local)
+                elif kind is Return:
+                    self.check_return(statement, local, function)
+        finally:
+            self.types.clear()
+
+    def check_return(self, statement, local, function):
+        if function is None:
+            self.error('T006', statement)
+        elif statement.value is None:
+            self.error('T005', statement, function.name)
+        else:
+            found = self.expression_type(statement.value, local)
+            if found and not compatible(function.type, found):
+                self.error('T004', statement, function.name, function.type.lower(), found.lower())
+
+    def variable_type(self, name, local):
+        found = local.get(name)
+        if found is None:
+            info = self.symbols.get_variable(name)
+            found = info.type if info is not None else None
+        return found
+
+    def expression_type(self, node, local):
+        types = self.types
+        stack = [node]
+        while stack:
+            current = stack[-1]
+            if id(current) in types:
+                stack.pop()
+                continue
+            pending = [child for child in operands(current) if id(child) not in types]
+            if pending:
+                stack.extend(reversed(pending))  # De izquierda a derecha
+                continue
+            stack.pop()
+            types[id(current)] = self.node_type(current, local)
+        return types[id(node)]
+
+    def node_type(self, node, local):
+        """Tipo de un nodo cuyos operandos ya tienen tipo en ``self.types``"""
+        kind = type(node)
+        if kind is Number:
+            return 'FLOAT' if isinstance(node.value, float) else 'INT'
+        if kind is Name:
+            return self.variable_type(node.id, local)
+        if kind is Text:
+            return 'STRING'
+        if kind is Call:
+            return self.call_type(node, local)
+        if kind is BinOp:
+            left, right = self.types[id(node.left)], self.types[id(node.right)]
+            if left is None or right is None:
+                return None
+            if left == right == 'STRING' and node.op == '+':
+                return 'STRING'
+            if 'STRING' in (left, right):
+                self.error('T007', node, node.op, left.lower(), right.lower())
+                return None
+            return 'FLOAT' if 'FLOAT' in (left, right) else 'INT'
+        if kind is UnaryOp:
+            found = self.types[id(node.operand)]
+            if found == 'STRING':
+                self.error('T008', node, node.op, 'string')
+                return None
+            return found
+        return None
+
+    def call_type(self, call, local):
+        info = self.symbols.get_function(call.name)
+        arg_types = [self.types[id(arg)] for arg in call.args]
+        if info is None:
+            return None
+        if len(call.args) != len(info.params):
+            self.error('T003', call, call.name, len(info.params), len(call.args))
+        for i, (arg, expected, found) in enumerate(zip(call.args, info.params, arg_types), 1):
+            if found and not compatible(expected, found):
+                self.error('T002', arg, call.name, i, expected.lower(), found.lower())
+        return info.return_type
+
+    def error(self, code, node, *args):
+        self.report(code, Token(None, None, node.line, node.column), *args)
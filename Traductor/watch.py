@@ -0,0 +1,166 @@
+"""Modo vigilancia: vuelve a analizar los archivos de un directorio al cambiar.
+
+Cada ``interval`` segundos se recorre el directorio y se compara el mtime y
+el tamaño de cada ``.src`` con los de la vuelta anterior (sondeo: la
+biblioteca estándar no trae inotify). Al ver un cambio se espera a que pasen
+``debounce`` segundos sin cambios nuevos, para que una ráfaga de guardados
+(un editor, un ``git checkout``) se analice una sola vez.
+
+Sólo se analizan los archivos que cambiaron, en el pool de procesos y
+empezando por el editado más recientemente, que suele ser el que se está
+mirando; cada resultado se imprime apenas llega. Los de los demás archivos se
+conservan en memoria. Un archivo no depende de otro (no hay inclusiones), así
+que un cambio nunca obliga a revisar otros archivos.
+
+Uso: python main.py --watch DIR [--interval 0.5] [--debounce 0.2]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import main
+
+class Watcher:
+    def __init__(self, directory, jobs=1, cache_dir=None, max_errors=None):
+        self.directory = directory
+        self.jobs = jobs
+        self.cache_dir = cache_dir
+        self.max_errors = max_errors
+        self.stamps = {}        # Ruta -> (mtime_ns, tamaño) de la última vuelta
+        self.results = {}       # Ruta -> último CheckResult
+        self.pool = None
+
+    def scan(self):
+        """Devuelve {ruta: (mtime_ns, tamaño)} de los fuentes del directorio"""
+        found = {}
+        pending = [self.directory]
+        while pending:
+            try:
+                entries = os.scandir(pending.pop())
+            except OSError:
+                continue  # Borrado entre la vuelta anterior y ésta
+            with entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(entry.path)
+                        elif entry.name.endswith('.src'):
+                            st = entry.stat()
+                            found[entry.path] = (st.st_mtime_ns, st.st_size)
+                    except OSError:
+                        pass
+        return found
+
+    def poll(self):
+        """Compara con la vuelta anterior; devuelve (cambiados, borrados).
+
+        Los cambiados van del editado más recientemente al más antiguo.
+        """
+        found = self.scan()
+        changed = [path for path, stamp in found.items() if self.stamps.get(path) != stamp]
+        removed = [path for path in self.stamps if path not in found]
+        self.stamps = found
+        changed.sort(key=lambda path: found[path][0], reverse=True)
+        return changed, removed
+
+    def wait_for_changes(self, interval, debounce):
+        """Sondea hasta ver cambios y a que se calmen; devuelve (cambiados, borrados)"""
+        while True:
+            changed, removed = self.poll()
+            if changed or removed:
+                break
+            time.sleep(interval)
+        changed, removed = set(changed), set(removed)
+        while True:
+            time.sleep(debounce)
+            more, gone = self.poll()
+            if not more and not gone:
+                break
+            changed.update(more)
+            removed.update(gone)
+            changed.difference_update(gone)
+        changed = sorted(changed, key=lambda path: self.stamps[path][0], reverse=True)
+        return changed, sorted(removed - set(self.stamps))
+
+    def check(self, paths):
+        """Analiza ``paths`` y genera cada CheckResult en cuanto termina.
+
+        Si el análisis de un archivo falla, su resultado es ese error (F003)
+        y la vigilancia sigue con los demás.
+        """
+        if self.jobs <= 1 or len(paths) <= 1:
+            results = self._check_serial(paths)
+        else:
+            results = self._check_pool(paths)
+        for result in results:
+            self.results[result.path] = result
+            yield result
+
+    def _check_serial(self, paths):
+        main.init_worker(self.cache_dir, self.max_errors)
+        for path in paths:
+            try:
+                yield main.check_file(path)
+            except Exception as e:
+                yield main.check_failed(path, e)
+
+    def _check_pool(self, paths):
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=self.jobs, initializer=main.init_worker,
+                                            initargs=(self.cache_dir, self.max_errors))
+        # Se envían en orden, del más reciente al más antiguo
+        futures = {self.pool.submit(main.check_file, path): path for path in paths}
+        broken = False
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                broken = broken or isinstance(e, BrokenProcessPool)
+                yield main.check_failed(futures[future], e)
+        if broken:
+            # Un proceso murió y el pool ya no acepta trabajo: la próxima
+            # vuelta crea otro
+            self.close()
+
+    def forget(self, paths):
+        for path in paths:
+            self.results.pop(path, None)
+
+    def failing(self):
+        return sum(1 for r in self.results.values() if r.fatal is not None or r.errors)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+def run(directory, writer, jobs=1, cache_dir=None, max_errors=None, interval=0.5, debounce=0.2,
+        status=sys.stderr):
+    """Vigila ``directory`` hasta Ctrl+C; ``writer`` es uno de diagnostics.WRITERS"""
+    if not os.path.isdir(directory):
+        print(f"Error: '{directory}' no es un directorio")
+        return 1
+    watcher = Watcher(directory, jobs, cache_dir, max_errors)
+    # La primera vuelta analiza todo el directorio
+    changed, removed = watcher.poll()
+    writer.begin()
+    try:
+        while True:
+            start = time.perf_counter()
+            for path in removed:
+                print(f"[BORRADO] {path}", file=status)
+            watcher.forget(removed)
+            for result in watcher.check(changed):
+                writer.write(result)
+            sys.stdout.flush()
+            print(f"[VIGILANDO] {len(changed)} revisados en {time.perf_counter() - start:.2f} s; "
+                  f"{watcher.failing()} de {len(watcher.results)} con errores", file=status)
+            changed, removed = watcher.wait_for_changes(interval, debounce)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        writer.end()
+    return 0 if not watcher.failing() else 1
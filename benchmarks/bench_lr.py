@@ -0,0 +1,127 @@
+"""Reducciones por segundo y memoria de tablas del motor LR compartido.
+
+Compara el bucle anterior de compilador.parse (listas de listas y
+``stack = stack[:-2 * rhs_len]`` en cada reducción) con lr_engine.LRParser
+(tablas comprimidas en arrays y pilas modificadas en su lugar).
+
+Uso: python benchmarks/bench_lr.py [--ids 1000000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from lr_engine import LRParser
+
+# E -> E + id | id, con la regla aumentada S' -> E como producción 1
+# Terminales: id = 0, + = 1, $ = 2; no terminales: E = 3, S' = 4
+PRODUCTIONS = [(4, 1), (3, 3), (3, 1)]
+ACTION = [
+    [2, 0, 0],
+    [0, 3, -1],
+    [0, -3, -3],
+    [4, 0, 0],
+    [0, -2, -2],
+]
+GOTO = [[1, 0], [0, 0], [0, 0], [0, 0], [0, 0]]
+
+# E -> id + E | id: recursiva por la derecha, la pila crece con la entrada
+DEEP_PRODUCTIONS = [(4, 1), (3, 3), (3, 1)]
+DEEP_ACTION = [
+    [2, 0, 0],
+    [0, 0, -1],
+    [0, 3, -3],
+    [2, 0, 0],
+    [0, 0, -2],
+]
+DEEP_GOTO = [[1, 0], [0, 0], [0, 0], [4, 0], [0, 0]]
+
+def legacy_parse(tokens, productions, action_table, goto_table):
+    """Bucle de compilador.parse anterior al motor compartido"""
+    stack = [0]
+    token_index = 0
+    current_token = tokens[token_index] if tokens else 2
+    reductions = 0
+    while True:
+        state = stack[-1]
+        action = action_table[state][current_token]
+        if action > 0:
+            stack.append(current_token)
+            stack.append(action)
+            token_index += 1
+            current_token = tokens[token_index] if token_index < len(tokens) else 2
+        elif action == -1:
+            return reductions
+        elif action < 0:
+            lhs, rhs_len = productions[-action - 1]
+            stack = stack[:-2 * rhs_len]
+            state = stack[-1]
+            stack.append(lhs)
+            stack.append(goto_table[state][lhs - 3])
+            reductions += 1
+        else:
+            raise SyntaxError(f"Error de sintaxis en token {current_token}")
+
+def measure(tokens, reductions, productions, action, goto):
+    start = time.perf_counter()
+    legacy_parse(tokens, productions, action, goto)
+    legacy = time.perf_counter() - start
+
+    engine = LRParser.from_dense(productions, action, goto, accept=-1, nonterminal_base=3)
+    start = time.perf_counter()
+    engine.parse(tokens, 2)
+    shared = time.perf_counter() - start
+
+    print(f'  anterior    {reductions / legacy:12,.0f} reducciones/s')
+    print(f'  lr_engine   {reductions / shared:12,.0f} reducciones/s')
+
+def dense_bytes(rows):
+    """Memoria aproximada de una tabla como lista de listas de int"""
+    ints = {v for row in rows for v in row if not -5 <= v <= 256}
+    return (sys.getsizeof(rows) + sum(sys.getsizeof(row) for row in rows)
+            + sum(sys.getsizeof(v) for v in ints))
+
+def synthetic_table(states, terminals, nonterminals, seed=0):
+    """Tablas dispersas con la forma típica de un LALR: pocos desplazamientos
+    por fila y, en los estados que reducen, la misma reducción repetida"""
+    rng = random.Random(seed)
+    action, goto = [], []
+    for _ in range(states):
+        row = [0] * terminals
+        if rng.random() < 0.5:
+            reduction = -rng.randrange(2, 100)
+            for t in rng.sample(range(terminals), rng.randrange(1, terminals)):
+                row[t] = reduction
+        for t in rng.sample(range(terminals), rng.randrange(0, 4)):
+            row[t] = rng.randrange(1, states)
+        action.append(row)
+        g = [0] * nonterminals
+        for n in rng.sample(range(nonterminals), rng.randrange(0, 3)):
+            g[n] = rng.randrange(1, states)
+        goto.append(g)
+    return action, goto
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--ids', type=int, default=1_000_000)
+    ap.add_argument('--deep-ids', type=int, default=20_000,
+                    help="identificadores para el caso de pila profunda")
+    args = ap.parse_args()
+
+    print(f'pila plana (E -> E + id | id), {args.ids} reducciones')
+    measure([0] + [1, 0] * (args.ids - 1) + [2], args.ids, PRODUCTIONS, ACTION, GOTO)
+    print(f'pila profunda (E -> id + E | id), {args.deep_ids} reducciones')
+    measure([0] + [1, 0] * (args.deep_ids - 1) + [2], args.deep_ids,
+            DEEP_PRODUCTIONS, DEEP_ACTION, DEEP_GOTO)
+
+    action, goto = synthetic_table(500, 24, 22)
+    compressed = LRParser.from_dense([(24, 1)] * 100, action, goto, accept=-1, nonterminal_base=24)
+    print('tabla sintética de 500 estados x (24 + 22) símbolos')
+    print(f'listas de listas {dense_bytes(action) + dense_bytes(goto):10,} bytes')
+    print(f'comprimida       {compressed.action.nbytes + compressed.goto.nbytes:10,} bytes')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+"""Tokens por segundo de cada lexer antes y después del escáner compartido.
+
+Las versiones anteriores se reproducen aquí tal como estaban: el Lexer de
+Traductor compilaba su expresión regular en cada instancia, compilador.lexer
+y "simbolos lexicos.py" la reconstruían en cada llamada, y el Lexico de
+"ejercicio 1.py" recorría la cadena carácter a carácter.
+
+Se miden dos casos: un archivo grande y muchos archivos pequeños (donde pesa
+el costo de preparar el lexer en cada llamada).
+
+Uso: python benchmarks/bench_scanner.py [--repeat 2000]
+"""
+import argparse
+import importlib.util
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'Traductor'))
+sys.path.insert(0, ROOT)
+
+import compilador
+from lexer import Lexer, Token
+
+def load_script(name):
+    """Importa un ejercicio cuyo nombre de archivo tiene espacios"""
+    import contextlib
+    import io
+    spec = importlib.util.spec_from_file_location(name.replace(' ', '_'), os.path.join(ROOT, name))
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+# ------------------------------
+# Versiones anteriores
+# ------------------------------
+def legacy_traductor(text):
+    spec = [
+        ('NUMBER', r'\d+(\.\d*)?'), ('ID', r'[A-Za-z_]\w*'), ('ASSIGN', r'='), ('SEMI', r';'),
+        ('LPAREN', r'\('), ('RPAREN', r'\)'), ('LBRACE', r'\{'), ('RBRACE', r'\}'),
+        ('COLON', r':'), ('COMMA', r','), ('OP', r'[+\-*/]'), ('NEWLINE', r'\n'),
+        ('SKIP', r'[ \t]+'), ('STRING', r'"[^"\n]*"'), ('MISMATCH', r'.'),
+    ]
+    keywords = {'var': 'VAR', 'int': 'INT', 'float': 'FLOAT', 'string': 'STRING',
+                'print': 'PRINT', 'program': 'PROGRAM'}
+    regex = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in spec))
+    tokens = []
+    line = column = 1
+    for mo in regex.finditer(text):
+        kind = mo.lastgroup
+        value = raw_value = mo.group()
+        if kind == 'NUMBER':
+            value = float(value) if '.' in value else int(value)
+        elif kind == 'ID':
+            kind = keywords.get(value, 'ID')
+        elif kind == 'NEWLINE':
+            line += 1
+            column = 1
+            continue
+        elif kind == 'SKIP':
+            column += len(value)
+            continue
+        tokens.append(Token(kind, value, line, column))
+        column += len(raw_value)
+    tokens.append(Token('EOF', '', line, column))
+    return tokens
+
+def legacy_compilador(code):
+    token_specifications = [
+        ("TYPE", r"\b(int|float|string)\b"), ("KEYWORD", r"\b(if|while|return|else)\b"),
+        ("OPRELAC", r"<=|>=|<|>"), ("OPIGUALDAD", r"=="), ("OPSUMA", r"\+|-"), ("OPMUL", r"\*|/"),
+        ("LOGIC_OR", r"\bor\b"), ("LOGIC_AND", r"\band\b"), ("LOGIC_NOT", r"\bnot\b"),
+        ("ASIGNACION", r"="), ("SYMBOL", r";|,|\(|\)|{|}"), ("ENTERO", r"\d+"),
+        ("REAL", r"\d+\.\d+"), ("CADENA", r'"[^"]*"'), ("ID", r"\b[a-zA-Z_][a-zA-Z0-9_]*\b"),
+        ("EOF", r"\$"), ("WHITESPACE", r"\s+"),
+    ]
+    tokens = []
+    for match in re.finditer(
+        "|".join(f"(?P<{name}>{pattern})" for name, pattern in token_specifications), code
+    ):
+        if match.lastgroup == "WHITESPACE":
+            continue
+        tokens.append((match.lastgroup, match.group()))
+    return tokens
+
+def legacy_simbolos(code):
+    token_specifications = [
+        ("ID", r"\b[a-zA-Z_][a-zA-Z0-9_]*\b"), ("NUMBER", r"\d+(\.\d+)?"), ("STRING", r'"[^"]*"'),
+        ("TYPE", r"\b(int|float|string)\b"), ("OP", r"[+\-*/]|==|<=|>=|<|>|="),
+        ("LOGIC", r"\b(or|and|not)\b"), ("SYMBOL", r"[;,()\{\}]"),
+        ("KEYWORD", r"\b(if|while|return|else)\b"), ("EOF", r"\$"), ("WHITESPACE", r"\s+"),
+    ]
+    regex_compiled = re.compile("|".join(f"(?P<{name}>{pattern})" for name, pattern in token_specifications))
+    return [(m.lastgroup, m.group()) for m in regex_compiled.finditer(code) if m.lastgroup != "WHITESPACE"]
+
+def legacy_lexico(cadena):
+    tokens = []
+    pos = 0
+    while pos < len(cadena):
+        if cadena[pos].isalpha():
+            while pos < len(cadena) and cadena[pos].isalpha():
+                pos += 1
+            tokens.append(0)
+        elif cadena[pos] == '+':
+            tokens.append(1)
+            pos += 1
+        else:
+            raise ValueError(cadena[pos])
+    tokens.append(2)
+    return tokens
+
+# ------------------------------
+# Medición
+# ------------------------------
+def rate(function, inputs):
+    start = time.perf_counter()
+    count = 0
+    for text in inputs:
+        result = function(text)
+        count += result if isinstance(result, int) else len(result)
+    return count / (time.perf_counter() - start)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--repeat', type=int, default=2000)
+    args = ap.parse_args()
+
+    simbolos = load_script('simbolos lexicos.py')
+    ejercicio1 = load_script('ejercicio 1.py')
+
+    c_source = 'int suma(int a, int b){\n    c = suma(8.5, 9.9);\n    int x;\n}\n'
+    lr_source = 'int x = 10; if (x > 5 and not y) { return x + 1; } else { return 0; }\n'
+    cases = [
+        ('Traductor Lexer', c_source, legacy_traductor,
+         lambda text: list(Lexer().tokenize(text))),
+        ('compilador.lexer', lr_source, legacy_compilador, compilador.lexer),
+        ('simbolos lexicos', lr_source, legacy_simbolos, simbolos.lexer),
+        ('ejercicio 1 Lexico', 'hola+mundo+', legacy_lexico,
+         lambda text: ejercicio1.Lexico(text).analisis_lexico()),
+    ]
+    print(f'{"lexer":20} {"caso":9} {"anterior":>14} {"escáner":>14}  (tokens/s)')
+    for name, sample, legacy, shared in cases:
+        for label, inputs in (('grande', [sample * args.repeat]), ('pequeños', [sample] * args.repeat)):
+            print(f'{name:20} {label:9} {rate(legacy, inputs):14,.0f} {rate(shared, inputs):14,.0f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Memoria pico (RSS) del análisis de un archivo grande según la ruta usada.
+
+Cada modo se ejecuta en un proceso hijo para medir su ``ru_maxrss`` aislado:
+
+- list:   f.read() + list(Lexer().tokenize(...)) + Parser(lista)
+- buffer: f.read() + Lexer().tokenize_buffer(...) + Parser(buffer)
+- stream: Parser(Lexer().tokenize_stream(f), keep_tree=False), léxico y
+          sintáctico en una pasada sin guardar el árbol, como main.analyze_file
+
+Uso: python benchmarks/bench_stream.py [--lines 1000000]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+TRADUCTOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Traductor')
+
+MODES = {
+    'list': (
+        "with open(path, encoding='utf-8') as f: codigo = f.read()\n"
+        "Parser(list(Lexer().tokenize(codigo))).parse()\n"
+    ),
+    'buffer': (
+        "with open(path, encoding='utf-8') as f: codigo = f.read()\n"
+        "Parser(Lexer().tokenize_buffer(codigo)).parse()\n"
+    ),
+    'stream': (
+        "with open(path, encoding='utf-8') as f:\n"
+        "    Parser(Lexer().tokenize_stream(f), keep_tree=False).parse()\n"
+    ),
+}
+
+
+def write_source(path, lines):
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(0, lines, 4):
+            f.write(f'int f{i}(int a, float b){{\n')
+            f.write(f'    x{i} = g(a, 3.5);\n')
+            f.write('    int y;\n')
+            f.write('}\n')
+
+
+def run_mode(mode, path):
+    code = (
+        'import sys\n'
+        f'sys.path.insert(0, {TRADUCTOR!r})\n'
+        'from lexer import Lexer\n'
+        'from parser import Parser\n'
+        f'path = {path!r}\n'
+        + MODES[mode] +
+        'import resource\n'
+        'print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n'
+    )
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, '-c', code], check=True,
+                         capture_output=True, text=True).stdout
+    return int(out.split()[-1]), time.perf_counter() - start
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--lines', type=int, default=1_000_000)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'grande.src')
+        write_source(path, args.lines)
+        size = os.path.getsize(path) / 2**20
+        print(f'{args.lines} líneas, {size:.1f} MiB')
+        for mode in MODES:
+            rss_kib, seconds = run_mode(mode, path)
+            print(f'{mode:8} pico RSS {rss_kib / 1024:8.1f} MiB  {seconds:6.2f} s')
+
+
+if __name__ == '__main__':
+    main()
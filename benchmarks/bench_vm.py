@@ -0,0 +1,144 @@
+"""Ejecución de programas del dialecto program: intérprete de árbol contra bytecode.
+
+Genera un programa grande con asignaciones aritméticas (las divisiones son
+siempre por constantes distintas de cero) y algunos ``print``, y mide:
+
+- interpretar el AST directamente, buscando cada variable por nombre en un
+  dict, como haría un intérprete recorriendo el árbol
+- compilar el AST a bytecode (bytecode.compile_program)
+- ejecutar el bytecode en la máquina virtual (bytecode.run)
+- leer el bytecode guardado en disco (bytecode.load_code) frente a volver a
+  analizar y compilar el fuente
+
+Uso: python benchmarks/bench_vm.py [--statements 200000] [--seed 0]
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Traductor'))
+
+import bytecode
+from nodes import Assign, Name, Number, Print, Text, UnaryOp, VarDecl
+
+def generate(statements, seed=0):
+    rand = random.Random(seed)
+    ints = [f'i{k}' for k in range(8)]
+    floats = [f'r{k}' for k in range(8)]
+    out = ['program Bench {']
+    out.extend(f'    var {name}: int;' for name in ints)
+    out.extend(f'    var {name}: float;' for name in floats)
+
+    def expression(names, depth=2):
+        if depth == 0 or rand.random() < 0.3:
+            return rand.choice(names) if rand.random() < 0.7 else str(rand.randint(1, 99))
+        op = rand.choice('+-*/')
+        left = expression(names, depth - 1)
+        right = str(rand.randint(1, 9)) if op == '/' else expression(names, depth - 1)
+        return f'({left} {op} {right})'
+
+    for k in range(statements):
+        if k % 50 == 49:
+            out.append(f'    print({rand.choice(ints + floats)});')
+        elif rand.random() < 0.4:
+            out.append(f'    {rand.choice(floats)} = {expression(ints + floats)};')
+        else:
+            # Se reduce el valor para que los int no crezcan sin límite
+            out.append(f'    {rand.choice(ints)} = {expression(ints)} / 1000;')
+    out.append('}')
+    out.append('')
+    return '\n'.join(out)
+
+def interpret(program, out):
+    """Intérprete de referencia: recorre el árbol y busca los nombres en un dict"""
+    env = {}
+    types = {}
+
+    def value(node):
+        kind = type(node)
+        if kind is Name:
+            return env[node.id]
+        if kind is Number or kind is Text:
+            return node.value
+        if kind is UnaryOp:
+            return -value(node.operand) if node.op == '-' else value(node.operand)
+        left, right = value(node.left), value(node.right)
+        if node.op == '+':
+            return left + right
+        if node.op == '-':
+            return left - right
+        if node.op == '*':
+            return left * right
+        if type(left) is int and type(right) is int:
+            if left >= 0 and right > 0:
+                return left // right
+            quotient = abs(left) // abs(right)
+            return quotient if (left < 0) == (right < 0) else -quotient
+        return left / right
+
+    for statement in program.body:
+        kind = type(statement)
+        if kind is VarDecl:
+            types[statement.name] = statement.type
+            env[statement.name] = bytecode.DEFAULTS[statement.type]
+        elif kind is Assign:
+            result = value(statement.value)
+            env[statement.target] = float(result) if types[statement.target] == 'FLOAT' else result
+        elif kind is Print:
+            out.write(f"{value(statement.value)}\n")
+
+def best_of(function, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--statements', type=int, default=200_000)
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--repeat', type=int, default=3)
+    args = ap.parse_args()
+
+    from lexer import Lexer
+    from parser import Parser
+    text = generate(args.statements, args.seed)
+    tree = Parser(Lexer().tokenize(text)).parse()
+    compiled = bytecode.compile_program(tree)
+    instructions = len(compiled.lines)
+
+    walked, executed = io.StringIO(), io.StringIO()
+    interpret(tree, walked)
+    bytecode.run(compiled, executed)
+    if walked.getvalue() != executed.getvalue():
+        print("Error: el intérprete y la máquina virtual no imprimen lo mismo", file=sys.stderr)
+        return 1
+
+    tree_time = best_of(lambda: interpret(tree, io.StringIO()), args.repeat)
+    compile_time = best_of(lambda: bytecode.compile_program(tree), args.repeat)
+    vm_time = best_of(lambda: bytecode.run(compiled, io.StringIO()), args.repeat)
+    print(f'{args.statements:,} sentencias, {instructions:,} instrucciones')
+    print(f'intérprete de árbol   {tree_time:8.3f} s')
+    print(f'compilar a bytecode   {compile_time:8.3f} s')
+    print(f'máquina virtual       {vm_time:8.3f} s  {instructions / vm_time:14,.0f} instr/s '
+          f'({tree_time / vm_time:.1f}x)')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, 'bench.src')
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write(text)
+        bytecode.save_code(compiled, source)
+        parse_time = best_of(lambda: bytecode.compile_source(text), args.repeat)
+        load_time = best_of(lambda: bytecode.load_code(source + 'b', source), args.repeat)
+        print(f'analizar y compilar   {parse_time:8.3f} s')
+        print(f'cargar de disco       {load_time:8.3f} s  ({parse_time / load_time:.0f}x)')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""Generador de programas sintéticos para los benchmarks.
+
+Escribe programas de cualquier tamaño en los dos dialectos de Traductor:
+
+- c:       declaraciones globales y funciones al estilo de
+           samples/valid/ejemplo2.src (también válidas para compilador.gram)
+- program: un único bloque ``program X() { ... }``
+
+Con la misma semilla la salida es siempre la misma. Los programas válidos no
+tienen errores léxicos, sintácticos ni de tipos; con ``--invalid`` se
+inyecta en algunas sentencias un error de cada clase (carácter inválido,
+';' faltante, nombre no declarado, tipos incompatibles).
+
+Uso: python benchmarks/generate.py [--dialect c] [--units 1000] [--seed 0] [--invalid] [-o archivo]
+"""
+import argparse
+import random
+import sys
+
+DIALECTS = ('c', 'program')
+
+# Una de cada INVALID_RATE sentencias lleva un error en los programas inválidos
+INVALID_RATE = 8
+
+class Generator:
+    def __init__(self, seed=0, invalid=False):
+        self.random = random.Random(seed)
+        self.invalid = invalid
+
+    def expression(self, names, depth=2):
+        """Expresión sobre ``names``, que deben poder asignarse al destino"""
+        rand = self.random
+        if depth == 0 or rand.random() < 0.3:
+            if names and rand.random() < 0.7:
+                return rand.choice(names)
+            return str(rand.randint(0, 999))
+        op = rand.choice('+-*/')
+        left = self.expression(names, depth - 1)
+        right = self.expression(names, depth - 1)
+        if rand.random() < 0.2:
+            return f'({left} {op} {right})'
+        return f'{left} {op} {right}'
+
+    def statement(self, ints, floats, calls=()):
+        """Una asignación válida, o con un error si toca"""
+        rand = self.random
+        if floats and rand.random() < 0.4:
+            target = rand.choice(floats)
+            value = self.expression(ints + floats)
+            if calls and rand.random() < 0.3:
+                value = f'{value} + {rand.choice(calls)}({rand.choice(ints)}, {rand.choice(floats)})'
+        else:
+            target = rand.choice(ints)
+            value = self.expression(ints)
+        line = f'{target} = {value};'
+        if self.invalid and rand.randrange(INVALID_RATE) == 0:
+            line = self.break_statement(line, target, ints)
+        return line
+
+    def break_statement(self, line, target, ints):
+        kind = self.random.randrange(4)
+        if kind == 0:
+            return line.replace('=', '= $', 1)
+        if kind == 1:
+            return line[:-1]
+        if kind == 2:
+            return line.replace(target, 'no_declarada', 1)
+        return f'{self.random.choice(ints)} = 2.5;'  # float en un int
+
+    def c_program(self, units):
+        out = ['int total;', 'float media;', '']
+        calls = []
+        for k in range(units):
+            out.append(f'int f{k}(int a, float b){{')
+            out.append('    int x;')
+            out.append('    float y;')
+            for _ in range(self.random.randint(2, 6)):
+                out.append('    ' + self.statement(['a', 'x', 'total'], ['b', 'y', 'media'], calls))
+            out.append('    return x;')
+            out.append('}')
+            out.append('')
+            calls.append(f'f{k}')
+            if len(calls) > 16:
+                calls.pop(0)
+        return '\n'.join(out)
+
+    def program_program(self, units):
+        ints = [f'i{k}' for k in range(8)]
+        floats = [f'r{k}' for k in range(8)]
+        out = ['program Generado() {']
+        out.extend(f'    int {name};' for name in ints)
+        out.extend(f'    float {name};' for name in floats)
+        for _ in range(units * 4):
+            out.append('    ' + self.statement(ints, floats))
+        out.append('}')
+        out.append('')
+        return '\n'.join(out)
+
+def generate(dialect='c', units=1000, seed=0, invalid=False):
+    """Devuelve el texto de un programa; ``units`` escala su tamaño (funciones en 'c')"""
+    generator = Generator(seed, invalid)
+    if dialect == 'c':
+        return generator.c_program(units)
+    if dialect == 'program':
+        return generator.program_program(units)
+    raise ValueError(f'dialecto desconocido: {dialect}')
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument('--dialect', choices=DIALECTS, default='c')
+    ap.add_argument('--units', type=int, default=1000)
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--invalid', action='store_true')
+    ap.add_argument('-o', '--output', help="archivo de salida (por defecto, stdout)")
+    args = ap.parse_args()
+
+    text = generate(args.dialect, args.units, args.seed, args.invalid)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""Suite de benchmarks con resultados en JSON y comparación contra una línea base.
+
+``run`` genera programas con generate.py (misma semilla, mismos programas) y
+mide, para cada etapa, el mejor tiempo de ``--repeat`` corridas, los tokens
+y megabytes por segundo, y el pico de memoria asignada durante la etapa
+(con tracemalloc, en una corrida aparte para no inflar los tiempos):
+
+- traductor.lex / traductor.parse: Lexer.tokenize y Parser.parse, en los dos
+  dialectos, con programas válidos e inválidos
+- compilador.lexer / compilador.translate_tokens / compilador.parse: sólo
+  el dialecto C válido, el único que acepta compilador.gram
+
+``compare`` marca como regresión toda etapa cuyo throughput cae, o cuyo pico
+de memoria crece, más que ``--threshold`` respecto de la línea base, y
+termina con código 1 si hay alguna. La línea base guardada
+(benchmarks/baseline.json) es de una máquina concreta: conviene regenerarla
+con ``run -o`` en la máquina donde se compara.
+
+Uso: python benchmarks/suite.py run [--units 2000] [--repeat 3] [-o resultados.json]
+     python benchmarks/suite.py compare [--baseline benchmarks/baseline.json] resultados.json
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, '..')
+sys.path.insert(0, os.path.join(ROOT, 'Traductor'))
+sys.path.insert(0, ROOT)
+
+import compilador
+from generate import generate
+from lexer import Lexer
+from parser import Parser
+
+BASELINE = os.path.join(HERE, 'baseline.json')
+DEFAULT_THRESHOLD = 0.2
+
+def cases(units, seed):
+    """Genera (nombre, función, bytes, tokens) de cada etapa a medir"""
+    table = os.path.join(ROOT, 'compilador.Ir')
+    if not os.path.exists(table):  # No se versiona: se genera desde la gramática
+        from lalr import generate as generate_table
+        generate_table(os.path.join(ROOT, 'compilador.gram'), table, compilador.TERMINALS)
+    productions, action, goto = compilador.load_grammar(table)
+    for dialect in ('c', 'program'):
+        for invalid in (False, True):
+            text = generate(dialect, units, seed, invalid)
+            size = len(text.encode('utf-8'))
+            tokens = list(Lexer(recover=True).tokenize(text))
+            suffix = f"[{dialect},{'invalid' if invalid else 'valid'}]"
+            yield ('traductor.lex' + suffix, lambda text=text: list(Lexer(recover=True).tokenize(text)),
+                   size, len(tokens))
+            yield ('traductor.parse' + suffix, lambda tokens=tokens: Parser(tokens).parse(),
+                   size, len(tokens))
+            if dialect != 'c' or invalid:
+                continue
+            raw = compilador.lexer(text)
+            codes = compilador.translate_tokens(raw)
+            yield ('compilador.lexer' + suffix, lambda text=text: compilador.lexer(text), size, len(raw))
+            yield ('compilador.translate_tokens' + suffix,
+                   lambda raw=raw: compilador.translate_tokens(raw), size, len(raw))
+            yield ('compilador.parse' + suffix,
+                   lambda codes=codes: compilador.parse(codes, productions, action, goto), size, len(codes))
+
+def measure(function, repeat):
+    """Devuelve (mejor tiempo, pico de memoria asignada)"""
+    best = float('inf')
+    with contextlib.redirect_stdout(io.StringIO()):  # compilador.parse imprime
+        for _ in range(repeat):
+            gc.collect()
+            start = time.perf_counter()
+            function()
+            best = min(best, time.perf_counter() - start)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            function()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return best, peak
+
+def run(units, seed, repeat):
+    results = {}
+    for name, function, size, ntokens in cases(units, seed):
+        seconds, peak = measure(function, repeat)
+        results[name] = {
+            'seconds': seconds,
+            'tokens': ntokens,
+            'tokens_per_s': ntokens / seconds,
+            'mb_per_s': size / 2**20 / seconds,
+            'peak_bytes': peak,
+        }
+        print(f'{name:45} {ntokens / seconds:12,.0f} tokens/s {size / 2**20 / seconds:7.2f} MB/s '
+              f'{peak / 2**20:8.1f} MiB', file=sys.stderr)
+    return {
+        'meta': {'units': units, 'seed': seed, 'repeat': repeat,
+                 'python': platform.python_version(), 'machine': platform.machine()},
+        'results': results,
+    }
+
+def compare(baseline, current, threshold):
+    """Devuelve las líneas del informe y si hubo regresiones"""
+    lines = []
+    regressed = False
+    for name, base in baseline['results'].items():
+        now = current['results'].get(name)
+        if now is None:
+            lines.append(f'{name:45} falta en los resultados')
+            continue
+        speed = now['tokens_per_s'] / base['tokens_per_s'] - 1
+        memory = now['peak_bytes'] / base['peak_bytes'] - 1 if base['peak_bytes'] else 0.0
+        flags = []
+        if speed < -threshold:
+            flags.append('más lento')
+        if memory > threshold:
+            flags.append('más memoria')
+        regressed = regressed or bool(flags)
+        lines.append(f'{name:45} velocidad {speed:+7.1%}  memoria {memory:+7.1%}'
+                     + (f'  REGRESIÓN: {", ".join(flags)}' if flags else ''))
+    if baseline['meta'].get('units') != current['meta'].get('units'):
+        lines.append('Aviso: la línea base se midió con otro tamaño de programa')
+    return lines, regressed
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = ap.add_subparsers(dest='command', required=True)
+    run_ap = commands.add_parser('run', help="medir y escribir los resultados en JSON")
+    run_ap.add_argument('--units', type=int, default=2000)
+    run_ap.add_argument('--seed', type=int, default=0)
+    run_ap.add_argument('--repeat', type=int, default=3)
+    run_ap.add_argument('-o', '--output', help="archivo JSON (por defecto, stdout)")
+    compare_ap = commands.add_parser('compare', help="comparar resultados con la línea base")
+    compare_ap.add_argument('results')
+    compare_ap.add_argument('--baseline', default=BASELINE)
+    compare_ap.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                            help="variación tolerada (por defecto, %(default)s)")
+    args = ap.parse_args()
+
+    if args.command == 'run':
+        text = json.dumps(run(args.units, args.seed, args.repeat), indent=2)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(text + '\n')
+        else:
+            print(text)
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.results, encoding='utf-8') as f:
+        current = json.load(f)
+    lines, regressed = compare(baseline, current, args.threshold)
+    print('\n'.join(lines))
+    return 1 if regressed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,38 +1,44 @@
-import re
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from lr_engine import CompressedTable, LRParser, action_defaults, goto_defaults, pack_rows
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Traductor"))
+from scanner import Scanner, compile_spec
 
 # ------------------------------
 # Analizador Léxico
 # ------------------------------
+TOKEN_SPECIFICATION = (
+    ("OPRELAC", r"<=|>=|<|>"),
+    ("OPIGUALDAD", r"=="),
+    ("OPSUMA", r"\+|-"),
+    ("OPMUL", r"\*|/"),
+    ("ASIGNACION", r"="),
+    ("SYMBOL", r";|,|\(|\)|{|}"),
+    ("REAL", r"\d+\.\d+"),
+    ("ENTERO", r"\d+"),
+    ("CADENA", r'"[^"]*"'),
+    ("ID", r"\b[a-zA-Z_][a-zA-Z0-9_]*\b"),
+    ("EOF", r"\$"),
+    ("WHITESPACE", r"\s+"),
+)
+
+# Palabras reservadas: se reconocen como ID y se reclasifican por diccionario
+KEYWORDS = {
+    "int": "TYPE", "float": "TYPE", "string": "TYPE",
+    "if": "KEYWORD", "while": "KEYWORD", "return": "KEYWORD", "else": "KEYWORD",
+    "or": "LOGIC_OR", "and": "LOGIC_AND", "not": "LOGIC_NOT",
+}
+
+SCANNER = Scanner(TOKEN_SPECIFICATION, KEYWORDS)
+
 def lexer(code):
-    token_specifications = [
-        ("TYPE", r"\b(int|float|string)\b"),
-        ("KEYWORD", r"\b(if|while|return|else)\b"),
-        ("OPRELAC", r"<=|>=|<|>"),
-        ("OPIGUALDAD", r"=="),
-        ("OPSUMA", r"\+|-"),
-        ("OPMUL", r"\*|/"),
-        ("LOGIC_OR", r"\bor\b"),
-        ("LOGIC_AND", r"\band\b"),
-        ("LOGIC_NOT", r"\bnot\b"),
-        ("ASIGNACION", r"="),
-        ("SYMBOL", r";|,|\(|\)|{|}"),
-        ("ENTERO", r"\d+"),
-        ("REAL", r"\d+\.\d+"),
-        ("CADENA", r'"[^"]*"'),
-        ("ID", r"\b[a-zA-Z_][a-zA-Z0-9_]*\b"),
-        ("EOF", r"\$"),
-        ("WHITESPACE", r"\s+"),
-    ]
-
-    tokens = []
-    for match in re.finditer(
-        "|".join(f"(?P<{name}>{pattern})" for name, pattern in token_specifications), code
-    ):
-        token_type = match.lastgroup
-        token_value = match.group()
-        if token_type == "WHITESPACE":
-            continue
-        tokens.append((token_type, token_value))
+    tokens = list(SCANNER.scan(code, skip=("WHITESPACE",)))
     
     if not tokens or tokens[-1][0] != "EOF":
         tokens.append(("EOF", "$"))
@@ -54,27 +60,84 @@ token_map = {
     "LOGIC_AND": 9,
     "LOGIC_NOT": 10,
     "OPIGUALDAD": 11,
-    "SYMBOL": lambda v: 12 if v == ";" else 13 if v == "," else 14 if v == "(" else 15 if v == ")" else 16 if v == "{" else 17,
+    "SYMBOL": {";": 12, ",": 13, "(": 14, ")": 15, "{": 16, "}": 17},
     "ASIGNACION": 18,
-    "KEYWORD": lambda v: 19 if v == "if" else 20 if v == "while" else 21 if v == "return" else 22,
+    "KEYWORD": {"if": 19, "while": 20, "return": 21, "else": 22},
     "EOF": 23,
 }
 
+# Nombre de cada código de terminal, tal como se usan en compilador.gram
+TERMINALS = [
+    "ID", "ENTERO", "REAL", "CADENA", "TYPE", "OPSUMA", "OPMUL", "OPRELAC",
+    "LOGIC_OR", "LOGIC_AND", "LOGIC_NOT", "OPIGUALDAD",
+    ";", ",", "(", ")", "{", "}", "=", "if", "while", "return", "else", "$",
+]
+
 def translate_tokens(tokens):
     translated = []
     for token_type, value in tokens:
-        if token_type == "SYMBOL":
-            translated.append(token_map["SYMBOL"](value))
-        elif token_type == "KEYWORD":
-            translated.append(token_map["KEYWORD"](value))
-        else:
-            translated.append(token_map[token_type])
+        code = token_map[token_type]
+        translated.append(code[value] if type(code) is dict else code)
     return translated
 
+# ------------------------------
+# Códigos de token directos
+# ------------------------------
+# Cada símbolo tiene su propio grupo, así el número del grupo que coincide
+# (mo.lastindex) da el código sin pasar por tuplas intermedias. Los patrones
+# no tienen subgrupos, por lo que el grupo i es la regla i; las reglas más
+# frecuentes van primero porque la alternancia se prueba en orden.
+CODE_SPECIFICATION = (
+    ("WHITESPACE", r"\s+"),
+    ("ID", r"\b[a-zA-Z_][a-zA-Z0-9_]*\b"),
+    ("REAL", r"\d+\.\d+"),
+    ("ENTERO", r"\d+"),
+    ("PUNTO_Y_COMA", r";"),
+    ("PAR_IZQ", r"\("),
+    ("PAR_DER", r"\)"),
+    ("COMA", r","),
+    ("LLAVE_IZQ", r"{"),
+    ("LLAVE_DER", r"}"),
+    ("OPIGUALDAD", r"=="),
+    ("ASIGNACION", r"="),
+    ("OPRELAC", r"<=|>=|<|>"),
+    ("OPSUMA", r"\+|-"),
+    ("OPMUL", r"\*|/"),
+    ("CADENA", r'"[^"]*"'),
+    ("EOF", r"\$"),
+)
+GROUP_CODES = (None, None, 0, 2, 1, 12, 14, 15, 13, 16, 17, 11, 18, 7, 5, 6, 3, 23)
+KEYWORD_CODES = {
+    lexeme: token_map[kind] if type(token_map[kind]) is int else token_map[kind][lexeme]
+    for lexeme, kind in KEYWORDS.items()
+}
+CODE_REGEX = compile_spec(CODE_SPECIFICATION)
+
+def lexer_codes(code):
+    """Tokeniza directamente a los códigos de terminal del LR en un array('H')"""
+    codes = array('H')
+    append = codes.append
+    group_codes = GROUP_CODES
+    keyword_codes = KEYWORD_CODES
+    for match in CODE_REGEX.finditer(code):
+        token = group_codes[match.lastindex]
+        if token is None:
+            continue
+        if token == 0:
+            token = keyword_codes.get(match.group(), 0)
+        append(token)
+
+    if not codes or codes[-1] != 23:
+        codes.append(23)
+    return codes
+
 # ------------------------------
 # Analizador Sintáctico LR
 # ------------------------------
-def load_grammar(file_path):
+NUM_TERMINALS = len(TERMINALS)  # Códigos de token_map, con EOF = NUM_TERMINALS - 1
+
+def read_grammar_text(file_path):
+    """Lee la tabla LR en texto: producciones, tabla de acciones y de saltos"""
     with open(file_path, 'r') as f:
         lines = [line.strip() for line in f if line.strip()]
         
@@ -91,56 +154,199 @@ def load_grammar(file_path):
     state_line = lines[num_productions + 1].split('\t')
     num_states = int(state_line[0])
     num_symbols = int(state_line[1])
+    num_nonterminals = num_symbols - NUM_TERMINALS
     
     action_table = []
     goto_table = []
-    for line in lines[num_productions + 2:]:
+    for line in lines[num_productions + 2:num_productions + 2 + num_states]:
         entries = list(map(int, line.split('\t')))
-        action = entries[:24]
-        goto = entries[24:24 + 22]
+        action = entries[:NUM_TERMINALS]
+        goto = entries[NUM_TERMINALS:NUM_TERMINALS + num_nonterminals]
         action_table.append(action)
         goto_table.append(goto)
     
     return productions, action_table, goto_table
 
-def parse(tokens, productions, action_table, goto_table):
-    stack = [0]
-    token_index = 0
-    current_token = tokens[token_index] if tokens else 23
-    
-    while True:
-        state = stack[-1]
-        action = action_table[state][current_token]
-        
-        if action > 0:  # Desplazar
-            stack.append(current_token)
-            stack.append(action)
-            token_index += 1
-            if token_index < len(tokens):
-                current_token = tokens[token_index]
-            else:
-                current_token = 23  # EOF
-        elif action < 0:  # Reducir
-            prod_num = -action
-            lhs, rhs_len = productions[prod_num - 1]
-            stack = stack[:-2 * rhs_len]
-            state = stack[-1]
-            goto_state = goto_table[state][lhs - 24]  # No terminales empiezan en 24
-            stack.append(lhs)
-            stack.append(goto_state)
-        elif action == 0:  # Error
-            raise SyntaxError(f"Error de sintaxis en token {current_token}")
-        else:  # Aceptar
-            if current_token == 23 and len(stack) == 2 and stack[0] == 0 and stack[1] == 24:
-                print("\n¡Análisis exitoso! La entrada es válida.")
-                return True
-            else:
-                raise SyntaxError("Error: entrada no válida después de EOF")
+# ------------------------------
+# Tablas LR precompiladas (binario)
+# ------------------------------
+# Cabecera: firma, versión, marca de orden de bytes, número de producciones,
+# estados, terminales y no terminales, largo de los vectores comprimidos de
+# acciones y de saltos, y tamaño/mtime/SHA-256 del .Ir fuente. La siguen,
+# como enteros de 32 bits, los pares (lhs, rhs_len) de cada producción, las
+# tablas de acciones y de saltos fila por fila y, de cada una, sus vectores
+# comprimidos (default y base por estado, check y value), ya empaquetados
+# para lr_engine: cargar el parser no comprime nada.
+TABLE_MAGIC = b'TRLR'
+TABLE_VERSION = 2
+TABLE_BYTE_ORDER = 0x01020304
+TABLE_HEADER = struct.Struct('=4sII6IQq32s')
+
+def _source_digest(file_path):
+    with open(file_path, 'rb') as f:
+        return hashlib.sha256(f.read()).digest()
+
+def compile_grammar(source_path, compiled_path=None):
+    """Convierte el .Ir en texto a su formato binario precompilado"""
+    compiled_path = compiled_path or source_path + 'b'
+    productions, action_table, goto_table = read_grammar_text(source_path)
+    num_terminals = len(action_table[0]) if action_table else NUM_TERMINALS
+    num_nonterminals = len(goto_table[0]) if goto_table else 0
+
+    payload = array('i')
+    for lhs, rhs_len in productions:
+        payload.append(lhs)
+        payload.append(rhs_len)
+    for row in action_table:
+        payload.extend(row)
+    for row in goto_table:
+        payload.extend(row)
+    lengths = []
+    for rows, defaults in ((action_table, action_defaults(action_table, ACCEPT_ACTION)),
+                           (goto_table, goto_defaults(goto_table))):
+        base, check, value = pack_rows(rows, defaults)
+        for vector in (defaults, base, check, value):
+            payload.extend(vector)
+        lengths.append(len(check))
+
+    st = os.stat(source_path)
+    header = TABLE_HEADER.pack(
+        TABLE_MAGIC, TABLE_VERSION, TABLE_BYTE_ORDER,
+        len(productions), len(action_table), num_terminals, num_nonterminals, *lengths,
+        st.st_size, st.st_mtime_ns, _source_digest(source_path),
+    )
+    tmp_path = compiled_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        f.write(payload.tobytes())
+    os.replace(tmp_path, compiled_path)
+    return compiled_path
+
+def load_compiled_grammar(compiled_path, source_path=None):
+    """Mapea en memoria una tabla precompilada sin copiar su contenido.
+
+    Devuelve (producciones, acciones, saltos, parser LR sobre los vectores
+    comprimidos mapeados), o None si el archivo no existe, es de otra versión
+    o ya no corresponde al .Ir fuente (se compara tamaño y mtime y, si
+    difieren, el SHA-256 del contenido).
+    """
+    try:
+        with open(compiled_path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(data) < TABLE_HEADER.size:
+        return None
+
+    (magic, version, byte_order, num_productions, num_states, num_terminals,
+     num_nonterminals, action_length, goto_length,
+     src_size, src_mtime, src_digest) = TABLE_HEADER.unpack_from(data)
+    if magic != TABLE_MAGIC or version != TABLE_VERSION or byte_order != TABLE_BYTE_ORDER:
+        return None
+
+    if source_path is not None:
+        try:
+            st = os.stat(source_path)
+        except OSError:
+            return None
+        if (st.st_size, st.st_mtime_ns) != (src_size, src_mtime):
+            if _source_digest(source_path) != src_digest:
+                return None
+
+    cells = memoryview(data)[TABLE_HEADER.size:].cast('i')
+    dense = 2 * num_productions + num_states * (num_terminals + num_nonterminals)
+    if len(cells) != dense + 4 * num_states + 2 * (action_length + goto_length):
+        return None
+
+    productions = [(cells[2 * i], cells[2 * i + 1]) for i in range(num_productions)]
+    offset = 2 * num_productions
+    action_table = [cells[offset + s * num_terminals:offset + (s + 1) * num_terminals]
+                    for s in range(num_states)]
+    offset += num_states * num_terminals
+    goto_table = [cells[offset + s * num_nonterminals:offset + (s + 1) * num_nonterminals]
+                  for s in range(num_states)]
+    offset = dense
+    tables = []
+    for length in (action_length, goto_length):
+        vectors = []
+        for size in (num_states, num_states, length, length):
+            vectors.append(cells[offset:offset + size])
+            offset += size
+        tables.append(CompressedTable(*vectors))
+    parser = LRParser(productions, tables[0], tables[1], ACCEPT_ACTION, num_terminals)
+    return productions, action_table, goto_table, parser
+
+def load_grammar(file_path):
+    """Carga la tabla LR, usando (y regenerando si hace falta) su versión binaria"""
+    compiled_path = file_path + 'b'
+    loaded = load_compiled_grammar(compiled_path, file_path)
+    if loaded is None:
+        try:
+            compile_grammar(file_path, compiled_path)
+        except OSError:
+            # Sin permiso de escritura: se usa directamente la tabla en texto
+            return read_grammar_text(file_path)
+        loaded = load_compiled_grammar(compiled_path, file_path)
+    productions, action_table, goto_table, parser = loaded
+    # lr_parser encuentra el parser ya armado en lugar de comprimir las tablas
+    _parsers[id(action_table)] = (action_table, parser)
+    return productions, action_table, goto_table
+
+# La acción -1 reduce por la producción 1, la regla aumentada S' -> S:
+# equivale a aceptar la entrada.
+ACCEPT_ACTION = -1
+EOF_CODE = 23
+
+_parsers = {}
+
+def lr_parser(productions, action_table, goto_table):
+    """Devuelve (y recuerda) el motor LR comprimido para estas tablas.
+
+    Las que vienen de load_grammar ya traen el suyo, leído del .Irb; sólo
+    las leídas del .Ir en texto se comprimen aquí, una vez.
+    """
+    key = id(action_table)
+    cached = _parsers.get(key)
+    if cached is None or cached[0] is not action_table:
+        # Los no terminales se numeran a continuación de los terminales de la tabla
+        num_terminals = len(action_table[0]) if action_table else NUM_TERMINALS
+        parser = LRParser.from_dense(productions, action_table, goto_table,
+                                     accept=ACCEPT_ACTION, nonterminal_base=num_terminals)
+        cached = _parsers[key] = (action_table, parser)
+    return cached[1]
+
+def parse(tokens, productions, action_table, goto_table, stats=None):
+    """Analiza ``tokens``; con ``stats`` (un stats.Stats) mide la fase y cuenta las acciones LR"""
+    parser = lr_parser(productions, action_table, goto_table)
+    if stats is None:
+        parser.parse(tokens, EOF_CODE)
+    else:
+        with stats.phase('parse'):
+            parser.parse(tokens, EOF_CODE, stats)
+    print("\n¡Análisis exitoso! La entrada es válida.")
+    return True
 
 # ------------------------------
 # Ejemplo de Uso
 # ------------------------------
 if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--compilar":
+        print("Tabla compilada en", compile_grammar(sys.argv[2]))
+        sys.exit(0)
+
+    # --stats: tiempos, memoria y acciones LR de cada fase
+    stats = None
+    if "--stats" in sys.argv[1:]:
+        from stats import Stats
+        stats = Stats()
+
+    # Generar la tabla desde la gramática si falta o quedó atrasada
+    if (not os.path.exists("compilador.Ir")
+            or os.path.getmtime("compilador.Ir") < os.path.getmtime("compilador.gram")):
+        from lalr import generate
+        for conflict in generate("compilador.gram", "compilador.Ir", TERMINALS):
+            print(conflict)
+
     # Cargar gramática y tablas LR
     productions, action_table, goto_table = load_grammar("compilador.Ir")
     
@@ -155,11 +361,18 @@ if __name__ == "__main__":
     # Ejecutar lexer y traducir tokens
     tokens = lexer(code)
     print("Tokens generados:", tokens)
-    token_codes = translate_tokens(tokens)
-    print("Códigos de tokens:", token_codes)
+    if stats is None:
+        token_codes = lexer_codes(code)
+    else:
+        with stats.phase('lex'):
+            token_codes = lexer_codes(code)
+        stats.count('tokens', len(token_codes))
+    print("Códigos de tokens:", token_codes.tolist())
     
     # Ejecutar parser
     try:
-        parse(token_codes, productions, action_table, goto_table)
+        parse(token_codes, productions, action_table, goto_table, stats)
     except SyntaxError as e:
-        print(f"\nError de sintaxis: {e}")
\ No newline at end of file
+        print(f"\nError de sintaxis: {e}")
+    if stats is not None:
+        print(stats.to_text())
\ No newline at end of file
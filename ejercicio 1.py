@@ -1,25 +1,32 @@
+import os
+import sys
+
+from lr_engine import ACCEPT, ERROR, LRParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Traductor"))
+from scanner import Scanner
+
 class Lexico:
+    # Identificador → 0, '+' → 1; cualquier otro carácter es inválido
+    especificacion = [
+        ('ID', r'[^\W\d_]+'),
+        ('MAS', r'\+'),
+        ('INVALIDO', r'[\s\S]'),
+    ]
+    codigos = {'ID': 0, 'MAS': 1}
+    escaner = Scanner(especificacion)
+
     def __init__(self, cadena):
         self.cadena = cadena
         self.pos = 0
         self.tokens = []
     
     def analisis_lexico(self):
-        while self.pos < len(self.cadena):
-            char = self.cadena[self.pos]
-            
-            if char.isalpha():  # Identificador (agrupar múltiples letras)
-                inicio = self.pos
-                while self.pos < len(self.cadena) and self.cadena[self.pos].isalpha():
-                    self.pos += 1
-                self.tokens.append(0)  # Un solo token por identificador
-                
-            elif char == '+':  # Operador
-                self.tokens.append(1)
-                self.pos += 1
-                
-            else:  # Carácter no válido
-                raise ValueError(f"Carácter no reconocido: {char}")
+        for tipo, lexema in self.escaner.scan(self.cadena):
+            if tipo == 'INVALIDO':  # Carácter no válido
+                raise ValueError(f"Carácter no reconocido: {lexema}")
+            self.tokens.append(self.codigos[tipo])
+            self.pos += len(lexema)
                 
         self.tokens.append(2)  # Fin de cadena ($)
         return self.tokens
@@ -35,35 +42,39 @@ class ParserLR:
             4: {0: ('r', 1),    1: ('r', 1),   2: ('r', 1),   'E': None}
         }
         self.producciones = [('E', 3)]  # E -> id + id
+        self.motor = self.construir_motor()
+
+    def construir_motor(self):
+        """Traduce la tabla de tuplas a la codificación del motor LR compartido"""
+        no_terminales = {'E': 0}
+        acciones = []
+        saltos = []
+        for estado in sorted(self.tabla):
+            fila = self.tabla[estado]
+            codigos = []
+            for simbolo in range(3):
+                accion = fila.get(simbolo)
+                if not accion or accion == ('r', 0):
+                    codigos.append(ERROR)
+                elif accion[0] == 'd':
+                    codigos.append(accion[1])
+                elif accion[0] == 'r':
+                    codigos.append(-accion[1])
+                else:
+                    codigos.append(ACCEPT)
+            acciones.append(codigos)
+            saltos.append([fila.get('E') or ERROR])
+        producciones = [(no_terminales[lhs], n) for lhs, n in self.producciones]
+        return LRParser.from_dense(producciones, acciones, saltos)
 
     def parse(self, tokens):
-        pila = [0]
-        cursor = 0
-        
-        while True:
-            estado = pila[-1]
-            actual = tokens[cursor] if cursor < len(tokens) else 2
-            
-            accion = self.tabla[estado].get(actual, None)
-            
-            if not accion:
-                print("Error: Cadena no válida")
-                return False
-                
-            if accion[0] == 'd':    # Desplazamiento
-                pila.append(actual)
-                pila.append(accion[1])
-                cursor += 1
-            elif accion[0] == 'r':  # Reducción
-                prod = self.producciones[accion[1]-1]
-                for _ in range(2 * prod[1]):  # Pop de símbolos
-                    pila.pop()
-                estado_actual = pila[-1]
-                pila.append('E')
-                pila.append(self.tabla[estado_actual]['E'])
-            elif accion[0] == 'acc': # Aceptación
-                print("Cadena válida!")
-                return True
+        try:
+            self.motor.parse(tokens, 2)
+        except SyntaxError:
+            print("Error: Cadena no válida")
+            return False
+        print("Cadena válida!")
+        return True
 
 # Ejecución con "hola+mundo"
 entrada = "hola+mundo"
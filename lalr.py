@@ -0,0 +1,337 @@
+"""Generador de tablas LALR(1) a partir de una gramática en texto.
+
+Formato de la gramática (``#`` inicia un comentario; una línea que empieza
+con ``|`` añade alternativas a la regla anterior)::
+
+    sentencias -> sentencia sentencias | ε
+    bloque -> '{' sentencias '}'
+              | '{' '}'
+
+Un símbolo es terminal si su nombre (con o sin comillas) aparece en la lista
+de terminales; cualquier otro es no terminal. La primera regla define el
+símbolo inicial. Una alternativa vacía o ``ε`` es la cadena vacía.
+
+Las tablas se construyen sobre el autómata LR(0) propagando los símbolos de
+preanálisis entre núcleos (algoritmo de generación espontánea y propagación),
+sin pasar por la colección LR(1) canónica. La salida usa el formato .Ir que
+lee compilador.load_grammar: la producción 1 es la regla aumentada S' -> S y
+reducir por ella (acción -1) equivale a aceptar.
+"""
+import hashlib
+import os
+import shutil
+import sys
+from collections import defaultdict
+
+GENERATOR_VERSION = 1
+EPSILON = ('ε', "''")
+DUMMY = -1  # Preanálisis ficticio '#' para detectar propagación
+
+class GrammarError(Exception):
+    pass
+
+class Grammar:
+    def __init__(self, terminals):
+        self.terminals = list(terminals)
+        self.codes = {name: code for code, name in enumerate(self.terminals)}
+        self.nonterminals = []
+        self.productions = []  # (lhs, rhs) con símbolos como enteros
+
+    def symbol(self, name):
+        if len(name) > 2 and name[0] == name[-1] == "'":
+            if name[1:-1] not in self.terminals:
+                raise GrammarError(f"Terminal desconocido {name}")
+            return self.codes[name[1:-1]]
+        if name not in self.codes:
+            self.codes[name] = len(self.terminals) + len(self.nonterminals)
+            self.nonterminals.append(name)
+        return self.codes[name]
+
+    def name(self, symbol):
+        if symbol < len(self.terminals):
+            return self.terminals[symbol]
+        return self.nonterminals[symbol - len(self.terminals)]
+
+    def is_terminal(self, symbol):
+        return 0 <= symbol < len(self.terminals)
+
+def read_grammar(text, terminals):
+    """Interpreta el texto de la gramática; la producción 0 es S' -> S"""
+    grammar = Grammar(terminals)
+    rules = []
+    lhs = None
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        if line.startswith('|') and lhs is not None:
+            rules.extend((lhs, [n for n in alt.split() if n not in EPSILON])
+                         for alt in line[1:].split('|'))
+            continue
+        if '->' not in line:
+            raise GrammarError(f"Línea {number}: falta '->' en {line!r}")
+        lhs, rhs = line.split('->', 1)
+        lhs = lhs.strip()
+        if not lhs or lhs in terminals:
+            raise GrammarError(f"Línea {number}: lado izquierdo inválido {lhs!r}")
+        for alternative in rhs.split('|'):
+            names = [n for n in alternative.split() if n not in EPSILON]
+            rules.append((lhs, names))
+    if not rules:
+        raise GrammarError("La gramática no tiene reglas")
+
+    start = grammar.symbol(rules[0][0])
+    for lhs, names in rules:
+        grammar.productions.append((grammar.symbol(lhs), tuple(grammar.symbol(n) for n in names)))
+    augmented = grammar.symbol(grammar.name(start) + "'")
+    grammar.productions.insert(0, (augmented, (start,)))
+
+    defined = {lhs for lhs, _ in grammar.productions}
+    for lhs, rhs in grammar.productions:
+        for symbol in rhs:
+            if not grammar.is_terminal(symbol) and symbol not in defined:
+                raise GrammarError(f"No terminal sin reglas: {grammar.name(symbol)}")
+    return grammar
+
+class LALRBuilder:
+    def __init__(self, grammar):
+        self.grammar = grammar
+        self.by_lhs = defaultdict(list)
+        for index, (lhs, _) in enumerate(grammar.productions):
+            self.by_lhs[lhs].append(index)
+        self._compute_first()
+        self.conflicts = []
+
+    def _compute_first(self):
+        g = self.grammar
+        self.nullable = set()
+        self.first = defaultdict(set)
+        changed = True
+        while changed:
+            changed = False
+            for lhs, rhs in g.productions:
+                first = self.first[lhs]
+                before = len(first)
+                for symbol in rhs:
+                    if g.is_terminal(symbol):
+                        first.add(symbol)
+                        break
+                    first |= self.first[symbol]
+                    if symbol not in self.nullable:
+                        break
+                else:
+                    if lhs not in self.nullable:
+                        self.nullable.add(lhs)
+                        changed = True
+                if len(first) != before:
+                    changed = True
+
+        # FIRST de cada sufijo rhs[dot+1:], que es lo que necesita la clausura
+        self.suffix_first = {}
+        for index, (_, rhs) in enumerate(g.productions):
+            for dot in range(len(rhs) + 1):
+                first = set()
+                nullable = True
+                for symbol in rhs[dot + 1:]:
+                    if g.is_terminal(symbol):
+                        first.add(symbol)
+                        nullable = False
+                        break
+                    first |= self.first[symbol]
+                    if symbol not in self.nullable:
+                        nullable = False
+                        break
+                self.suffix_first[index, dot] = (frozenset(first), nullable)
+
+    def closure0(self, kernel):
+        items = list(kernel)
+        seen = set(kernel)
+        productions = self.grammar.productions
+        for prod, dot in items:
+            rhs = productions[prod][1]
+            if dot < len(rhs) and not self.grammar.is_terminal(rhs[dot]):
+                for index in self.by_lhs[rhs[dot]]:
+                    if (index, 0) not in seen:
+                        seen.add((index, 0))
+                        items.append((index, 0))
+        return items
+
+    def closure1(self, items):
+        """Clausura LR(1): ``items`` es un dict (prod, punto) -> preanálisis"""
+        productions = self.grammar.productions
+        pending = list(items)
+        while pending:
+            prod, dot = pending.pop()
+            rhs = productions[prod][1]
+            if dot >= len(rhs) or self.grammar.is_terminal(rhs[dot]):
+                continue
+            first, nullable = self.suffix_first[prod, dot]
+            lookahead = first | items[prod, dot] if nullable else first
+            for index in self.by_lhs[rhs[dot]]:
+                current = items.setdefault((index, 0), set())
+                if not lookahead <= current:
+                    current |= lookahead
+                    pending.append((index, 0))
+        return items
+
+    def build_lr0(self):
+        productions = self.grammar.productions
+        self.kernels = [((0, 0),)]
+        self.transitions = []
+        index = {self.kernels[0]: 0}
+        state = 0
+        while state < len(self.kernels):
+            moves = defaultdict(list)
+            for prod, dot in self.closure0(self.kernels[state]):
+                rhs = productions[prod][1]
+                if dot < len(rhs):
+                    moves[rhs[dot]].append((prod, dot + 1))
+            row = {}
+            for symbol, items in moves.items():
+                kernel = tuple(sorted(set(items)))
+                if kernel not in index:
+                    index[kernel] = len(self.kernels)
+                    self.kernels.append(kernel)
+                row[symbol] = index[kernel]
+            self.transitions.append(row)
+            state += 1
+
+    def compute_lookaheads(self):
+        productions = self.grammar.productions
+        eof = len(self.grammar.terminals) - 1  # El último terminal es el fin de entrada
+        lookaheads = [{item: set() for item in kernel} for kernel in self.kernels]
+        propagate = defaultdict(list)
+        lookaheads[0][0, 0].add(eof)
+
+        for state, kernel in enumerate(self.kernels):
+            for item in kernel:
+                closure = self.closure1({item: {DUMMY}})
+                for (prod, dot), las in closure.items():
+                    rhs = productions[prod][1]
+                    if dot == len(rhs):
+                        continue
+                    target = (self.transitions[state][rhs[dot]], (prod, dot + 1))
+                    for la in las:
+                        if la == DUMMY:
+                            propagate[state, item].append(target)
+                        else:
+                            lookaheads[target[0]][target[1]].add(la)
+
+        pending = [(s, item) for s, kernel in enumerate(self.kernels) for item in kernel]
+        while pending:
+            state, item = pending.pop()
+            source = lookaheads[state][item]
+            for target_state, target_item in propagate.get((state, item), ()):
+                target = lookaheads[target_state][target_item]
+                if not source <= target:
+                    target |= source
+                    pending.append((target_state, target_item))
+        self.lookaheads = lookaheads
+
+    def build_tables(self):
+        """Devuelve (acciones, saltos) como listas de filas en formato .Ir"""
+        self.build_lr0()
+        self.compute_lookaheads()
+        g = self.grammar
+        num_terminals = len(g.terminals)
+        num_nonterminals = len(g.nonterminals)
+        action = [[0] * num_terminals for _ in self.kernels]
+        goto = [[0] * num_nonterminals for _ in self.kernels]
+
+        for state, row in enumerate(self.transitions):
+            for symbol, target in row.items():
+                if g.is_terminal(symbol):
+                    action[state][symbol] = target
+                else:
+                    goto[state][symbol - num_terminals] = target
+
+        for state, kernel in enumerate(self.kernels):
+            items = self.closure1({item: set(las) for item, las in self.lookaheads[state].items()})
+            for (prod, dot), las in sorted(items.items()):
+                if dot != len(g.productions[prod][1]):
+                    continue
+                for la in sorted(las):
+                    self._set_reduce(action, state, la, prod)
+        return action, goto
+
+    def _set_reduce(self, action, state, terminal, prod):
+        current = action[state][terminal]
+        code = -(prod + 1)
+        if current == 0:
+            action[state][terminal] = code
+            return
+        if current == code:
+            return
+        g = self.grammar
+        symbol = g.terminals[terminal]
+        if current > 0:
+            # Desplazamiento/reducción: gana el desplazamiento
+            self.conflicts.append(
+                f"Conflicto desplazamiento/reducción en estado {state} con {symbol!r}: "
+                f"se desplaza en lugar de reducir por {self.describe(prod)}")
+        else:
+            keep, drop = sorted((-current - 1, prod))
+            self.conflicts.append(
+                f"Conflicto reducción/reducción en estado {state} con {symbol!r}: "
+                f"se reduce por {self.describe(keep)} en lugar de {self.describe(drop)}")
+            action[state][terminal] = -(keep + 1)
+
+    def describe(self, prod):
+        lhs, rhs = self.grammar.productions[prod]
+        body = ' '.join(self.grammar.name(s) for s in rhs) or 'ε'
+        return f"{self.grammar.name(lhs)} -> {body}"
+
+def format_table(grammar, action, goto):
+    """Serializa las tablas en el formato de texto .Ir"""
+    num_terminals = len(grammar.terminals)
+    lines = [str(len(grammar.productions))]
+    for lhs, rhs in grammar.productions:
+        lines.append(f"{lhs}\t{len(rhs)}")
+    lines.append(f"{len(action)}\t{num_terminals + len(grammar.nonterminals)}")
+    for action_row, goto_row in zip(action, goto):
+        lines.append('\t'.join(map(str, action_row + goto_row)))
+    return '\n'.join(lines) + '\n'
+
+def generate(grammar_path, output_path, terminals, cache_dir=None):
+    """Genera el .Ir de una gramática reutilizando la caché si no cambió.
+
+    Devuelve la lista de conflictos encontrados (vacía si no hubo).
+    """
+    with open(grammar_path, encoding='utf-8') as f:
+        text = f.read()
+    key = hashlib.sha256(repr((GENERATOR_VERSION, list(terminals), text)).encode('utf-8')).hexdigest()
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(grammar_path)), '.lalr_cache')
+    cached_table = os.path.join(cache_dir, key + '.Ir')
+    cached_conflicts = os.path.join(cache_dir, key + '.conflictos')
+
+    if os.path.exists(cached_table) and os.path.exists(cached_conflicts):
+        with open(cached_conflicts, encoding='utf-8') as f:
+            conflicts = f.read().splitlines()
+    else:
+        grammar = read_grammar(text, terminals)
+        builder = LALRBuilder(grammar)
+        action, goto = builder.build_tables()
+        conflicts = builder.conflicts
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cached_table + '.tmp', 'w', encoding='utf-8') as f:
+            f.write(format_table(grammar, action, goto))
+        os.replace(cached_table + '.tmp', cached_table)
+        with open(cached_conflicts, 'w', encoding='utf-8') as f:
+            f.write(''.join(c + '\n' for c in conflicts))
+
+    shutil.copyfile(cached_table, output_path)
+    return conflicts
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Uso: python lalr.py <gramática> <salida.Ir>")
+        sys.exit(2)
+    from compilador import TERMINALS
+    try:
+        found = generate(sys.argv[1], sys.argv[2], TERMINALS)
+    except GrammarError as e:
+        print(f"Error en la gramática: {e}")
+        sys.exit(1)
+    for conflict in found:
+        print(conflict, file=sys.stderr)
+    print(f"Tabla generada en {sys.argv[2]} ({len(found)} conflictos)")
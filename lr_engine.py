@@ -0,0 +1,217 @@
+"""Motor LR compartido por compilador.py, "ejercicio 1.py" y "Ejercicio 2.py".
+
+Codificación de las acciones:
+
+- ``> 0``: desplazar e ir a ese estado
+- ``< 0``: reducir por la producción ``-acción`` (numeradas desde 1)
+- ``0``: error
+- ``accept``: aceptar (por defecto ``ACCEPT``; compilador.py usa -1)
+
+Las tablas se guardan comprimidas por desplazamiento de filas (comb vector)
+en arrays de enteros, con una acción por omisión por fila: la reducción más
+frecuente de la fila (reducciones por omisión) o el error si no hay ninguna.
+"""
+from array import array
+from collections import Counter
+
+ACCEPT = -0x7FFFFFFF
+ERROR = 0
+
+# Huecos que se prueban por fila antes de ponerla al final de los vectores
+MAX_PROBES = 1000000
+
+class CompressedTable:
+    """Tabla dispersa de enteros comprimida por desplazamiento de filas.
+
+    Cada fila ``r`` guarda sólo las celdas distintas de su valor por omisión,
+    colocadas a partir de ``base[r]`` en los vectores ``value``/``check``; una
+    celda pertenece a la fila si ``check[base[r] + col] == r``. Los vectores
+    pueden ser arrays o memoryviews sobre una tabla precompilada (ver
+    compilador.compile_grammar), que se usan tal cual, sin copiarlos.
+    """
+
+    def __init__(self, default, base, check, value):
+        self.default = default
+        self.base = base
+        self.check = check
+        self.value = value
+
+    @classmethod
+    def pack(cls, rows, defaults):
+        """Comprime ``rows`` (listas de enteros) con ``defaults`` por fila"""
+        base, check, value = pack_rows(rows, defaults)
+        return cls(array('i', defaults), base, check, value)
+
+    def get(self, row, col):
+        i = self.base[row] + col
+        if self.check[i] == row:
+            return self.value[i]
+        return self.default[row]
+
+    @property
+    def nbytes(self):
+        vectors = (self.default, self.base, self.value, self.check)
+        return sum(len(v) * v.itemsize for v in vectors)
+
+def pack_rows(rows, defaults):
+    """Coloca las filas en vectores comunes; devuelve arrays (base, check, value).
+
+    Primer ajuste: cada fila, de la más llena a la más vacía, va en el menor
+    desplazamiento en que todas sus celdas caen en posiciones libres. La
+    ocupación se lleva como un entero de bits, así que los desplazamientos
+    válidos de una fila salen de un AND de la máscara de libres corrida por
+    cada una de sus columnas, sin probar candidatos uno por uno; la búsqueda
+    empieza en el primer hueco libre, que se lleva aparte.
+    """
+    num_cols = max((len(row) for row in rows), default=0)
+    # Los errores se funden con el valor por omisión de la fila
+    cells = [[(col, v) for col, v in enumerate(row) if v != defaults[r] and v != ERROR]
+             for r, row in enumerate(rows)]
+    order = sorted(range(len(rows)), key=lambda r: -len(cells[r]))
+    base = [0] * len(rows)
+    check = []
+    value = []
+    occupied = 0    # Bit i: la posición i de los vectores ya tiene dueño
+    first_free = 0
+
+    for r in order:
+        entries = cells[r]
+        if not entries:
+            continue
+        # ~occupied tiene infinitos unos por arriba: más allá del final todo está libre
+        fits = -1
+        for col, _ in entries:
+            fits &= ~occupied >> col
+        low = max(first_free - entries[0][0], 0)
+        fits >>= low
+        offset = low + (fits & -fits).bit_length() - 1
+
+        end = offset + num_cols
+        if end > len(check):
+            check.extend([-1] * (end - len(check)))
+            value.extend([0] * (end - len(value)))
+        for col, v in entries:
+            check[offset + col] = r
+            value[offset + col] = v
+            occupied |= 1 << (offset + col)
+        base[r] = offset
+        first_free = (~occupied & (occupied + 1)).bit_length() - 1
+
+    # Relleno para que base + col nunca se salga de los vectores
+    needed = max(base, default=0) + num_cols - len(check)
+    if needed > 0:
+        check.extend([-1] * needed)
+        value.extend([0] * needed)
+    return array('i', base), array('i', check), array('i', value)
+
+def action_defaults(rows, accept=ACCEPT):
+    """Reducción más frecuente de cada fila, o error si la fila no reduce"""
+    defaults = []
+    for row in rows:
+        reductions = Counter(v for v in row if v < 0 and v != accept)
+        defaults.append(reductions.most_common(1)[0][0] if reductions else ERROR)
+    return defaults
+
+def goto_defaults(rows):
+    """Salto más frecuente de cada fila (los huecos nunca se consultan)"""
+    defaults = []
+    for row in rows:
+        targets = Counter(v for v in row if v != ERROR)
+        defaults.append(targets.most_common(1)[0][0] if targets else ERROR)
+    return defaults
+
+class LRParser:
+    def __init__(self, productions, action, goto, accept=ACCEPT, nonterminal_base=0):
+        self.productions = productions
+        self.action = action
+        self.goto = goto
+        self.accept = accept
+        self.nonterminal_base = nonterminal_base
+
+    @classmethod
+    def from_dense(cls, productions, action_rows, goto_rows, accept=ACCEPT, nonterminal_base=0):
+        """Construye el parser a partir de tablas como listas de filas"""
+        action = CompressedTable.pack(action_rows, action_defaults(action_rows, accept))
+        goto = CompressedTable.pack(goto_rows, goto_defaults(goto_rows))
+        return cls(list(productions), action, goto, accept, nonterminal_base)
+
+    def parse(self, tokens, eof, stats=None):
+        """Analiza los códigos de ``tokens``; devuelve True o lanza SyntaxError.
+
+        Con ``stats`` (p. ej. un Traductor/stats.Stats) suma los
+        desplazamientos y reducciones en sus contadores ``lr_shifts`` y
+        ``lr_reductions``. Se cuentan envolviendo la entrada y las
+        producciones, así que sin ``stats`` el bucle no cambia.
+        """
+        if stats is None:
+            return self._parse(tokens, eof, self.productions)
+        tokens = _CountingIterator(tokens)
+        productions = _CountingProductions(self.productions)
+        try:
+            return self._parse(tokens, eof, productions)
+        finally:
+            # Cada desplazamiento pide un token más, aparte del primero
+            stats.count('lr_shifts', max(tokens.calls - 1, 0))
+            stats.count('lr_reductions', productions.reductions)
+
+    def _parse(self, tokens, eof, productions):
+        accept = self.accept
+        nonterminal_base = self.nonterminal_base
+        action, goto = self.action, self.goto
+        a_base, a_check, a_value, a_default = action.base, action.check, action.value, action.default
+        g_base, g_check, g_value, g_default = goto.base, goto.check, goto.value, goto.default
+
+        states = [0]
+        symbols = []
+        tokens = iter(tokens)
+        token = next(tokens, eof)
+
+        while True:
+            state = states[-1]
+            i = a_base[state] + token
+            action = a_value[i] if a_check[i] == state else a_default[state]
+
+            if action > 0:  # Desplazar
+                states.append(action)
+                symbols.append(token)
+                token = next(tokens, eof)
+            elif action == accept:
+                return True
+            elif action < 0:  # Reducir sin copiar las pilas
+                lhs, rhs_len = productions[-action - 1]
+                state = states[-rhs_len - 1]
+                i = g_base[state] + lhs - nonterminal_base
+                target = g_value[i] if g_check[i] == state else g_default[state]
+                if rhs_len:
+                    states[-rhs_len:] = (target,)
+                    symbols[-rhs_len:] = (lhs,)
+                else:
+                    states.append(target)
+                    symbols.append(lhs)
+            else:  # Error
+                raise SyntaxError(f"Error de sintaxis en token {token}")
+
+class _CountingIterator:
+    """Iterador que cuenta cuántas veces se le pidió un elemento"""
+
+    def __init__(self, iterable):
+        self.iterator = iter(iterable)
+        self.calls = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        self.calls += 1
+        return next(self.iterator)
+
+class _CountingProductions:
+    """Producciones que cuentan cada consulta: una por reducción"""
+
+    def __init__(self, productions):
+        self.productions = productions
+        self.reductions = 0
+
+    def __getitem__(self, index):
+        self.reductions += 1
+        return self.productions[index]
@@ -1,33 +1,32 @@
-import re
+import os
+import sys
 
-def lexer(code):
-    # Definir las expresiones regulares para cada token
-    token_specifications = [
-        ("ID", r"\b[a-zA-Z_][a-zA-Z0-9_]*\b"),  # Identificadores
-        ("NUMBER", r"\d+(\.\d+)?"),             # Números (enteros y reales)
-        ("STRING", r'"[^"]*"'),                 # Cadenas
-        ("TYPE", r"\b(int|float|string)\b"),    # Tipos
-        ("OP", r"[+\-*/]|==|<=|>=|<|>|="),      # Operadores
-        ("LOGIC", r"\b(or|and|not)\b"),         # Operadores lógicos
-        ("SYMBOL", r"[;,()\{\}]"),              # Símbolos
-        ("KEYWORD", r"\b(if|while|return|else)\b"),  # Palabras clave
-        ("EOF", r"\$"),                         # Fin de entrada
-        ("WHITESPACE", r"\s+"),                 # Espacios en blanco (ignorar)
-    ]
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Traductor"))
+from scanner import Scanner
+
+# Definir las expresiones regulares para cada token
+token_specifications = [
+    ("ID", r"\b[a-zA-Z_][a-zA-Z0-9_]*\b"),  # Identificadores
+    ("NUMBER", r"\d+(\.\d+)?"),             # Números (enteros y reales)
+    ("STRING", r'"[^"]*"'),                 # Cadenas
+    ("OP", r"[+\-*/]|==|<=|>=|<|>|="),      # Operadores
+    ("SYMBOL", r"[;,()\{\}]"),              # Símbolos
+    ("EOF", r"\$"),                         # Fin de entrada
+    ("WHITESPACE", r"\s+"),                 # Espacios en blanco (ignorar)
+]
 
-    # Compilar patrones
-    token_regex = "|".join(f"(?P<{name}>{pattern})" for name, pattern in token_specifications)
-    regex_compiled = re.compile(token_regex)
-    tokens = []
+# Tipos, operadores lógicos y palabras clave se resuelven tras reconocer un ID
+palabras_reservadas = {
+    "int": "TYPE", "float": "TYPE", "string": "TYPE",
+    "or": "LOGIC", "and": "LOGIC", "not": "LOGIC",
+    "if": "KEYWORD", "while": "KEYWORD", "return": "KEYWORD", "else": "KEYWORD",
+}
 
-    # Tokenizar el código fuente
-    for match in regex_compiled.finditer(code):
-        token_type = match.lastgroup
-        token_value = match.group()
-        if token_type != "WHITESPACE":  # Ignorar espacios
-            tokens.append((token_type, token_value))
+escaner = Scanner(token_specifications, palabras_reservadas)
 
-    return tokens
+def lexer(code):
+    # Tokenizar el código fuente ignorando espacios
+    return list(escaner.scan(code, skip=("WHITESPACE",)))
 
 # Ejemplo de uso
 codigo = """